@@ -0,0 +1,29 @@
+"""Load integration modules without importing Home Assistant.
+
+The package ``__init__`` pulls in Home Assistant, so benchmarks import the
+Home Assistant free modules (API client, models, index, recurrence) one by
+one under a stand-in package instead.
+"""
+import importlib.util
+from pathlib import Path
+import sys
+import types
+
+COMPONENT = Path(__file__).resolve().parent.parent / "custom_components" / "timetree"
+PACKAGE = "timetree_bench"
+
+
+def load(name: str) -> types.ModuleType:
+    """Import ``custom_components/timetree/<name>.py`` and return it."""
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(COMPONENT)]
+        sys.modules[PACKAGE] = package
+    qualified = f"{PACKAGE}.{name}"
+    if qualified in sys.modules:
+        return sys.modules[qualified]
+    spec = importlib.util.spec_from_file_location(qualified, COMPONENT / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[qualified] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,126 @@
+"""Micro-benchmark for timestamp and timezone conversion.
+
+Converts a synthetic payload of 50k events, both as raw API events and as
+stored records, with the previous per-event ``ZoneInfo`` lookups and with
+the batched conversion layer, checks both give the same results and prints
+the timings.
+
+    python benchmarks/bench_conversion.py [--events N] [--repeat N]
+"""
+import argparse
+from datetime import datetime, timedelta
+import random
+import time
+from zoneinfo import ZoneInfo
+
+from _loader import load
+
+api = load("timetree_api")
+models = load("models")
+
+TIMEZONES = ["Europe/Brussels", "Europe/London", "America/New_York", "Asia/Tokyo", "UTC"]
+
+
+def make_payload(count: int, seed: int = 1) -> list[dict]:
+    """Return synthetic raw TimeTree events."""
+    rng = random.Random(seed)
+    events = []
+    for number in range(count):
+        timezone = rng.choice(TIMEZONES)
+        # Mostly recent events with a few before 1970
+        if rng.random() < 0.01:
+            start = rng.randrange(-5 * 10**8, 0) * 1000
+        else:
+            start = rng.randrange(10**9, 2 * 10**9) * 1000
+        events.append(
+            {
+                "uuid": f"event-{number}",
+                "title": f"Event {number}",
+                "start_at": start,
+                "end_at": start + rng.randrange(15, 600) * 60 * 1000,
+                "start_timezone": timezone,
+                "end_timezone": timezone if rng.random() < 0.95 else "UTC",
+                "all_day": rng.random() < 0.2,
+                "note": "",
+                "location": "",
+            }
+        )
+    return events
+
+
+def _legacy_timestamp(timestamp, tzinfo=ZoneInfo("UTC")):
+    """Convert a timestamp the way the integration used to."""
+    if timestamp >= 0:
+        return datetime.fromtimestamp(timestamp, tzinfo)
+    return datetime.fromtimestamp(0, tzinfo) + timedelta(seconds=int(timestamp))
+
+
+def legacy_convert(event_data: dict) -> dict:
+    """Convert an event the way the integration used to."""
+    start_tz = ZoneInfo(event_data.get("start_timezone", "UTC"))
+    end_tz = ZoneInfo(event_data.get("end_timezone", "UTC"))
+    start_dt = _legacy_timestamp(event_data.get("start_at") / 1000, start_tz)
+    end_dt = _legacy_timestamp(event_data.get("end_at") / 1000, end_tz)
+    ha_event = {
+        "uid": event_data.get("uuid"),
+        "summary": event_data.get("title", ""),
+        "start": start_dt,
+        "end": end_dt,
+        "description": event_data.get("note", ""),
+        "location": event_data.get("location", ""),
+    }
+    if event_data.get("all_day"):
+        ha_event["start"] = start_dt.date()
+        ha_event["end"] = end_dt.date()
+    return ha_event
+
+
+def legacy_span(event) -> tuple:
+    """Convert a record's start and end the way the integration used to."""
+    start = _legacy_timestamp(event.start, ZoneInfo(event.start_tz))
+    end = _legacy_timestamp(event.end, ZoneInfo(event.end_tz))
+    if event.all_day:
+        return start.date(), end.date()
+    return start, end
+
+
+def batched_span(event) -> tuple:
+    """Convert a record's start and end with the batched conversion layer."""
+    return event.span
+
+
+def timed(function, events: list[dict], repeat: int) -> tuple[float, list]:
+    """Return the best time of converting all events and the results."""
+    best = float("inf")
+    for _ in range(repeat):
+        began = time.perf_counter()
+        results = [function(event) for event in events]
+        best = min(best, time.perf_counter() - began)
+    return best, results
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    events = make_payload(args.events)
+    records = [models.TimeTreeEvent.from_api(event) for event in events]
+    print(f"{args.events} events, best of {args.repeat}")
+    for label, legacy_function, batched_function, payload in (
+        ("API events", legacy_convert, api.convert_timetree_event, events),
+        ("stored records", legacy_span, batched_span, records),
+    ):
+        legacy_time, legacy = timed(legacy_function, payload, args.repeat)
+        batched_time, batched = timed(batched_function, payload, args.repeat)
+        if legacy != batched:
+            raise SystemExit(f"Batched conversion of {label} differs from before")
+        print(f"{label}:")
+        print(f"  per-event ZoneInfo: {legacy_time * 1000:8.1f} ms")
+        print(f"  batched conversion: {batched_time * 1000:8.1f} ms")
+        print(f"  speedup:            {legacy_time / batched_time:8.2f}x")
+
+if __name__ == "__main__":
+    main()
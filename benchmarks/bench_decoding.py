@@ -0,0 +1,161 @@
+"""Response decoding benchmark for sync chunk payloads.
+
+Compares the previous decoding path, an uncompressed body decoded with
+the standard library (as ``response.json()`` did), with the current one,
+a compressed body decoded with orjson followed by field selection. For
+every payload this reports:
+
+* bytes on the wire without compression, with gzip and, when the
+  ``brotli`` package is installed, with brotli,
+* decode time per chunk, and the time spent decompressing,
+* memory held by the decoded events with all fields and with only the
+  fields the integration reads.
+
+Without ``--payload`` the chunks are generated by the fake server, shaped
+like TimeTree sync responses. Recorded responses can be passed instead,
+as JSON files or gzip compressed ``.gz`` files.
+
+    python benchmarks/bench_decoding.py [--payload FILE ...]
+        [--chunks N] [--chunk-size N] [--rounds N]
+"""
+import argparse
+import gzip
+import json
+from pathlib import Path
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from _loader import load
+from fake_server import make_event
+
+api = load("timetree_api")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CALENDAR_ID = 1
+
+
+def sample_payloads(chunks: int, chunk_size: int) -> list[tuple[str, bytes]]:
+    """Return generated sync chunks as (name, JSON body) pairs."""
+    payloads = []
+    for chunk in range(chunks):
+        since = chunk * chunk_size
+        body = {
+            "events": [
+                make_event(CALENDAR_ID, number)
+                for number in range(since, since + chunk_size)
+            ],
+            "since": since + chunk_size,
+            "chunk": chunk < chunks - 1,
+        }
+        payloads.append((f"generated chunk {chunk + 1}", json.dumps(body).encode()))
+    return payloads
+
+
+def recorded_payloads(paths: list[str]) -> list[tuple[str, bytes]]:
+    """Return recorded sync responses as (name, JSON body) pairs."""
+    payloads = []
+    for path in map(Path, paths):
+        raw = path.read_bytes()
+        if path.suffix == ".gz":
+            raw = gzip.decompress(raw)
+        payloads.append((path.name, raw))
+    return payloads
+
+
+def median_ms(function: Callable[[], Any], rounds: int) -> float:
+    """Return the median run time of a function in milliseconds."""
+    timings = []
+    for _ in range(rounds):
+        began = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - began) * 1000)
+    return statistics.median(timings)
+
+
+def held_memory(function: Callable[[], Any]) -> float:
+    """Return the memory in KiB still held by the result of a function."""
+    tracemalloc.start()
+    result = function()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return held / 1024
+
+
+def decode_before(raw: bytes) -> list[dict[str, Any]]:
+    """Decode a body the way the client did before, keeping every field."""
+    return json.loads(raw.decode())["events"]
+
+
+def decode_after(raw: bytes) -> list[dict[str, Any]]:
+    """Decode a decompressed body the way the client does now."""
+    loads = orjson.loads if orjson is not None else json.loads
+    return api.select_event_fields(loads(raw)["events"])
+
+
+def main() -> None:
+    """Run the benchmark for every payload."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payload", action="append", default=[])
+    parser.add_argument("--chunks", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = (
+        recorded_payloads(args.payload)
+        if args.payload
+        else sample_payloads(args.chunks, args.chunk_size)
+    )
+    print(f"JSON decoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+
+    for name, raw in payloads:
+        gzipped = gzip.compress(raw, compresslevel=6)
+        events = len(json.loads(raw)["events"])
+        print(f"{name} ({events} events)")
+        print(f"  identity:           {len(raw) / 1024:8.1f} KiB")
+        print(
+            f"  gzip:               {len(gzipped) / 1024:8.1f} KiB"
+            f" ({len(gzipped) / len(raw):.0%})"
+        )
+        if brotli is not None:
+            brotlied = brotli.compress(raw, quality=4)
+            print(
+                f"  brotli:             {len(brotlied) / 1024:8.1f} KiB"
+                f" ({len(brotlied) / len(raw):.0%})"
+            )
+
+        before = median_ms(lambda: decode_before(raw), args.rounds)
+        after = median_ms(lambda: decode_after(raw), args.rounds)
+        print(f"  decode before:      {before:8.2f} ms (json, all fields)")
+        print(f"  decode after:       {after:8.2f} ms (decode, select) {before / after:.1f}x")
+        # aiohttp decompresses while reading the body
+        gunzip = median_ms(lambda: gzip.decompress(gzipped), args.rounds)
+        print(f"  gunzip:             {gunzip:8.2f} ms")
+        if brotli is not None:
+            unbrotli = median_ms(lambda: brotli.decompress(brotlied), args.rounds)
+            print(f"  brotli decompress:  {unbrotli:8.2f} ms")
+
+        full = held_memory(lambda: decode_before(raw))
+        selected = held_memory(lambda: decode_after(raw))
+        print(f"  events held:        {full:8.1f} KiB with all fields")
+        print(
+            f"  events held:        {selected:8.1f} KiB with selected fields"
+            f" ({selected / full:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
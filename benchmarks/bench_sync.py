@@ -0,0 +1,239 @@
+"""Sync and query benchmark against a local fake TimeTree server.
+
+For every calendar size this reports:
+
+* sync time of a full chunked sync into the event store,
+* bytes on the wire and after decompression during that sync,
+* peak memory allocated by the client and store during that sync,
+* conversion throughput of raw API events,
+* range query latency for one day and one week windows,
+* full-text search index build time and search latency.
+
+The fake server runs in its own process so its work does not show up in
+the timings or the memory figures. Range queries go through
+``TimeTreeCalendarData.events_between``, the same path as the calendar
+entity's ``async_get_events``, when Home Assistant is installed, and
+through the bare event index otherwise. Responses are decoded with orjson
+when it is installed, as Home Assistant does.
+
+    python benchmarks/bench_sync.py [--sizes 1000,10000,100000]
+        [--chunk-size N] [--latency SECONDS] [--error-rate P]
+        [--no-compression]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+import multiprocessing
+import random
+import statistics
+import time
+import tracemalloc
+
+import aiohttp
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from _loader import load
+from fake_server import FIRST_START_MS, SPREAD_MS, FakeTimeTreeServer, make_event
+
+api = load("timetree_api")
+models = load("models")
+event_index = load("event_index")
+event_store = load("event_store")
+search_index = load("search_index")
+
+CALENDAR_ID = 1
+QUERIES = 200
+
+
+def _serve(options: dict, ports: multiprocessing.Queue) -> None:
+    """Run the fake server until the process is terminated."""
+
+    async def run() -> None:
+        server = FakeTimeTreeServer(**options)
+        await server.start()
+        ports.put(server.base_uri)
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+class ServerProcess:
+    """Fake TimeTree server running in a child process."""
+
+    def __init__(self, **options) -> None:
+        """Prepare the server process."""
+        self._ports: multiprocessing.Queue = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(options, self._ports), daemon=True
+        )
+
+    def __enter__(self) -> str:
+        """Start the server and return its API base URI."""
+        self._process.start()
+        return self._ports.get(timeout=30)
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop the server."""
+        self._process.terminate()
+        self._process.join()
+
+
+async def sync_calendar(
+    base_uri: str,
+) -> tuple[event_store.TimeTreeEventStore, api.TimeTreeRequestStats]:
+    """Sign in and fully sync the benchmark calendar into a new store."""
+    api.API_BASEURI = base_uri
+    store = event_store.TimeTreeEventStore()
+    async with aiohttp.ClientSession() as session:
+        client = api.TimeTreeAPIClient(
+            session, "bench@example.com", "secret", json_loads=json_loads
+        )
+        await client.authenticate()
+        async for chunk in client.iter_events(CALENDAR_ID):
+            store.apply(chunk)
+    return store, client.stats
+
+
+def measure_sync(
+    base_uri: str,
+) -> tuple[float, float, event_store.TimeTreeEventStore, api.TimeTreeRequestStats]:
+    """Return sync time, peak traced memory in MiB, the store and request stats."""
+    began = time.perf_counter()
+    asyncio.run(sync_calendar(base_uri))
+    elapsed = time.perf_counter() - began
+
+    tracemalloc.start()
+    store, stats = asyncio.run(sync_calendar(base_uri))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, store, stats
+
+
+def measure_conversion(size: int) -> tuple[float, float]:
+    """Return events per second for dict conversion and record conversion."""
+    events = [make_event(CALENDAR_ID, number) for number in range(size)]
+    began = time.perf_counter()
+    for event in events:
+        api.convert_timetree_event(event)
+    legacy = size / (time.perf_counter() - began)
+    began = time.perf_counter()
+    for event in events:
+        models.TimeTreeEvent.from_api(event)
+    records = size / (time.perf_counter() - began)
+    return legacy, records
+
+
+def range_query(store: event_store.TimeTreeEventStore):
+    """Return a function querying events between two aware datetimes."""
+    try:
+        from custom_components.timetree.coordinator import TimeTreeCalendarData
+    except ImportError:
+        index = event_index.TimeTreeEventIndex(
+            (event.start, event.end, event) for event in store.events
+        )
+
+        def query(start: datetime, end: datetime) -> list:
+            return [
+                event.span
+                for event in index.overlapping(start.timestamp(), end.timestamp())
+            ]
+
+        return query, "event index"
+
+    return TimeTreeCalendarData(store).events_between, "calendar data"
+
+
+def measure_queries(store: event_store.TimeTreeEventStore, window: timedelta) -> tuple[float, float]:
+    """Return median and 95th percentile query latency in milliseconds."""
+    query, _ = range_query(store)
+    rng = random.Random(7)
+    latencies = []
+    for _ in range(QUERIES):
+        start = datetime.fromtimestamp(
+            (FIRST_START_MS + rng.randrange(SPREAD_MS)) / 1000, timezone.utc
+        )
+        began = time.perf_counter()
+        query(start, start + window)
+        latencies.append((time.perf_counter() - began) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95)]
+
+
+def measure_search(store: event_store.TimeTreeEventStore) -> tuple[float, float, float]:
+    """Return index build time in seconds and median exact and prefix search in ms."""
+    began = time.perf_counter()
+    index = search_index.TimeTreeSearchIndex(store.events)
+    build = time.perf_counter() - began
+    rng = random.Random(7)
+    numbers = [str(rng.randrange(len(store))) for _ in range(QUERIES)]
+
+    def median_latency(prefix: bool) -> float:
+        latencies = []
+        for number in numbers:
+            began = time.perf_counter()
+            index.search(f"event {number}", prefix)
+            latencies.append((time.perf_counter() - began) * 1000)
+        return statistics.median(latencies)
+
+    return build, median_latency(False), median_latency(True)
+
+
+def main() -> None:
+    """Run the benchmark for every requested size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--retry-delay",
+        type=float,
+        default=0.0,
+        help="seconds between chunk retries instead of the integration's back-off",
+    )
+    parser.add_argument(
+        "--compression",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="let the fake server gzip its responses",
+    )
+    args = parser.parse_args()
+    api.CHUNK_RETRY_DELAYS = (args.retry_delay,) * len(api.CHUNK_RETRY_DELAYS)
+
+    for size in (int(size) for size in args.sizes.split(",")):
+        with ServerProcess(
+            calendars={CALENDAR_ID: size},
+            chunk_size=args.chunk_size,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            compress=args.compression,
+        ) as base_uri:
+            sync_time, peak, store, stats = measure_sync(base_uri)
+        legacy_rate, record_rate = measure_conversion(size)
+        day = measure_queries(store, timedelta(days=1))
+        week = measure_queries(store, timedelta(days=7))
+        _, query_path = range_query(store)
+        search_build, search_exact, search_prefix = measure_search(store)
+
+        print(f"{size} events ({len(store)} stored)")
+        print(f"  full sync:          {sync_time:8.2f} s")
+        print(f"  peak memory:        {peak:8.1f} MiB")
+        print(
+            f"  data received:      {stats.bytes_received / 2**20:8.1f} MiB"
+            f" ({stats.bytes_decoded / 2**20:.1f} MiB decoded)"
+        )
+        print(f"  convert to dict:    {legacy_rate:8.0f} events/s")
+        print(f"  convert to record:  {record_rate:8.0f} events/s")
+        print(f"  1 day query:        {day[0]:8.3f} ms median, {day[1]:.3f} ms p95 ({query_path})")
+        print(f"  7 day query:        {week[0]:8.3f} ms median, {week[1]:.3f} ms p95 ({query_path})")
+        print(f"  search index build: {search_build:8.2f} s")
+        print(f"  exact search:       {search_exact:8.3f} ms median")
+        print(f"  prefix search:      {search_prefix:8.3f} ms median")
+
+
+if __name__ == "__main__":
+    main()
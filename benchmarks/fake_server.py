@@ -0,0 +1,193 @@
+"""Local stand-in for the TimeTree API used by the benchmarks.
+
+Implements just enough of the API for the integration's client: signing
+in, listing calendars and the chunked events sync. Events are generated
+on the fly from their position, so large calendars cost no memory on the
+server side, and the ``since`` cursor is simply the position of the next
+event. Besides the fields the integration reads, alert offsets among
+them, events carry the kind of bookkeeping fields TimeTree sends along
+(author, label, attendees, attachments), and responses are gzip
+compressed when asked for.
+"""
+import asyncio
+import random
+from typing import Any
+
+from aiohttp import web
+
+SESSION_ID = "benchmark-session"
+TIMEZONES = ["Europe/Brussels", "Europe/London", "America/New_York", "Asia/Tokyo", "UTC"]
+# Events are spread over two years starting at 2024-01-01 UTC
+FIRST_START_MS = 1_704_067_200_000
+SPREAD_MS = 2 * 365 * 86_400_000
+
+
+def make_event(calendar_id: int, number: int) -> dict[str, Any]:
+    """Return the raw event at a position of a calendar."""
+    rng = random.Random(calendar_id * 1_000_003 + number)
+    all_day = rng.random() < 0.15
+    if all_day:
+        start = FIRST_START_MS + rng.randrange(SPREAD_MS // 86_400_000) * 86_400_000
+        end = start + rng.choice((0, 0, 86_400_000))
+        start_tz = end_tz = "UTC"
+    else:
+        start = FIRST_START_MS + rng.randrange(SPREAD_MS // 60_000) * 60_000
+        end = start + rng.randrange(1, 16) * 15 * 60_000
+        start_tz = end_tz = rng.choice(TIMEZONES)
+    event = {
+        "uuid": f"{calendar_id}-{number:08d}",
+        "title": f"Event {number}",
+        "all_day": all_day,
+        "start_at": start,
+        "start_timezone": start_tz,
+        "end_at": end,
+        "end_timezone": end_tz,
+        "location": "Somewhere" if rng.random() < 0.3 else "",
+        "url": "",
+        "note": "Bring snacks. " * rng.randrange(0, 60),
+        "recurrences": [],
+        "parent_id": None,
+        "deactivated_at": None,
+    }
+    if rng.random() < 0.02:
+        event["recurrences"] = ["RRULE:FREQ=WEEKLY;COUNT=52"]
+    # Alert offsets in minutes, among fields the integration does not read
+    created = start - rng.randrange(1, 90) * 86_400_000
+    event.update(
+        {
+            "id": calendar_id * 100_000_000 + number,
+            "calendar_id": calendar_id,
+            "author_id": rng.randrange(1, 6),
+            "author_type": "user",
+            "label_id": rng.randrange(1, 11),
+            "category": 1,
+            "attendees": rng.sample(range(1, 6), rng.randrange(1, 4)),
+            "alerts": rng.sample((0, 5, 15, 60, 1440), rng.randrange(0, 3)),
+            "file_uuids": [],
+            "attachment": None,
+            "like_count": rng.randrange(0, 4),
+            "created_at": created,
+            "updated_at": created + rng.randrange(0, 86_400_000),
+        }
+    )
+    return event
+
+
+class FakeTimeTreeServer:
+    """Serve generated calendars over HTTP on localhost.
+
+    ``latency`` delays every response by that many seconds, and
+    ``error_rate`` is the chance that a sync request fails with a 503.
+    """
+
+    def __init__(
+        self,
+        calendars: dict[int, int],
+        chunk_size: int = 1000,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 1,
+        compress: bool = True,
+    ) -> None:
+        """Initialize the server with the number of events per calendar."""
+        self.calendars = calendars
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self._port = 0
+
+    @property
+    def base_uri(self) -> str:
+        """Return the API base URI to point the client at."""
+        return f"http://127.0.0.1:{self._port}/api/v1"
+
+    async def start(self) -> None:
+        """Start listening on a free local port."""
+        app = web.Application()
+        app.router.add_put("/api/v1/auth/email/signin", self._signin)
+        app.router.add_get("/api/v1/calendars", self._calendars)
+        app.router.add_get("/api/v1/calendar/{calendar_id}/events/sync", self._sync)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self._port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeTimeTreeServer":
+        """Start the server for the duration of a block."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stop the server at the end of a block."""
+        await self.stop()
+
+    async def _delay(self) -> None:
+        """Count a request and wait for the configured latency."""
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _signed_in(self, request: web.Request) -> bool:
+        """Return True if the request carries the session cookie."""
+        return request.cookies.get("_session_id") == SESSION_ID
+
+    async def _signin(self, request: web.Request) -> web.Response:
+        """Accept any credentials and hand out the session cookie."""
+        await self._delay()
+        response = web.json_response({})
+        response.set_cookie("_session_id", SESSION_ID)
+        return response
+
+    async def _calendars(self, request: web.Request) -> web.Response:
+        """List the generated calendars."""
+        await self._delay()
+        if not self._signed_in(request):
+            return web.json_response({}, status=401)
+        return web.json_response(
+            {
+                "calendars": [
+                    {"id": calendar_id, "name": f"Calendar {calendar_id}"}
+                    for calendar_id in self.calendars
+                ]
+            }
+        )
+
+    async def _sync(self, request: web.Request) -> web.Response:
+        """Return the chunk of events after the ``since`` position."""
+        await self._delay()
+        if not self._signed_in(request):
+            return web.json_response({}, status=401)
+        calendar_id = int(request.match_info["calendar_id"])
+        if calendar_id not in self.calendars:
+            return web.json_response({}, status=404)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({}, status=503)
+
+        total = self.calendars[calendar_id]
+        since = int(request.query.get("since", 0))
+        if since > total:
+            return web.json_response({"error": "invalid since"}, status=400)
+        until = min(since + self.chunk_size, total)
+        response = web.json_response(
+            {
+                "events": [make_event(calendar_id, number) for number in range(since, until)],
+                "since": until,
+                "chunk": until < total,
+            }
+        )
+        if self.compress:
+            response.enable_compression()
+        return response
@@ -1,27 +1,23 @@
 """The TimeTree Calendar integration."""
 import logging
-from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.update_coordinator import (
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
-
-from .const import DOMAIN, CONF_CALENDAR_ID, CONF_UPDATE_INTERVAL
-from .timetree_api import (
-    TimeTreeAPIClient,
-    TimeTreeAuthError,
-    TimeTreeConnectionError,
-    convert_timetree_event,
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+
+from .const import DOMAIN, CONF_CALENDAR_ID
+from .coordinator import (
+    async_get_account,
+    async_release_account,
+    async_remove_cache,
+    merged_calendar_ids,
 )
+from .timetree_api import TimeTreeAuthError, TimeTreeConnectionError
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.CALENDAR]
+PLATFORMS = [Platform.CALENDAR, Platform.SENSOR]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -29,60 +25,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     email = entry.data[CONF_EMAIL]
     password = entry.data[CONF_PASSWORD]
     calendar_id = entry.data[CONF_CALENDAR_ID]
-    update_interval = entry.data.get(CONF_UPDATE_INTERVAL, 30)
 
-    # Create API client
-    client = TimeTreeAPIClient(email, password)
+    # Share one client and coordinator between all calendars of an account
+    account = async_get_account(hass, email, password)
+    account.add_entry(entry)
 
-    # Authenticate
+    # Serve cached events right away, otherwise sign in and fetch initial
+    # data, shared with entries set up at the same time
     try:
-        await hass.async_add_executor_job(client.authenticate)
+        ready = await account.async_ensure_calendar(calendar_id)
     except TimeTreeAuthError as err:
+        account.remove_entry(entry.entry_id)
+        async_release_account(hass, account)
         raise ConfigEntryAuthFailed("Invalid credentials") from err
     except TimeTreeConnectionError as err:
-        _LOGGER.error("Cannot connect to TimeTree: %s", err)
-        return False
-
-    # Create data update coordinator
-    async def async_update_data():
-        """Fetch data from TimeTree API."""
-        try:
-            events_data = await hass.async_add_executor_job(
-                client.get_events, calendar_id
-            )
-            
-            # Convert TimeTree events to Home Assistant format
-            events = [convert_timetree_event(event) for event in events_data]
-            
-            _LOGGER.debug("Updated %d events from TimeTree", len(events))
-            return events
-
-        except TimeTreeAuthError as err:
-            raise ConfigEntryAuthFailed("Authentication failed") from err
-        except TimeTreeConnectionError as err:
-            raise UpdateFailed(f"Error communicating with TimeTree: {err}") from err
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=f"TimeTree Calendar {calendar_id}",
-        update_method=async_update_data,
-        update_interval=timedelta(minutes=update_interval),
-    )
-
-    # Fetch initial data
-    await coordinator.async_config_entry_first_refresh()
+        account.remove_entry(entry.entry_id)
+        async_release_account(hass, account)
+        # Set up again later, TimeTree may only be unreachable for now
+        raise ConfigEntryNotReady(f"Cannot connect to TimeTree: {err}") from err
+
+    if not ready:
+        account.remove_entry(entry.entry_id)
+        async_release_account(hass, account)
+        raise ConfigEntryNotReady("Unable to fetch events from TimeTree")
 
     # Store coordinator
-    hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
-        "coordinator": coordinator,
-        "client": client,
+        "coordinator": account.coordinator,
+        "client": account.client,
+        "account": account,
     }
 
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Apply changed polling bounds from the options flow
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
 
@@ -91,6 +70,26 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        account = hass.data[DOMAIN].pop(entry.entry_id)["account"]
+        account.remove_entry(entry.entry_id)
+        async_release_account(hass, account)
 
     return unload_ok
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached events no other config entry still uses."""
+    in_use = {
+        calendar_id
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+        for calendar_id in (other.data[CONF_CALENDAR_ID], *merged_calendar_ids(other))
+    }
+    for calendar_id in (entry.data[CONF_CALENDAR_ID], *merged_calendar_ids(entry)):
+        if calendar_id not in in_use:
+            await async_remove_cache(hass, calendar_id)
@@ -1,16 +1,53 @@
 """Calendar platform for TimeTree Calendar integration."""
-from datetime import datetime, timedelta
+from dataclasses import replace
+from datetime import date, datetime
 import logging
 from typing import Any
+import uuid
 
-from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+import voluptuous as vol
+
+from homeassistant.components.calendar import (
+    CalendarEntity,
+    CalendarEntityFeature,
+    CalendarEvent,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    HomeAssistant,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_platform
+import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, CONF_CALENDAR_NAME, CONF_CALENDAR_ID
+from .const import (
+    DOMAIN,
+    CONF_CALENDAR_NAME,
+    CONF_CALENDAR_ID,
+    DEFAULT_SEARCH_LIMIT,
+    MAX_SEARCH_LIMIT,
+    SERVICE_GET_UPCOMING,
+    SERVICE_RESYNC,
+    SERVICE_SEARCH_EVENTS,
+    WINDOW_NEXT_7_DAYS,
+)
+from .coordinator import (
+    UPCOMING_WINDOWS,
+    TimeTreeCalendarData,
+    TimeTreeMergedCalendarData,
+    merged_calendar_ids,
+)
+from .models import TimeTreeEvent
+from .outbox import ACTION_CREATE, ACTION_DELETE, ACTION_UPDATE
+from .timetree_api import build_timetree_event
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,12 +62,50 @@ async def async_setup_entry(
     calendar_name = entry.data[CONF_CALENDAR_NAME]
     calendar_id = entry.data[CONF_CALENDAR_ID]
 
-    async_add_entities([TimeTreeCalendarEntity(coordinator, calendar_name, calendar_id, entry.entry_id)], True)
+    entities: list[TimeTreeCalendarEntity] = [
+        TimeTreeCalendarEntity(coordinator, calendar_name, calendar_id, entry.entry_id)
+    ]
+    if merged := merged_calendar_ids(entry):
+        entities.append(
+            TimeTreeMergedCalendarEntity(
+                coordinator, calendar_name, (calendar_id, *merged), entry.entry_id
+            )
+        )
+    async_add_entities(entities, True)
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(SERVICE_RESYNC, {}, "async_resync")
+    platform.async_register_entity_service(
+        SERVICE_GET_UPCOMING,
+        {vol.Optional("window", default=WINDOW_NEXT_7_DAYS): vol.In(UPCOMING_WINDOWS)},
+        "async_get_upcoming",
+        supports_response=SupportsResponse.ONLY,
+    )
+    platform.async_register_entity_service(
+        SERVICE_SEARCH_EVENTS,
+        {
+            vol.Required("query"): cv.string,
+            vol.Optional("prefix", default=True): cv.boolean,
+            vol.Optional("start"): cv.datetime,
+            vol.Optional("end"): cv.datetime,
+            vol.Optional("limit", default=DEFAULT_SEARCH_LIMIT): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_SEARCH_LIMIT)
+            ),
+        },
+        "async_search_events",
+        supports_response=SupportsResponse.ONLY,
+    )
 
 
 class TimeTreeCalendarEntity(CoordinatorEntity, CalendarEntity):
     """Representation of a TimeTree Calendar."""
 
+    _attr_supported_features = (
+        CalendarEntityFeature.CREATE_EVENT
+        | CalendarEntityFeature.UPDATE_EVENT
+        | CalendarEntityFeature.DELETE_EVENT
+    )
+
     def __init__(self, coordinator, calendar_name: str, calendar_id: int, entry_id: str) -> None:
         """Initialize the TimeTree calendar entity."""
         super().__init__(coordinator)
@@ -39,90 +114,165 @@ class TimeTreeCalendarEntity(CoordinatorEntity, CalendarEntity):
         self._attr_name = f"TimeTree {calendar_name}"
         self._attr_unique_id = f"timetree_{calendar_id}"
         self._entry_id = entry_id
+        self._unsub_boundary: CALLBACK_TYPE | None = None
+
+    @property
+    def _calendar(self) -> TimeTreeCalendarData | None:
+        """Return the events of this calendar from the shared coordinator."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(self._calendar_id)
 
     @property
     def event(self) -> CalendarEvent | None:
         """Return the next upcoming event."""
-        if not self.coordinator.data:
+        if not self._calendar:
             return None
 
-        now = dt_util.now()
-        upcoming_events = [
-            event for event in self.coordinator.data
-            if self._get_event_end(event) >= now
-        ]
+        return self._calendar.next_event(dt_util.now())
 
-        if not upcoming_events:
-            return None
+    async def async_added_to_hass(self) -> None:
+        """Start tracking the next event boundary."""
+        await super().async_added_to_hass()
+        self._async_schedule_boundary()
+        self.async_on_remove(self._async_cancel_boundary)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Reschedule the boundary timer for the new events."""
+        self._async_schedule_boundary()
+        super()._handle_coordinator_update()
 
-        # Sort by start time and get the first one
-        upcoming_events.sort(key=lambda x: self._get_event_start(x))
-        next_event = upcoming_events[0]
-
-        return CalendarEvent(
-            start=self._get_event_start(next_event),
-            end=self._get_event_end(next_event),
-            summary=next_event.get("summary", ""),
-            description=next_event.get("description"),
-            location=next_event.get("location"),
-            uid=next_event.get("uid"),
+    @callback
+    def _async_cancel_boundary(self) -> None:
+        """Cancel the pending boundary timer."""
+        if self._unsub_boundary is not None:
+            self._unsub_boundary()
+            self._unsub_boundary = None
+
+    @callback
+    def _async_schedule_boundary(self) -> None:
+        """Wake up exactly when the next event starts or the current one ends."""
+        self._async_cancel_boundary()
+        if (event := self.event) is None:
+            return
+        boundary = event.start if event.start > dt_util.now() else event.end
+        self._unsub_boundary = async_track_point_in_time(
+            self.hass, self._async_boundary_reached, boundary
         )
 
+    @callback
+    def _async_boundary_reached(self, now: datetime) -> None:
+        """Flip the state at an event boundary and track the next one."""
+        self._unsub_boundary = None
+        self._async_schedule_boundary()
+        self.async_write_ha_state()
+
     async def async_get_events(
         self, hass: HomeAssistant, start_date: datetime, end_date: datetime
     ) -> list[CalendarEvent]:
         """Return calendar events within a datetime range."""
-        if not self.coordinator.data:
+        if not self._calendar:
             return []
 
-        events = []
-        for event_data in self.coordinator.data:
-            event_start = self._get_event_start(event_data)
-            event_end = self._get_event_end(event_data)
-
-            # Check if event overlaps with requested range
-            if event_end >= start_date and event_start <= end_date:
-                events.append(
-                    CalendarEvent(
-                        start=event_start,
-                        end=event_end,
-                        summary=event_data.get("summary", ""),
-                        description=event_data.get("description"),
-                        location=event_data.get("location"),
-                        uid=event_data.get("uid"),
-                    )
-                )
-
-        # Sort events by start time
-        events.sort(key=lambda x: x.start)
-        return events
-
-    def _get_event_start(self, event: dict[str, Any]) -> datetime:
-        """Get event start as datetime."""
-        start = event.get("start")
-        if isinstance(start, datetime):
-            # Ensure timezone-aware datetime
-            if start.tzinfo is None:
-                return dt_util.as_local(start)
-            return start
-        # Handle date objects (all-day events) - convert to datetime with timezone
-        return dt_util.start_of_local_day(datetime.combine(start, datetime.min.time()))
-
-    def _get_event_end(self, event: dict[str, Any]) -> datetime:
-        """Get event end as datetime."""
-        end = event.get("end")
-        if isinstance(end, datetime):
-            # Ensure timezone-aware datetime
-            if end.tzinfo is None:
-                return dt_util.as_local(end)
-            return end
-        # Handle date objects (all-day events) - convert to datetime with timezone
-        return dt_util.start_of_local_day(datetime.combine(end, datetime.max.time()))
+        return await self._calendar.async_events_between(start_date, end_date)
+
+    async def async_create_event(self, **kwargs: Any) -> None:
+        """Add a new event to the calendar."""
+        uid = uuid.uuid4().hex
+        await self.coordinator.account.async_change_event(
+            self._calendar_id, ACTION_CREATE, uid, _to_timetree_event(uid, kwargs)
+        )
+
+    async def async_update_event(
+        self,
+        uid: str,
+        event: dict[str, Any],
+        recurrence_id: str | None = None,
+        recurrence_range: str | None = None,
+    ) -> None:
+        """Change an existing event, or a whole recurring series.
+
+        The fields Home Assistant edits are applied on top of the stored
+        event, so TimeTree keeps the ones it does not know, like the url
+        and alerts.
+        """
+        if recurrence_id:
+            raise HomeAssistantError("Changing a single occurrence is not supported")
+        self._raise_if_unknown(uid)
+        existing = await self.coordinator.stores[self._calendar_id].async_get(uid)
+        if existing is None:
+            raise HomeAssistantError(f"Event {uid} not found in this calendar")
+        await self.coordinator.account.async_change_event(
+            self._calendar_id,
+            ACTION_UPDATE,
+            uid,
+            _apply_changes(existing, event).as_api(),
+        )
+
+    async def async_delete_event(
+        self,
+        uid: str,
+        recurrence_id: str | None = None,
+        recurrence_range: str | None = None,
+    ) -> None:
+        """Delete an event, or a whole recurring series."""
+        if recurrence_id:
+            raise HomeAssistantError("Deleting a single occurrence is not supported")
+        self._raise_if_unknown(uid)
+        await self.coordinator.account.async_change_event(
+            self._calendar_id, ACTION_DELETE, uid
+        )
+
+    def _raise_if_unknown(self, uid: str) -> None:
+        """Refuse changes to events that are not in this calendar."""
+        store = self.coordinator.stores.get(self._calendar_id)
+        if store is None or uid not in store:
+            raise HomeAssistantError(f"Event {uid} not found in this calendar")
+
+    async def async_get_upcoming(self, window: str) -> ServiceResponse:
+        """Return the events of a common window from the shared snapshot."""
+        calendar = self._calendar
+        events = calendar.upcoming(window, dt_util.now()) if calendar else []
+        return {
+            "window": window,
+            "version": calendar.version if calendar else None,
+            "events": [_event_data(event) for event in events],
+        }
+
+    async def async_search_events(
+        self,
+        query: str,
+        prefix: bool,
+        limit: int,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> ServiceResponse:
+        """Return events whose summary, description or location match a query."""
+        if start is not None:
+            start = dt_util.as_local(start)
+        if end is not None:
+            end = dt_util.as_local(end)
+        calendar = self._calendar
+        events = await calendar.async_search(query, prefix, start, end) if calendar else []
+        return {
+            "query": query,
+            "total": len(events),
+            "events": [_event_data(event) for event in events[:limit]],
+        }
+
+    async def async_resync(self) -> None:
+        """Drop the sync cursor and download the whole calendar again."""
+        self.coordinator.client.reset_sync(self._calendar_id)
+        await self.coordinator.async_refresh()
 
     @property
     def available(self) -> bool:
-        """Return if entity is available."""
-        return self.coordinator.last_update_success
+        """Return if entity is available.
+
+        Cached events keep the calendar available while TimeTree is offline.
+        """
+        return self.coordinator.last_update_success or bool(self._calendar)
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
@@ -130,5 +280,127 @@ class TimeTreeCalendarEntity(CoordinatorEntity, CalendarEntity):
         return {
             "calendar_id": self._calendar_id,
             "calendar_name": self._calendar_name,
-            "event_count": len(self.coordinator.data) if self.coordinator.data else 0,
+            "event_count": len(self._calendar) if self._calendar else 0,
+        }
+
+
+class TimeTreeMergedCalendarEntity(TimeTreeCalendarEntity):
+    """Read-only calendar showing the events of several TimeTree calendars."""
+
+    _attr_supported_features = CalendarEntityFeature(0)
+
+    def __init__(
+        self,
+        coordinator,
+        calendar_name: str,
+        calendar_ids: tuple[int, ...],
+        entry_id: str,
+    ) -> None:
+        """Initialize the merged calendar of an entry."""
+        super().__init__(coordinator, calendar_name, calendar_ids[0], entry_id)
+        self._calendar_ids = calendar_ids
+        self._attr_name = f"TimeTree {calendar_name} merged"
+        self._attr_unique_id = f"timetree_{calendar_ids[0]}_merged"
+        self._sources: tuple[TimeTreeCalendarData, ...] = ()
+        self._merged: TimeTreeMergedCalendarData | None = None
+        self._last_state: tuple[tuple[TimeTreeCalendarData, ...], bool] | None = None
+
+    def _source_data(self) -> tuple[TimeTreeCalendarData, ...]:
+        """Return the current data of the merged calendars that have any."""
+        data = self.coordinator.data or {}
+        return tuple(
+            data[calendar_id] for calendar_id in self._calendar_ids if calendar_id in data
+        )
+
+    @property
+    def _calendar(self) -> TimeTreeMergedCalendarData | None:
+        """Return the merged view, rebuilt only when a source changed."""
+        sources = self._source_data()
+        if not sources:
+            return None
+        if sources != self._sources:
+            self._sources = sources
+            self._merged = TimeTreeMergedCalendarData(list(sources))
+        return self._merged
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Skip the update unless a merged calendar or availability changed."""
+        state = (self._source_data(), self.coordinator.last_update_success)
+        if state == self._last_state:
+            return
+        self._last_state = state
+        super()._handle_coordinator_update()
+
+    async def async_resync(self) -> None:
+        """Drop the sync cursors and download all merged calendars again."""
+        for calendar_id in self._calendar_ids:
+            self.coordinator.client.reset_sync(calendar_id)
+        await self.coordinator.async_refresh()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        return {
+            "calendar_ids": list(self._calendar_ids),
+            "calendar_name": self._calendar_name,
+            "event_count": len(self._calendar) if self._calendar else 0,
         }
+
+
+def _event_data(event: CalendarEvent) -> dict[str, Any]:
+    """Return an event as service response data."""
+    return {
+        "uid": event.uid,
+        "summary": event.summary,
+        "start": event.start.isoformat(),
+        "end": event.end.isoformat(),
+        "description": event.description,
+        "location": event.location,
+    }
+
+
+def _apply_changes(existing: TimeTreeEvent, event: dict[str, Any]) -> TimeTreeEvent:
+    """Return a stored event with the fields Home Assistant passes replaced.
+
+    A new rule replaces the RRULE lines of a series and keeps its other
+    lines, like excluded dates.
+    """
+    edited = TimeTreeEvent.from_api(_to_timetree_event(existing.uid, event))
+    recurrences = None
+    if edited.recurrences:
+        recurrences = edited.recurrences + tuple(
+            line
+            for line in existing.recurrences or ()
+            if not line.startswith("RRULE")
+        )
+    return replace(
+        existing,
+        summary=edited.summary,
+        start=edited.start,
+        end=edited.end,
+        start_tz=edited.start_tz,
+        end_tz=edited.end_tz,
+        all_day=edited.all_day,
+        location=edited.location,
+        note=edited.note,
+        recurrences=recurrences,
+    )
+
+
+def _to_timetree_event(uid: str, event: dict[str, Any]) -> dict[str, Any]:
+    """Build a TimeTree payload from the event fields Home Assistant passes."""
+    start: datetime | date = event["dtstart"]
+    end: datetime | date = event["dtend"]
+    if isinstance(start, datetime):
+        start = dt_util.as_local(start)
+        end = dt_util.as_local(end)
+    return build_timetree_event(
+        uid,
+        summary=event["summary"],
+        start=start,
+        end=end,
+        description=event.get("description"),
+        location=event.get("location"),
+        rrule=event.get("rrule"),
+    )
@@ -0,0 +1,272 @@
+"""On-disk tier of old and far future events for the TimeTree Calendar integration."""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .const import COLD_TIER_IDLE_TIMEOUT, DOMAIN
+from .event_index import TimeTreeEventIndex
+from .models import TimeTreeEvent
+from .search_index import TimeTreeSearchIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def cold_tier_path(hass: HomeAssistant, calendar_id: int) -> Path:
+    """Return the file holding the cold tier of a calendar."""
+    return Path(hass.config.path(STORAGE_DIR, f"{DOMAIN}.cold_{calendar_id}.json.gz"))
+
+
+def _digest(event: TimeTreeEvent) -> int:
+    """Return a digest of a record that is stable across restarts."""
+    return int.from_bytes(
+        hashlib.blake2b(repr(event).encode(), digest_size=8).digest(), "big"
+    )
+
+
+class TimeTreeColdTier:
+    """Events of one calendar outside the retention window.
+
+    Only their uids and digests stay in memory. The records live in a gzip
+    compressed file, loaded when a query reaches outside the window and
+    released again once no query used them for COLD_TIER_IDLE_TIMEOUT
+    seconds. Changes made while the records are not loaded wait aside until
+    the next load. The file may hold more records than the tier; only known
+    uids are used.
+    """
+
+    def __init__(self, hass: HomeAssistant, calendar_id: int) -> None:
+        """Initialize an empty cold tier."""
+        self.hass = hass
+        self._path = cold_tier_path(hass, calendar_id)
+        self.uids: set[str] = set()
+        # Digest of every record, to tell unchanged events without loading them
+        self._digests: dict[str, int] = {}
+        # Latest end of the events before the window and earliest start of
+        # the events after it, to know when the window reaches into the tier
+        self.past_end: float | None = None
+        self.future_start: float | None = None
+        self.dirty = False
+        self._events: dict[str, TimeTreeEvent] | None = None
+        self._changes: dict[str, TimeTreeEvent | None] = {}
+        self._index: TimeTreeEventIndex[TimeTreeEvent] | None = None
+        self._search_index: TimeTreeSearchIndex | None = None
+        self._lock = asyncio.Lock()
+        self._unsub_unload: CALLBACK_TYPE | None = None
+
+    def __len__(self) -> int:
+        """Return the number of events in the tier."""
+        return len(self.uids)
+
+    def __contains__(self, uid: object) -> bool:
+        """Return True if an event is in the tier."""
+        return uid in self.uids
+
+    def holds(self, event: TimeTreeEvent) -> bool:
+        """Return True if the tier has this exact version of an event."""
+        return self._digests.get(event.uid) == _digest(event)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return what the on-disk event cache keeps about the tier."""
+        return {
+            "uids": list(self.uids),
+            "digests": self._digests,
+            "past_end": self.past_end,
+            "future_start": self.future_start,
+        }
+
+    def load_dict(self, data: dict[str, Any]) -> None:
+        """Restore the tier from the on-disk event cache."""
+        self.uids = set(data["uids"])
+        self._digests = data.get("digests", {})
+        self.past_end = data["past_end"]
+        self.future_start = data["future_start"]
+        self._events = None
+        self._changes = {}
+        self._index = None
+        self._search_index = None
+
+    def put(self, event: TimeTreeEvent, past: bool) -> None:
+        """Add or replace an event that ended before or starts after the window."""
+        self.uids.add(event.uid)
+        self._digests[event.uid] = _digest(event)
+        if past:
+            if self.past_end is None or event.end > self.past_end:
+                self.past_end = event.end
+        elif self.future_start is None or event.start < self.future_start:
+            self.future_start = event.start
+        self._set(event.uid, event)
+        self.dirty = True
+
+    def discard(self, uid: str) -> bool:
+        """Remove an event, return True if it was in the tier."""
+        if uid not in self.uids:
+            return False
+        self.uids.discard(uid)
+        self._digests.pop(uid, None)
+        # The record may stay in the file, it is ignored without its uid
+        self._set(uid, None)
+        return True
+
+    def replace(self, events: list[TimeTreeEvent], window_start: float) -> None:
+        """Replace the whole tier after a full sync."""
+        self.uids = set()
+        self._digests = {}
+        self.past_end = self.future_start = None
+        self._events = {}
+        self._changes = {}
+        self._search_index = None
+        for event in events:
+            self.put(event, event.end < window_start)
+        self.dirty = True
+
+    def reaches_into(self, start: float, end: float) -> bool:
+        """Return True if a window of epoch seconds overlaps events of the tier."""
+        return (self.past_end is not None and self.past_end >= start) or (
+            self.future_start is not None and self.future_start <= end
+        )
+
+    def _set(self, uid: str, event: TimeTreeEvent | None) -> None:
+        """Record a change, in the records if loaded and aside otherwise."""
+        self._index = None
+        if self._events is None:
+            self._changes[uid] = event
+        elif event is None:
+            self._events.pop(uid, None)
+        else:
+            self._events[uid] = event
+        if self._search_index is not None:
+            if event is None:
+                self._search_index.remove(uid)
+            else:
+                self._search_index.add(event)
+
+    async def _async_load(self) -> dict[str, TimeTreeEvent]:
+        """Return the records, loading them from disk if needed."""
+        async with self._lock:
+            if self._events is None:
+                rows = await self.hass.async_add_executor_job(self._read)
+                # Changes made while reading are in _changes too
+                if self._events is None:
+                    events = {row[0]: TimeTreeEvent.from_row(row) for row in rows}
+                    for uid, event in self._changes.items():
+                        if event is None:
+                            events.pop(uid, None)
+                        else:
+                            events[uid] = event
+                    self._events = {
+                        uid: event for uid, event in events.items() if uid in self.uids
+                    }
+                    self._changes = {}
+                    _LOGGER.debug(
+                        "Loaded %d cold events from %s", len(self._events), self._path
+                    )
+        self._async_schedule_unload()
+        return self._events
+
+    async def async_get(self, uid: str) -> TimeTreeEvent | None:
+        """Return an event of the tier by uid."""
+        if uid not in self.uids:
+            return None
+        return (await self._async_load()).get(uid)
+
+    async def async_overlapping(self, start: float, end: float) -> list[TimeTreeEvent]:
+        """Return events overlapping a range of epoch seconds, by start time."""
+        if not self.uids:
+            return []
+        events = await self._async_load()
+        if self._index is None:
+            self._index = TimeTreeEventIndex(
+                (event.start, event.end, event) for event in events.values()
+            )
+        return self._index.overlapping(start, end)
+
+    async def async_search(
+        self, query: str, prefix: bool, start: float | None, end: float | None
+    ) -> list[TimeTreeEvent]:
+        """Return events matching a full-text query, by start time.
+
+        The search index is built on first use and released with the records.
+        """
+        if not self.uids:
+            return []
+        events = await self._async_load()
+        if self._search_index is None:
+            self._search_index = TimeTreeSearchIndex(events.values())
+        return self._search_index.search(query, prefix, start, end)
+
+    async def async_pop_within(self, start: float, end: float) -> list[TimeTreeEvent]:
+        """Take the events a window of epoch seconds now overlaps out of the tier."""
+        events = await self._async_load()
+        within = [
+            event for event in events.values() if event.end >= start and event.start <= end
+        ]
+        for event in within:
+            self.discard(event.uid)
+        self.past_end = max(
+            (event.end for event in events.values() if event.end < start), default=None
+        )
+        self.future_start = min(
+            (event.start for event in events.values() if event.start > end), default=None
+        )
+        return within
+
+    async def async_save(self) -> None:
+        """Write the tier to disk if it changed."""
+        if not self.dirty:
+            return
+        events = await self._async_load()
+        self.dirty = False
+        rows = [event.as_row() for event in events.values()]
+        async with self._lock:
+            await self.hass.async_add_executor_job(self._write, rows)
+
+    def _read(self) -> list[list[Any]]:
+        """Read the records from disk."""
+        try:
+            with gzip.open(self._path, "rt", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return []
+
+    def _write(self, rows: list[list[Any]]) -> None:
+        """Write the records to disk atomically."""
+        temp_path = self._path.with_name(f"{self._path.name}.tmp")
+        with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+            json.dump(rows, file, separators=(",", ":"))
+        os.replace(temp_path, self._path)
+
+    @callback
+    def _async_schedule_unload(self) -> None:
+        """Release the records once no query needed them for a while."""
+        self.async_close()
+        self._unsub_unload = async_call_later(
+            self.hass, COLD_TIER_IDLE_TIMEOUT, self._async_unload
+        )
+
+    @callback
+    def _async_unload(self, _now: Any) -> None:
+        """Release the records, keeping only the uids and digests in memory."""
+        self._unsub_unload = None
+        if self.dirty:
+            # Not written yet, try again later
+            self._async_schedule_unload()
+            return
+        self._events = None
+        self._index = None
+        self._search_index = None
+
+    @callback
+    def async_close(self) -> None:
+        """Cancel the pending release of the records."""
+        if self._unsub_unload is not None:
+            self._unsub_unload()
+            self._unsub_unload = None
@@ -1,4 +1,5 @@
 """Config flow for TimeTree Calendar integration."""
+from collections.abc import Mapping
 import logging
 from typing import Any
 
@@ -6,21 +7,38 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util.json import json_loads
 
 from .const import (
     DOMAIN,
     CONF_CALENDAR_ID,
     CONF_CALENDAR_NAME,
     CONF_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MERGED_CALENDARS,
+    CONF_RETENTION_PAST_DAYS,
+    CONF_RETENTION_FUTURE_DAYS,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_RETENTION_PAST_DAYS,
+    DEFAULT_RETENTION_FUTURE_DAYS,
     UPDATE_INTERVAL_OPTIONS,
     ERROR_AUTH_FAILED,
     ERROR_CANNOT_CONNECT,
     ERROR_UNKNOWN,
 )
+from .coordinator import (
+    async_get_account,
+    async_get_session,
+    async_release_account,
+    async_update_password,
+)
 from .timetree_api import (
     TimeTreeAPIClient,
     TimeTreeAuthError,
@@ -31,12 +49,28 @@ _LOGGER = logging.getLogger(__name__)
 
 
 async def validate_auth(hass: HomeAssistant, email: str, password: str) -> dict[str, Any]:
-    """Validate the user credentials and return calendar list."""
-    client = TimeTreeAPIClient(email, password)
-    
+    """Validate the user credentials and return calendar list.
+
+    Reuses the running account of the login, so its session and cached
+    calendar list are shared with the calendars already set up. A new
+    account is released again, as the flow may still be abandoned or
+    aborted; its saved session is picked up when the entry is set up.
+    """
+    account = async_get_account(hass, email, password)
+
     try:
-        await hass.async_add_executor_job(client.authenticate)
-        calendars = await hass.async_add_executor_job(client.get_calendars)
+        if account.client.password != password:
+            # The login is in use with another password, check this one alone
+            client = TimeTreeAPIClient(
+                async_get_session(hass), email, password, json_loads=json_loads
+            )
+            await client.authenticate()
+            calendars = await client.get_calendars()
+        else:
+            if not account.has_entries:
+                # A saved session alone does not prove the password
+                await account.async_verify_credentials()
+            calendars = await account.async_get_calendars()
         
         if not calendars:
             raise NoCalendarsError("No active calendars found")
@@ -47,6 +81,8 @@ async def validate_auth(hass: HomeAssistant, email: str, password: str) -> dict[
         raise InvalidAuth from err
     except TimeTreeConnectionError as err:
         raise CannotConnect from err
+    finally:
+        async_release_account(hass, account)
 
 
 class TimeTreeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -54,6 +90,14 @@ class TimeTreeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> "TimeTreeOptionsFlow":
+        """Get the options flow for this handler."""
+        return TimeTreeOptionsFlow(config_entry)
+
     def __init__(self) -> None:
         """Initialize the config flow."""
         self.email = None
@@ -171,6 +215,147 @@ class TimeTreeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Ask for the password again after TimeTree rejected it."""
+        self.email = entry_data[CONF_EMAIL]
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Check the new password and apply it to every entry of the login."""
+        errors = {}
+
+        if user_input is not None:
+            password = user_input[CONF_PASSWORD]
+            client = TimeTreeAPIClient(
+                async_get_session(self.hass), self.email, password, json_loads=json_loads
+            )
+            try:
+                await client.authenticate()
+            except TimeTreeAuthError:
+                errors["base"] = ERROR_AUTH_FAILED
+            except TimeTreeConnectionError:
+                errors["base"] = ERROR_CANNOT_CONNECT
+            else:
+                async_update_password(self.hass, self.email, password)
+                updated = set()
+                for entry in self.hass.config_entries.async_entries(DOMAIN):
+                    if entry.data[CONF_EMAIL].lower() == self.email.lower():
+                        self.hass.config_entries.async_update_entry(
+                            entry, data={**entry.data, CONF_PASSWORD: password}
+                        )
+                        self.hass.config_entries.async_schedule_reload(entry.entry_id)
+                        updated.add(entry.entry_id)
+                # Every entry of the login asked; one answer covers them all
+                for flow in self._async_in_progress():
+                    if (
+                        flow["flow_id"] != self.flow_id
+                        and flow["context"].get("source") == config_entries.SOURCE_REAUTH
+                        and flow["context"].get("entry_id") in updated
+                    ):
+                        self.hass.config_entries.flow.async_abort(flow["flow_id"])
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({vol.Required(CONF_PASSWORD): str}),
+            errors=errors,
+            description_placeholders={"email": self.email},
+        )
+
+
+class TimeTreeOptionsFlow(config_entries.OptionsFlow):
+    """Handle TimeTree Calendar options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the polling interval bounds, retention and merged calendars."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input[CONF_MIN_UPDATE_INTERVAL] > user_input[CONF_MAX_UPDATE_INTERVAL]:
+                errors["base"] = "invalid_interval_bounds"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        calendar_options = await self._async_other_calendars()
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_MIN_UPDATE_INTERVAL,
+                    default=options.get(
+                        CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1440)),
+                vol.Required(
+                    CONF_MAX_UPDATE_INTERVAL,
+                    default=options.get(
+                        CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1440)),
+                vol.Required(
+                    CONF_RETENTION_PAST_DAYS,
+                    default=options.get(
+                        CONF_RETENTION_PAST_DAYS, DEFAULT_RETENTION_PAST_DAYS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=36500)),
+                vol.Required(
+                    CONF_RETENTION_FUTURE_DAYS,
+                    default=options.get(
+                        CONF_RETENTION_FUTURE_DAYS, DEFAULT_RETENTION_FUTURE_DAYS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=8, max=36500)),
+                vol.Optional(
+                    CONF_MERGED_CALENDARS,
+                    default=[
+                        calendar_id
+                        for calendar_id in options.get(CONF_MERGED_CALENDARS, [])
+                        if calendar_id in calendar_options
+                    ],
+                ): cv.multi_select(calendar_options),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=data_schema,
+            errors=errors,
+        )
+
+    async def _async_other_calendars(self) -> dict[str, str]:
+        """Return the other calendars of the login that can be merged in.
+
+        Falls back to the calendars already merged if TimeTree cannot be
+        reached, so saving the options keeps them.
+        """
+        own = self._entry.data[CONF_CALENDAR_ID]
+        account = async_get_account(
+            self.hass, self._entry.data[CONF_EMAIL], self._entry.data[CONF_PASSWORD]
+        )
+        try:
+            calendars = await account.async_get_calendars()
+        except (TimeTreeAuthError, TimeTreeConnectionError) as err:
+            _LOGGER.warning("Cannot list TimeTree calendars: %s", err)
+            return {
+                calendar_id: calendar_id
+                for calendar_id in self._entry.options.get(CONF_MERGED_CALENDARS, [])
+            }
+        finally:
+            async_release_account(self.hass, account)
+        return {
+            str(cal["id"]): cal.get("name", "Unnamed Calendar")
+            for cal in calendars
+            if cal["id"] != own
+        }
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
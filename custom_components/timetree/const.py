@@ -2,13 +2,47 @@
 
 DOMAIN = "timetree"
 
+# hass.data key holding the shared accounts, keyed by lowercase email
+DATA_ACCOUNTS = "accounts"
+# hass.data key holding the on-disk event caches, keyed by calendar id
+DATA_CACHES = "caches"
+# hass.data key holding the cookie-less HTTP session of all TimeTree clients
+DATA_SESSION = "session"
+
 # Configuration keys
 CONF_CALENDAR_ID = "calendar_id"
 CONF_CALENDAR_NAME = "calendar_name"
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+CONF_MERGED_CALENDARS = "merged_calendars"
+CONF_RETENTION_PAST_DAYS = "retention_past_days"
+CONF_RETENTION_FUTURE_DAYS = "retention_future_days"
 
 # Default values
 DEFAULT_UPDATE_INTERVAL = 30  # minutes
+DEFAULT_MIN_UPDATE_INTERVAL = 5  # minutes
+DEFAULT_MAX_UPDATE_INTERVAL = 120  # minutes
+DEFAULT_RETENTION_PAST_DAYS = 90
+DEFAULT_RETENTION_FUTURE_DAYS = 730
+
+# On-disk event cache
+STORAGE_VERSION = 1
+CACHE_SAVE_DELAY = 30  # seconds
+
+# Events outside the retention window, compressed on disk
+COLD_TIER_IDLE_TIMEOUT = 300  # seconds loaded events stay in memory after a query
+
+# Queued event changes
+STORAGE_VERSION_OUTBOX = 1
+OUTBOX_SAVE_DELAY = 1  # seconds
+
+# Cached calendar list of an account
+CALENDARS_CACHE_TTL = 300  # seconds
+
+# Saved TimeTree session
+STORAGE_VERSION_SESSION = 1
+SESSION_SAVE_DELAY = 1  # seconds
 
 # Update interval options (in minutes)
 UPDATE_INTERVAL_OPTIONS = {
@@ -18,10 +52,42 @@ UPDATE_INTERVAL_OPTIONS = {
     60: "1 hour",
 }
 
+# Services
+SERVICE_RESYNC = "resync"
+SERVICE_GET_UPCOMING = "get_upcoming"
+SERVICE_SEARCH_EVENTS = "search_events"
+
+# Largest number of events the search_events service returns
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 1000
+
+# Bus events fired for events added, changed or removed in TimeTree
+EVENT_EVENT_ADDED = f"{DOMAIN}_event_added"
+EVENT_EVENT_UPDATED = f"{DOMAIN}_event_updated"
+EVENT_EVENT_REMOVED = f"{DOMAIN}_event_removed"
+
+# Bus event fired when an alert of a TimeTree event is due
+EVENT_REMINDER = f"{DOMAIN}_reminder"
+
+# Windows of the get_upcoming service
+WINDOW_TODAY = "today"
+WINDOW_NEXT_24H = "next_24h"
+WINDOW_NEXT_7_DAYS = "next_7_days"
+
 # API constants
 API_BASEURI = "https://timetreeapp.com/api/v1"
 API_USER_AGENT = "web/2.1.0/en"
 
+# Events sync paging
+DEFAULT_MAX_CHUNKS = 1000
+DEFAULT_MAX_CHUNK_BYTES = 32 * 1024 * 1024
+CHUNK_RETRY_DELAYS = (1, 4, 16)  # seconds between attempts for one chunk
+
+# Request concurrency and rate limiting, shared by the calendars of an account
+DEFAULT_MAX_CONCURRENT_SYNCS = 4
+DEFAULT_REQUEST_RATE = 5  # requests per second
+DEFAULT_REQUEST_BURST = 10
+
 # Error messages
 ERROR_AUTH_FAILED = "authentication_failed"
 ERROR_CANNOT_CONNECT = "cannot_connect"
@@ -0,0 +1,1156 @@
+"""Account level client and coordinator for the TimeTree Calendar integration."""
+import asyncio
+from collections.abc import Iterable
+from dataclasses import replace
+import hashlib
+import heapq
+from datetime import date, datetime, timedelta
+from functools import partial
+import logging
+import time
+from typing import Any, NamedTuple
+
+import aiohttp
+
+from homeassistant.components.calendar import CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .const import (
+    CACHE_SAVE_DELAY,
+    CALENDARS_CACHE_TTL,
+    CONF_CALENDAR_ID,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MERGED_CALENDARS,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_RETENTION_FUTURE_DAYS,
+    CONF_RETENTION_PAST_DAYS,
+    CONF_UPDATE_INTERVAL,
+    DATA_ACCOUNTS,
+    DATA_CACHES,
+    DATA_SESSION,
+    DEFAULT_MAX_CONCURRENT_SYNCS,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_RETENTION_FUTURE_DAYS,
+    DEFAULT_RETENTION_PAST_DAYS,
+    DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
+    EVENT_EVENT_ADDED,
+    EVENT_EVENT_REMOVED,
+    EVENT_EVENT_UPDATED,
+    EVENT_REMINDER,
+    SESSION_SAVE_DELAY,
+    STORAGE_VERSION,
+    STORAGE_VERSION_SESSION,
+    WINDOW_NEXT_24H,
+    WINDOW_NEXT_7_DAYS,
+    WINDOW_TODAY,
+)
+from .cold_tier import TimeTreeColdTier, cold_tier_path
+from .event_index import TimeTreeEventIndex
+from .event_store import TimeTreeEventStore
+from .metrics import CalendarRefreshMetrics, RefreshHistory, RefreshMetrics
+from .models import TimeTreeEvent
+from .outbox import TimeTreeOutbox
+from .recurrence import TimeTreeRecurrence, parse_recurrence_id
+from .reminders import TimeTreeReminderScheduler
+from .scheduler import NEAR_BOUNDARY, TimeTreePollScheduler
+from .timetree_api import (
+    TimeTreeAPIClient,
+    TimeTreeAuthError,
+    TimeTreeConnectionError,
+    TimeTreeRateLimitError,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _normalize_start(start: datetime | date) -> datetime:
+    """Get an event start as aware datetime."""
+    if isinstance(start, datetime):
+        # Ensure timezone-aware datetime
+        if start.tzinfo is None:
+            return dt_util.as_local(start)
+        return start
+    # Handle date objects (all-day events) - convert to datetime with timezone
+    return dt_util.start_of_local_day(datetime.combine(start, datetime.min.time()))
+
+
+def _normalize_end(end: datetime | date) -> datetime:
+    """Get an event end as aware datetime."""
+    if isinstance(end, datetime):
+        # Ensure timezone-aware datetime
+        if end.tzinfo is None:
+            return dt_util.as_local(end)
+        return end
+    # Handle date objects (all-day events) - convert to datetime with timezone
+    return dt_util.start_of_local_day(datetime.combine(end, datetime.max.time()))
+
+
+def _to_calendar_event(
+    event: TimeTreeEvent,
+    start: datetime | date | None = None,
+    end: datetime | date | None = None,
+) -> CalendarEvent:
+    """Build a normalized CalendarEvent from a record or one of its occurrences."""
+    if start is None or end is None:
+        start, end = event.span
+    return CalendarEvent(
+        start=_normalize_start(start),
+        end=_normalize_end(end),
+        summary=event.summary,
+        description=event.description,
+        location=event.location,
+        uid=event.uid,
+    )
+
+
+def _change_data(
+    calendar_id: int,
+    event: TimeTreeEvent,
+    span: tuple[datetime | date, datetime | date] | None = None,
+) -> dict[str, Any]:
+    """Return the data of a bus event about an event or one of its occurrences."""
+    start, end = span or event.span
+    return {
+        "calendar_id": calendar_id,
+        "uid": event.uid,
+        "summary": event.summary,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "all_day": event.all_day,
+        "location": event.location,
+        "description": event.description,
+        "recurring": bool(event.recurrences),
+    }
+
+
+def _index_span(event: TimeTreeEvent) -> tuple[float, float]:
+    """Return the normalized start and end of a record in epoch seconds.
+
+    Timed records already hold them; all-day records cover local days.
+    """
+    if not event.all_day:
+        return event.start, event.end
+    start, end = event.span
+    return _normalize_start(start).timestamp(), _normalize_end(end).timestamp()
+
+
+def build_event_index(
+    events: list[TimeTreeEvent],
+) -> TimeTreeEventIndex[TimeTreeEvent]:
+    """Index records by time, leaving their conversion to the queries."""
+    return TimeTreeEventIndex((*_index_span(event), event) for event in events)
+
+
+# Length of the common windows, see TimeTreeCalendarData.upcoming
+UPCOMING_WINDOWS = {
+    WINDOW_TODAY: timedelta(days=1),
+    WINDOW_NEXT_24H: timedelta(hours=24),
+    WINDOW_NEXT_7_DAYS: timedelta(days=7),
+}
+# The snapshot covers the next seven days from any moment of its day
+SNAPSHOT_SPAN = timedelta(days=8)
+
+
+class TimeTreeCalendarData:
+    """Indexed single events and lazily expanded series of one calendar."""
+
+    def __init__(self, store: TimeTreeEventStore) -> None:
+        """Split the store into indexed events and recurring series."""
+        self.version = store.version
+        # Events outside the retention window, queried only when needed
+        self.cold = store.cold
+        self.window = store.window
+        self.search_index = store.search_index
+        # Local day start, end and events of the shared upcoming snapshot
+        self._snapshot: tuple[datetime, datetime, tuple[CalendarEvent, ...]] | None = None
+        # Events with alerts, for the reminder scheduler
+        self.alerted: dict[str, TimeTreeEvent] = {}
+        singles: list[TimeTreeEvent] = []
+        self.series: list[TimeTreeRecurrence] = []
+        for event in store.events:
+            if event.alerts:
+                self.alerted[event.uid] = event
+            if event.recurrences and (
+                recurrence := store.recurrence(event.uid)
+            ) is not None:
+                self.series.append(recurrence)
+            else:
+                singles.append(event)
+        self.index = build_event_index(singles)
+
+        # Occurrences replaced by an edited single instance, per series
+        self.series_by_uid = {
+            recurrence.event.uid: recurrence for recurrence in self.series
+        }
+        self.overridden: dict[str, set[date]] = {}
+        for event in singles:
+            if (recurrence := self.series_by_uid.get(event.parent_uid)) is None:
+                continue
+            original = None
+            if event.recurrence_id is not None:
+                original = parse_recurrence_id(event.recurrence_id)
+            self.overridden.setdefault(event.parent_uid, set()).add(
+                recurrence.occurrence_key(original or event.dtstart)
+            )
+
+    def __len__(self) -> int:
+        """Return the number of single events and series."""
+        return len(self.index) + len(self.series)
+
+    def events_between(self, start: datetime, end: datetime) -> list[CalendarEvent]:
+        """Return events and occurrences overlapping a range, by start time.
+
+        Ranges within the current snapshot are filtered from it instead of
+        being expanded and sorted again.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot[0] <= start and end <= snapshot[1]:
+            return [
+                event
+                for event in snapshot[2]
+                if event.end >= start and event.start <= end
+            ]
+        return self._query(start, end)
+
+    async def async_events_between(
+        self, start: datetime, end: datetime
+    ) -> list[CalendarEvent]:
+        """Return events overlapping a range, including the cold tier if reached.
+
+        The cold tier is only loaded from disk for ranges reaching outside
+        the retention window.
+        """
+        events = self.events_between(start, end)
+        if not self.cold or (
+            self.window is not None
+            and self.window[0] <= start.timestamp()
+            and end.timestamp() <= self.window[1]
+        ):
+            return events
+        # Widened by a day, all-day events are normalized to local days
+        records = await self.cold.async_overlapping(
+            start.timestamp() - 86400, end.timestamp() + 86400
+        )
+        cold = [
+            calendar_event
+            for calendar_event in map(_to_calendar_event, records)
+            if calendar_event.end >= start and calendar_event.start <= end
+        ]
+        if not cold:
+            return events
+        cold.sort(key=lambda event: event.start)
+        return merge_events((events, cold))
+
+    async def async_search(
+        self,
+        query: str,
+        prefix: bool = True,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[CalendarEvent]:
+        """Return events matching a full-text query, by start time.
+
+        Matching series are expanded to their occurrences in the range, or
+        returned once without a complete range. The cold tier is searched
+        only when the range is open or reaches outside the retention window.
+        """
+        # Widened by a day, all-day events are normalized to local days
+        start_ts = start.timestamp() - 86400 if start is not None else None
+        end_ts = end.timestamp() + 86400 if end is not None else None
+        records = self.search_index.search(query, prefix, start_ts, end_ts)
+        if self.cold and not (
+            self.window is not None
+            and start is not None
+            and end is not None
+            and self.window[0] <= start.timestamp()
+            and end.timestamp() <= self.window[1]
+        ):
+            records.extend(await self.cold.async_search(query, prefix, start_ts, end_ts))
+
+        events = []
+        for record in records:
+            recurrence = self.series_by_uid.get(record.uid)
+            if recurrence is not None and start is not None and end is not None:
+                events.extend(
+                    _to_calendar_event(record, occurrence_start, occurrence_end)
+                    for occurrence_start, occurrence_end in recurrence.between(
+                        dt_util.as_local(start),
+                        dt_util.as_local(end),
+                        self.overridden.get(record.uid),
+                    )
+                )
+                continue
+            event = _to_calendar_event(record)
+            if recurrence is not None or (
+                (start is None or event.end >= start)
+                and (end is None or event.start <= end)
+            ):
+                events.append(event)
+        events.sort(key=lambda event: event.start)
+        return events
+
+    def upcoming(self, window: str, now: datetime) -> list[CalendarEvent]:
+        """Return the events of a common window, by start time.
+
+        All windows are cut from one snapshot of the local day of now and
+        the week after it, shared by every reader until the day changes.
+        Events that ended before now are left out.
+        """
+        day = dt_util.start_of_local_day(now)
+        if self._snapshot is None or self._snapshot[0] != day:
+            end = day + SNAPSHOT_SPAN
+            self._snapshot = (day, end, tuple(self._query(day, end)))
+        if window == WINDOW_TODAY:
+            window_start, window_end = day, day + timedelta(days=1)
+        else:
+            window_start, window_end = now, now + UPCOMING_WINDOWS[window]
+        return [
+            event
+            for event in self._snapshot[2]
+            if event.end > max(now, window_start) and event.start < window_end
+        ]
+
+    def _query(self, start: datetime, end: datetime) -> list[CalendarEvent]:
+        """Return events and occurrences overlapping a range from the index."""
+        events = [
+            _to_calendar_event(event)
+            for event in self.index.overlapping(start.timestamp(), end.timestamp())
+        ]
+        if not self.series:
+            return events
+
+        start = dt_util.as_local(start)
+        end = dt_util.as_local(end)
+        occurrences = [
+            _to_calendar_event(recurrence.event, occurrence_start, occurrence_end)
+            for recurrence in self.series
+            for occurrence_start, occurrence_end in recurrence.between(
+                start, end, self.overridden.get(recurrence.event.uid)
+            )
+        ]
+        if occurrences:
+            events.extend(occurrences)
+            events.sort(key=lambda event: event.start)
+        return events
+
+    def next_event(self, now: datetime) -> CalendarEvent | None:
+        """Return the earliest starting event that has not ended at now."""
+        candidates = []
+        if (event := self.index.first_not_ended(now.timestamp())) is not None:
+            candidates.append(_to_calendar_event(event))
+        for recurrence in self.series:
+            occurrence = recurrence.first_not_ended(
+                now, self.overridden.get(recurrence.event.uid)
+            )
+            if occurrence is not None:
+                candidates.append(_to_calendar_event(recurrence.event, *occurrence))
+        return min(candidates, key=lambda event: event.start, default=None)
+
+
+def _next_boundary(
+    calendars: Iterable[TimeTreeCalendarData], now: datetime
+) -> datetime | None:
+    """Return when the next event of any calendar starts or ends."""
+    boundaries = []
+    for calendar in calendars:
+        if (event := calendar.next_event(now)) is not None:
+            boundaries.append(event.start if event.start > now else event.end)
+    return min(boundaries, default=None)
+
+
+class TimeTreeMergedCalendarData:
+    """Several calendars seen as one, merged on demand.
+
+    Every source keeps its own index and snapshot, so after one calendar
+    changed only that one is queried again; the sorted per-calendar results
+    are then combined with a k-way merge instead of being sorted again.
+    """
+
+    def __init__(self, calendars: list[TimeTreeCalendarData]) -> None:
+        """Initialize the view over the source calendars."""
+        self.calendars = calendars
+        # Changes whenever a source changed, as the view is built per source data
+        self.version = tuple(calendar.version for calendar in calendars)
+
+    def __len__(self) -> int:
+        """Return the number of single events and series of all sources."""
+        return sum(len(calendar) for calendar in self.calendars)
+
+    def events_between(self, start: datetime, end: datetime) -> list[CalendarEvent]:
+        """Return events of all sources overlapping a range, by start time."""
+        return merge_events(
+            calendar.events_between(start, end) for calendar in self.calendars
+        )
+
+    async def async_events_between(
+        self, start: datetime, end: datetime
+    ) -> list[CalendarEvent]:
+        """Return events of all sources overlapping a range, cold tiers included."""
+        return merge_events(
+            [await calendar.async_events_between(start, end) for calendar in self.calendars]
+        )
+
+    async def async_search(
+        self,
+        query: str,
+        prefix: bool = True,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[CalendarEvent]:
+        """Return events of all sources matching a full-text query, by start time."""
+        return merge_events(
+            [
+                await calendar.async_search(query, prefix, start, end)
+                for calendar in self.calendars
+            ]
+        )
+
+    def upcoming(self, window: str, now: datetime) -> list[CalendarEvent]:
+        """Return the events of all sources in a common window, by start time."""
+        return merge_events(calendar.upcoming(window, now) for calendar in self.calendars)
+
+    def next_event(self, now: datetime) -> CalendarEvent | None:
+        """Return the earliest starting event of any source not ended at now."""
+        candidates = [
+            event
+            for calendar in self.calendars
+            if (event := calendar.next_event(now)) is not None
+        ]
+        return min(candidates, key=lambda event: event.start, default=None)
+
+
+def merge_events(streams: Iterable[Iterable[CalendarEvent]]) -> list[CalendarEvent]:
+    """Merge event lists sorted by start time, dropping duplicates.
+
+    Events shared by several calendars carry the same uid; occurrences of
+    a series share the uid too, so duplicates are matched on uid and start.
+    """
+    seen: set[tuple[str | None, datetime]] = set()
+    merged = []
+    for event in heapq.merge(*streams, key=lambda event: event.start):
+        key = (event.uid, event.start)
+        if key not in seen:
+            seen.add(key)
+            merged.append(event)
+    return merged
+
+
+class _EntrySubscription(NamedTuple):
+    """Calendars and polling settings of one config entry."""
+
+    calendar_id: int
+    update_interval: int
+    min_update_interval: int
+    max_update_interval: int
+    retention_past_days: int
+    retention_future_days: int
+    # Other calendars shown in the entry's merged calendar
+    merged_calendar_ids: tuple[int, ...] = ()
+
+    @property
+    def calendar_ids(self) -> tuple[int, ...]:
+        """Return every calendar the entry needs."""
+        return (self.calendar_id, *self.merged_calendar_ids)
+
+
+class TimeTreeCoordinator(
+    DataUpdateCoordinator[dict[int, TimeTreeCalendarData]]
+):
+    """Fetch all subscribed calendars of one account in a single pass."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        account: "TimeTreeAccount",
+        max_concurrent_syncs: int = DEFAULT_MAX_CONCURRENT_SYNCS,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            # Shared by all entries of the account, so not tied to any one of
+            # them; the account shuts it down once its last entry is gone
+            config_entry=None,
+            name=f"TimeTree {account.client.email}",
+            update_interval=timedelta(minutes=DEFAULT_UPDATE_INTERVAL),
+            # Unchanged calendars keep their data object, so a refresh
+            # without changes compares equal and skips the state writes
+            always_update=False,
+        )
+        self.account = account
+        self.client = account.client
+        self.scheduler = TimeTreePollScheduler(
+            base=timedelta(minutes=DEFAULT_UPDATE_INTERVAL),
+            floor=timedelta(minutes=DEFAULT_MIN_UPDATE_INTERVAL),
+            ceiling=timedelta(minutes=DEFAULT_MAX_UPDATE_INTERVAL),
+        )
+        self.stores: dict[int, TimeTreeEventStore] = {}
+        self._caches: dict[int, Store] = {}
+        # Events kept in memory, relative to the start of today
+        self.retention_past = timedelta(days=DEFAULT_RETENTION_PAST_DAYS)
+        self.retention_future = timedelta(days=DEFAULT_RETENTION_FUTURE_DAYS)
+        self.metrics = RefreshHistory()
+        self.reminders = TimeTreeReminderScheduler(hass, self._async_fire_reminder)
+        self._sync_semaphore = asyncio.Semaphore(max_concurrent_syncs)
+        self.metrics_signal = f"{DOMAIN}_metrics_{_account_key(account.client.email)}"
+
+    def add_calendar(self, calendar_id: int) -> None:
+        """Include a calendar in the scheduled refreshes."""
+        if calendar_id not in self.stores:
+            self.stores[calendar_id] = TimeTreeEventStore(
+                TimeTreeColdTier(self.hass, calendar_id)
+            )
+            self._caches[calendar_id] = _cache_store(self.hass, calendar_id)
+
+    def remove_calendar(self, calendar_id: int) -> None:
+        """Stop refreshing a calendar and drop its events."""
+        if (store := self.stores.pop(calendar_id, None)) is not None:
+            store.cold.async_close()
+        self.reminders.async_remove_calendar(calendar_id)
+        self._caches.pop(calendar_id, None)
+        self.client.reset_sync(calendar_id)
+        if self.data is not None:
+            self.data.pop(calendar_id, None)
+
+    async def async_load_cache(self, calendar_id: int) -> bool:
+        """Serve a calendar from the on-disk cache, return True if it had data."""
+        if (cached := await self._caches[calendar_id].async_load()) is None:
+            return False
+
+        store = self.stores[calendar_id]
+        store.load_compact(cached["events"])
+        if cached.get("cold") is not None:
+            store.cold.load_dict(cached["cold"])
+        if cached.get("window") is not None:
+            # The window the events were split by, so queries inside it
+            # never read the cold tier before the first sync
+            store.window = tuple(cached["window"])
+        if cached.get("since") is not None:
+            self.client.set_sync_cursor(calendar_id, cached["since"])
+        # Cached events are known, report changes to them from now on. Without
+        # a cursor the next sync downloads everything again, like the first
+        store.track_changes = cached.get("since") is not None
+
+        _LOGGER.debug(
+            "Loaded %d cached events for TimeTree calendar %s",
+            len(store),
+            calendar_id,
+        )
+        self._async_publish(calendar_id, store)
+        return True
+
+    @callback
+    def _async_publish(self, calendar_id: int, store: TimeTreeEventStore) -> None:
+        """Index a calendar, show it and schedule its reminders."""
+        calendar = TimeTreeCalendarData(store)
+        self.reminders.async_update_calendar(calendar_id, calendar)
+        self.async_set_updated_data({**(self.data or {}), calendar_id: calendar})
+
+    def _async_schedule_cache_save(self, calendar_id: int) -> None:
+        """Save a calendar to the on-disk cache after a quiet period."""
+        store = self.stores[calendar_id]
+
+        def _data_to_save() -> dict[str, Any]:
+            return {
+                "since": self.client.get_sync_cursor(calendar_id),
+                "events": store.as_compact(),
+                "cold": store.cold.as_dict(),
+                "window": store.window,
+            }
+
+        self._caches[calendar_id].async_delay_save(_data_to_save, CACHE_SAVE_DELAY)
+
+    @callback
+    def async_apply_local_change(
+        self, calendar_id: int, uid: str, event: TimeTreeEvent | None
+    ) -> None:
+        """Show a queued change right away, before TimeTree confirms it."""
+        store = self.stores[calendar_id]
+        changed = store.remove(uid) if event is None else store.upsert(event)
+        if changed:
+            if store.cold.dirty:
+                self.hass.async_create_task(store.cold.async_save())
+            self._async_schedule_cache_save(calendar_id)
+            self._async_publish(calendar_id, store)
+            self._async_fire_changes(calendar_id, store)
+
+    @callback
+    def _async_fire_changes(self, calendar_id: int, store: TimeTreeEventStore) -> None:
+        """Fire bus events for the events a calendar added, updated and removed.
+
+        Only the changes since the previous call are fired, and none for
+        the first download of a calendar.
+        """
+        changeset = store.pop_changes()
+        store.track_changes = True
+        if not changeset:
+            return
+        fire = self.hass.bus.async_fire
+        for event in changeset.added:
+            fire(EVENT_EVENT_ADDED, _change_data(calendar_id, event))
+        for event, changed_fields in changeset.updated:
+            fire(
+                EVENT_EVENT_UPDATED,
+                {**_change_data(calendar_id, event), "changed_fields": changed_fields},
+            )
+        for uid, event in changeset.removed:
+            fire(
+                EVENT_EVENT_REMOVED,
+                _change_data(calendar_id, event)
+                if event is not None
+                else {"calendar_id": calendar_id, "uid": uid},
+            )
+        _LOGGER.debug(
+            "TimeTree calendar %s: %d added, %d updated, %d removed",
+            calendar_id,
+            len(changeset.added),
+            len(changeset.updated),
+            len(changeset.removed),
+        )
+
+    @callback
+    def _async_fire_reminder(
+        self,
+        calendar_id: int,
+        event: TimeTreeEvent,
+        start: datetime | date,
+        end: datetime | date,
+        minutes: int,
+    ) -> None:
+        """Fire a bus event for a due alert of an event or occurrence."""
+        self.hass.bus.async_fire(
+            EVENT_REMINDER,
+            {**_change_data(calendar_id, event, (start, end)), "minutes_before": minutes},
+        )
+
+    async def _async_sync_calendar(
+        self,
+        calendar_id: int,
+        store: TimeTreeEventStore,
+        metrics: CalendarRefreshMetrics,
+    ) -> bool:
+        """Merge new, changed and deleted events of a calendar into its store.
+
+        Chunks stay sequential within the calendar, as each one needs the
+        cursor of the previous one. Return True if the store changed.
+        """
+        changed = False
+        # A full sync sorts events into the tiers as it goes
+        store.window = self.retention_window(dt_util.now())
+        async with self._sync_semaphore:
+            with self.client.collect_stats(metrics.requests):
+                waited = time.perf_counter()
+                async for chunk in self.client.iter_events(calendar_id):
+                    received = time.perf_counter()
+                    metrics.fetch_time += received - waited
+                    metrics.chunks += 1
+                    metrics.events_received += len(chunk.events)
+                    changed |= store.apply(chunk)
+                    waited = time.perf_counter()
+                    metrics.convert_time += waited - received
+        # Keep showing local changes TimeTree has not received yet
+        changed |= self.account.outbox.overlay(calendar_id, store)
+        changed |= await self._async_apply_retention(store)
+        return changed
+
+    def retention_window(self, now: datetime) -> tuple[float, float]:
+        """Return the window of events kept in memory, in epoch seconds.
+
+        Bound to the start of the local day, so events move between the
+        tiers once a day rather than on every refresh.
+        """
+        today = dt_util.start_of_local_day(now)
+        return (
+            (today - self.retention_past).timestamp(),
+            (today + self.retention_future).timestamp(),
+        )
+
+    async def _async_apply_retention(self, store: TimeTreeEventStore) -> bool:
+        """Move events between memory and the cold tier for today's window.
+
+        The cold tier is only loaded when the window reaches into it, after
+        the retention options grew or far future events came closer.
+        Return True if any event moved.
+        """
+        start, end = self.retention_window(dt_util.now())
+        changed = store.retain(start, end)
+        if store.cold.reaches_into(start, end):
+            changed |= store.restore(await store.cold.async_pop_within(start, end))
+        # Written before the event cache, which only lists the cold uids
+        await store.cold.async_save()
+        return changed
+
+    async def _async_update_data(self) -> dict[int, TimeTreeCalendarData]:
+        """Fetch data for every subscribed calendar from TimeTree API.
+
+        Calendars are synced concurrently, at most max_concurrent_syncs at
+        a time, and each one is published as soon as its sync finished. A
+        calendar whose sync failed keeps its previous events; the refresh
+        only fails if the login was rejected or every calendar failed.
+        """
+        previous = self.data or {}
+        data: dict[int, TimeTreeCalendarData] = {}
+        changed = False
+        errors: list[TimeTreeConnectionError] = []
+        metrics = RefreshMetrics(started=dt_util.utcnow(), success=False)
+        began = time.perf_counter()
+        stats = replace(self.client.stats)
+        try:
+            await self.account.async_authenticate()
+            metrics.auth_time = time.perf_counter() - began
+            # Send queued changes first, so the sync already includes them
+            await self.account.async_flush_outbox(refresh=False)
+
+            syncs: dict[asyncio.Task[bool], tuple[int, TimeTreeEventStore]] = {}
+            for calendar_id, store in list(self.stores.items()):
+                metrics.calendars[calendar_id] = CalendarRefreshMetrics(calendar_id)
+                task = asyncio.create_task(
+                    self._async_sync_calendar(
+                        calendar_id, store, metrics.calendars[calendar_id]
+                    )
+                )
+                syncs[task] = (calendar_id, store)
+
+            pending = set(syncs)
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    published: dict[int, TimeTreeCalendarData] = {}
+                    auth_error: TimeTreeAuthError | None = None
+                    for task in done:
+                        calendar_id, store = syncs[task]
+                        calendar_metrics = metrics.calendars[calendar_id]
+                        try:
+                            calendar_changed = task.result()
+                        except TimeTreeAuthError as err:
+                            auth_error = err
+                            continue
+                        except TimeTreeConnectionError as err:
+                            _LOGGER.warning(
+                                "Error syncing TimeTree calendar %s: %s", calendar_id, err
+                            )
+                            calendar_metrics.error = str(err)
+                            errors.append(err)
+                            if calendar_id in previous:
+                                data[calendar_id] = previous[calendar_id]
+                            continue
+
+                        # Only rebuild the index of calendars that changed since
+                        # they were last published, by this sync or otherwise
+                        if (
+                            calendar_id not in previous
+                            or store.version != previous[calendar_id].version
+                        ):
+                            self._async_schedule_cache_save(calendar_id)
+                            indexing = time.perf_counter()
+                            data[calendar_id] = published[calendar_id] = (
+                                TimeTreeCalendarData(store)
+                            )
+                            calendar_metrics.index_time = time.perf_counter() - indexing
+                            self.reminders.async_update_calendar(
+                                calendar_id, data[calendar_id]
+                            )
+                            changed = True
+                        else:
+                            data[calendar_id] = previous[calendar_id]
+                        calendar_metrics.changed = calendar_changed
+                        calendar_metrics.stored_events = len(store)
+                        self._async_fire_changes(calendar_id, store)
+
+                        _LOGGER.debug(
+                            "Updated %d events from TimeTree calendar %s",
+                            len(store),
+                            calendar_id,
+                        )
+                    if auth_error is not None:
+                        raise auth_error
+
+                    if published and pending and self.data is not None:
+                        # Publish finished calendars without waiting for slower ones
+                        self.data = {**self.data, **published}
+                        self.async_update_listeners()
+            finally:
+                for task in pending:
+                    task.cancel()
+
+            if errors and len(errors) == len(syncs):
+                raise errors[0]
+            metrics.success = not errors
+            if errors:
+                metrics.error = f"{len(errors)} of {len(syncs)} calendars failed"
+
+        except TimeTreeAuthError as err:
+            metrics.error = str(err)
+            # The coordinator has no config entry to start this for it
+            self.account.async_start_reauth()
+            raise ConfigEntryAuthFailed("Authentication failed") from err
+        except TimeTreeConnectionError as err:
+            metrics.error = str(err)
+            self.scheduler.record_error(
+                err.retry_after if isinstance(err, TimeTreeRateLimitError) else None
+            )
+            self.update_interval = self.scheduler.next_interval(dt_util.now(), None)
+            raise UpdateFailed(f"Error communicating with TimeTree: {err}") from err
+        finally:
+            metrics.duration = time.perf_counter() - began
+            metrics.requests = self.client.stats - stats
+            self._async_record_metrics(metrics)
+
+        now = dt_util.now()
+        if rate_limits := [
+            err.retry_after for err in errors if isinstance(err, TimeTreeRateLimitError)
+        ]:
+            # Some calendars were rate limited, back off for all of them
+            self.scheduler.record_error(max(rate_limits, key=lambda delay: delay or 0))
+        else:
+            self.scheduler.record_success(changed)
+        self.update_interval = self.scheduler.next_interval(
+            # Boundaries this close are covered by the refresh that just ran
+            now, _next_boundary(data.values(), now + NEAR_BOUNDARY)
+        )
+        _LOGGER.debug("Next TimeTree refresh in %s", self.update_interval)
+
+        return data
+
+    @callback
+    def _async_record_metrics(self, metrics: RefreshMetrics) -> None:
+        """Add a refresh to the history and notify the diagnostic sensors.
+
+        Sensors are notified through the dispatcher because unchanged
+        refreshes do not notify coordinator listeners.
+        """
+        self.metrics.append(metrics)
+        _LOGGER.debug(
+            "TimeTree refresh took %.3fs (%d requests, %d bytes)",
+            metrics.duration,
+            metrics.requests.requests,
+            metrics.requests.bytes_received,
+        )
+        async_dispatcher_send(self.hass, self.metrics_signal)
+
+
+class TimeTreeAccount:
+    """Authenticated TimeTree session shared by all entries of one login."""
+
+    def __init__(self, hass: HomeAssistant, email: str, password: str) -> None:
+        """Initialize the account."""
+        self.hass = hass
+        self.client = TimeTreeAPIClient(
+            async_get_session(hass),
+            email,
+            password,
+            on_session_update=self._async_schedule_session_save,
+            json_loads=json_loads,
+        )
+        self.outbox = TimeTreeOutbox(hass, self.client, _account_key(email))
+        self.coordinator = TimeTreeCoordinator(hass, self)
+        self._entries: dict[str, _EntrySubscription] = {}
+        self._refresh_lock = asyncio.Lock()
+        self._session_store: Store = Store(
+            hass, STORAGE_VERSION_SESSION, f"{DOMAIN}.session_{_account_key(email)}"
+        )
+        self._session_loaded = False
+        self._session_lock = asyncio.Lock()
+        self._calendars: list[dict[str, Any]] | None = None
+        self._calendars_fetched = 0.0
+        self._calendars_request: asyncio.Task[list[dict[str, Any]]] | None = None
+
+    @property
+    def has_entries(self) -> bool:
+        """Return True if any config entry still uses this account."""
+        return bool(self._entries)
+
+    def add_entry(self, entry: ConfigEntry) -> None:
+        """Subscribe the calendar of a config entry."""
+        subscription = _EntrySubscription(
+            calendar_id=entry.data[CONF_CALENDAR_ID],
+            update_interval=entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+            min_update_interval=entry.options.get(
+                CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+            ),
+            max_update_interval=entry.options.get(
+                CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+            ),
+            retention_past_days=entry.options.get(
+                CONF_RETENTION_PAST_DAYS, DEFAULT_RETENTION_PAST_DAYS
+            ),
+            retention_future_days=entry.options.get(
+                CONF_RETENTION_FUTURE_DAYS, DEFAULT_RETENTION_FUTURE_DAYS
+            ),
+            merged_calendar_ids=merged_calendar_ids(entry),
+        )
+        self._entries[entry.entry_id] = subscription
+        for calendar_id in subscription.calendar_ids:
+            self.coordinator.add_calendar(calendar_id)
+        self._update_settings()
+
+    @callback
+    def async_start_reauth(self) -> None:
+        """Ask for the password again on every entry of the login."""
+        for entry_id in self._entries:
+            if (entry := self.hass.config_entries.async_get_entry(entry_id)) is not None:
+                entry.async_start_reauth(self.hass)
+
+    def remove_entry(self, entry_id: str) -> None:
+        """Unsubscribe the calendars of a config entry."""
+        subscription = self._entries.pop(entry_id)
+        in_use = {
+            calendar_id
+            for sub in self._entries.values()
+            for calendar_id in sub.calendar_ids
+        }
+        for calendar_id in subscription.calendar_ids:
+            if calendar_id not in in_use:
+                self.coordinator.remove_calendar(calendar_id)
+        self._update_settings()
+
+    def _update_settings(self) -> None:
+        """Poll as often and keep as many events as the most demanding entry asks."""
+        if self._entries:
+            subscriptions = self._entries.values()
+            self.coordinator.scheduler.configure(
+                base=timedelta(minutes=min(sub.update_interval for sub in subscriptions)),
+                floor=timedelta(
+                    minutes=min(sub.min_update_interval for sub in subscriptions)
+                ),
+                ceiling=timedelta(
+                    minutes=min(sub.max_update_interval for sub in subscriptions)
+                ),
+            )
+            self.coordinator.update_interval = self.coordinator.scheduler.base
+            # Keep in memory what the entry with the widest window needs
+            self.coordinator.retention_past = timedelta(
+                days=max(sub.retention_past_days for sub in subscriptions)
+            )
+            self.coordinator.retention_future = timedelta(
+                days=max(sub.retention_future_days for sub in subscriptions)
+            )
+
+    async def _async_load_session(self) -> None:
+        """Restore the session saved by a previous run, once."""
+        async with self._session_lock:
+            if not self._session_loaded:
+                self._session_loaded = True
+                if (saved := await self._session_store.async_load()) is not None:
+                    self.client.device_uuid = saved["device_uuid"]
+                    if self.client.session_id is None:
+                        self.client.session_id = saved["session_id"]
+                else:
+                    # Keep the device uuid stable even if signing in fails now
+                    self._async_schedule_session_save()
+
+    async def async_authenticate(self) -> None:
+        """Sign in once, reusing the session saved by a previous run."""
+        await self._async_load_session()
+        await self.client.async_ensure_authenticated()
+
+    async def async_verify_credentials(self) -> None:
+        """Sign in with the password, even if a saved session is available."""
+        await self._async_load_session()
+        await self.client.authenticate()
+
+    async def async_get_calendars(self) -> list[dict[str, Any]]:
+        """Return the active calendars of the account.
+
+        The list is cached for CALENDARS_CACHE_TTL seconds, and concurrent
+        callers share a single request while one is in flight.
+        """
+        if (
+            self._calendars is not None
+            and time.monotonic() - self._calendars_fetched < CALENDARS_CACHE_TTL
+        ):
+            return list(self._calendars)
+        if self._calendars_request is None:
+            self._calendars_request = self.hass.async_create_task(
+                self._async_fetch_calendars()
+            )
+        # A cancelled caller must not cancel the request the others wait on
+        return list(await asyncio.shield(self._calendars_request))
+
+    async def _async_fetch_calendars(self) -> list[dict[str, Any]]:
+        """Fetch the calendar list and cache it."""
+        try:
+            await self.async_authenticate()
+            calendars = await self.client.get_calendars()
+        finally:
+            self._calendars_request = None
+        self._calendars = calendars
+        self._calendars_fetched = time.monotonic()
+        return calendars
+
+    async def async_change_event(
+        self,
+        calendar_id: int,
+        action: str,
+        uid: str,
+        payload: dict[str, Any] | None = None,
+    ) -> None:
+        """Queue an event change, show it locally and try to send it now.
+
+        The change stays queued, on disk, until TimeTree accepted it, and
+        the next delta sync brings back TimeTree's version of the event.
+        """
+        await self.outbox.async_load()
+        self.outbox.put(calendar_id, action, uid, payload)
+        self.coordinator.async_apply_local_change(
+            calendar_id, uid, None if payload is None else TimeTreeEvent.from_api(payload)
+        )
+        self.hass.async_create_task(self.async_flush_outbox())
+
+    async def async_flush_outbox(self, refresh: bool = True) -> None:
+        """Send queued event changes, keeping them queued on failure.
+
+        Calendars with refused changes are synced again in full, right
+        away unless refresh is False because a refresh is already running.
+        """
+        try:
+            await self.async_authenticate()
+            rejected = await self.outbox.async_flush()
+        except (TimeTreeAuthError, TimeTreeConnectionError) as err:
+            if len(self.outbox):
+                _LOGGER.debug(
+                    "Keeping %d event changes queued: %s", len(self.outbox), err
+                )
+            return
+
+        for calendar_id in rejected:
+            # Replace the local change with what TimeTree actually has
+            self.client.reset_sync(calendar_id)
+        if rejected and refresh:
+            await self.coordinator.async_request_refresh()
+
+    def _async_schedule_session_save(self) -> None:
+        """Save the session cookie and device uuid."""
+        self._session_store.async_delay_save(
+            lambda: {
+                "session_id": self.client.session_id,
+                "device_uuid": self.client.device_uuid,
+            },
+            SESSION_SAVE_DELAY,
+        )
+
+    async def async_ensure_calendar(self, calendar_id: int) -> bool:
+        """Make sure the coordinator holds data for a calendar.
+
+        Cached events are served right away while a background refresh
+        catches up. Without a cache, entries set up at the same time wait on
+        each other, so a single refresh serves all calendars subscribed
+        before it started. Raise TimeTreeAuthError if TimeTree rejected the
+        login.
+        """
+        async with self._refresh_lock:
+            if self.coordinator.data is not None and calendar_id in self.coordinator.data:
+                return True
+
+            if await self.coordinator.async_load_cache(calendar_id):
+                self.hass.async_create_task(self.coordinator.async_request_refresh())
+                return True
+
+            await self.async_authenticate()
+            await self.coordinator.async_refresh()
+        if isinstance(self.coordinator.last_exception, ConfigEntryAuthFailed):
+            # A saved session skipped signing in; the refresh found the
+            # password no longer works
+            raise TimeTreeAuthError("Invalid credentials") from (
+                self.coordinator.last_exception
+            )
+        return self.coordinator.last_update_success
+
+
+def merged_calendar_ids(entry: ConfigEntry) -> tuple[int, ...]:
+    """Return the other calendars merged into an entry's merged calendar."""
+    own = entry.data[CONF_CALENDAR_ID]
+    return tuple(
+        calendar_id
+        for calendar_id in dict.fromkeys(
+            int(value) for value in entry.options.get(CONF_MERGED_CALENDARS, [])
+        )
+        if calendar_id != own
+    )
+
+
+def _account_key(email: str) -> str:
+    """Return a file name safe key for an account."""
+    return hashlib.sha256(email.lower().encode()).hexdigest()[:16]
+
+
+def async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the HTTP session of all TimeTree clients.
+
+    Its cookie jar stays empty, so the session cookie every client sends
+    itself is never replaced by the one another account signed in with.
+    """
+    data = hass.data.setdefault(DOMAIN, {})
+    if (session := data.get(DATA_SESSION)) is None:
+        session = data[DATA_SESSION] = async_create_clientsession(
+            hass, cookie_jar=aiohttp.DummyCookieJar()
+        )
+    return session
+
+
+def async_get_account(hass: HomeAssistant, email: str, password: str) -> TimeTreeAccount:
+    """Return the shared account for a login, creating it if needed.
+
+    Emails are matched case insensitively, like the session store names.
+    """
+    accounts: dict[str, TimeTreeAccount] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_ACCOUNTS, {}
+    )
+    if (account := accounts.get(email.lower())) is None:
+        account = accounts[email.lower()] = TimeTreeAccount(hass, email, password)
+    return account
+
+
+def async_update_password(hass: HomeAssistant, email: str, password: str) -> None:
+    """Let the running account of a login sign in with a new password."""
+    accounts = hass.data.get(DOMAIN, {}).get(DATA_ACCOUNTS, {})
+    if (account := accounts.get(email.lower())) is not None:
+        account.client.password = password
+
+
+def async_release_account(hass: HomeAssistant, account: TimeTreeAccount) -> None:
+    """Forget an account once its last entry has been unloaded."""
+    if not account.has_entries:
+        hass.data[DOMAIN][DATA_ACCOUNTS].pop(account.client.email.lower(), None)
+        hass.async_create_task(account.coordinator.async_shutdown())
+
+
+def _cache_store(hass: HomeAssistant, calendar_id: int) -> Store:
+    """Return the on-disk event cache of a calendar.
+
+    One instance per calendar is shared by the coordinators that come and
+    go with entry reloads and by async_remove_cache, so removing the cache
+    also cancels a delayed save still pending from an unloaded entry.
+    """
+    caches: dict[int, Store] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(DATA_CACHES, {})
+    if (cache := caches.get(calendar_id)) is None:
+        cache = caches[calendar_id] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.events_{calendar_id}"
+        )
+    return cache
+
+
+async def async_remove_cache(hass: HomeAssistant, calendar_id: int) -> None:
+    """Delete the on-disk event cache and cold tier of a calendar."""
+    await _cache_store(hass, calendar_id).async_remove()
+    hass.data[DOMAIN][DATA_CACHES].pop(calendar_id, None)
+    await hass.async_add_executor_job(
+        partial(cold_tier_path(hass, calendar_id).unlink, missing_ok=True)
+    )
@@ -0,0 +1,47 @@
+"""Diagnostics support for TimeTree Calendar integration."""
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_CALENDAR_ID
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD, "session_id", "device_uuid"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    calendar_id = entry.data[CONF_CALENDAR_ID]
+    store = coordinator.stores.get(calendar_id)
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "calendars": list(coordinator.stores),
+            "pending_reminders": len(coordinator.reminders),
+        },
+        "calendar": {
+            "stored_events": len(store) if store is not None else None,
+            "cold_events": len(store.cold) if store is not None else None,
+            "sync_cursor": coordinator.client.get_sync_cursor(calendar_id),
+        },
+        "client": async_redact_data(
+            {
+                "session_id": coordinator.client.session_id,
+                "device_uuid": coordinator.client.device_uuid,
+                "stats": vars(coordinator.client.stats),
+            },
+            TO_REDACT,
+        ),
+        "metrics": coordinator.metrics.as_dict(),
+    }
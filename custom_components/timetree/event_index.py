@@ -0,0 +1,85 @@
+"""Time sorted interval index for TimeTree calendar events."""
+from collections.abc import Iterable, Iterator
+from typing import Generic, TypeVar
+
+_T = TypeVar("_T")
+
+
+class TimeTreeEventIndex(Generic[_T]):
+    """Events sorted by start time with a max-end augmented interval tree.
+
+    The sorted arrays double as an implicit balanced search tree: the node
+    of a range ``[lo, hi)`` is its middle element, and ``_max_end`` holds the
+    latest end time of every node's subtree. Range queries skip subtrees
+    that end before the range, so they cost O(log n + k).
+    """
+
+    def __init__(self, entries: Iterable[tuple[float, float, _T]]) -> None:
+        """Build the index from ``(start, end, item)`` tuples in epoch seconds."""
+        ordered = sorted(entries, key=lambda entry: (entry[0], entry[1]))
+        self._starts = [entry[0] for entry in ordered]
+        self._ends = [entry[1] for entry in ordered]
+        self._items = [entry[2] for entry in ordered]
+        self._max_end = list(self._ends)
+        self._build(0, len(ordered))
+
+    def _build(self, lo: int, hi: int) -> float:
+        """Fill the max-end augmentation of a subtree, return its max end."""
+        if lo >= hi:
+            return float("-inf")
+        mid = (lo + hi) // 2
+        max_end = max(self._ends[mid], self._build(lo, mid), self._build(mid + 1, hi))
+        self._max_end[mid] = max_end
+        return max_end
+
+    def __len__(self) -> int:
+        """Return the number of indexed events."""
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[_T]:
+        """Iterate over all events in start order."""
+        return iter(self._items)
+
+    def first_not_ended(self, timestamp: float) -> _T | None:
+        """Return the earliest starting event that has not ended at timestamp.
+
+        Descends the max-end augmented tree, so the lookup costs O(log n).
+        """
+        position = self._first_not_ended(0, len(self._items), timestamp)
+        return None if position is None else self._items[position]
+
+    def _first_not_ended(self, lo: int, hi: int, timestamp: float) -> int | None:
+        """Return the leftmost position in a subtree ending at or after timestamp."""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        if self._max_end[mid] < timestamp:
+            return None
+        position = self._first_not_ended(lo, mid, timestamp)
+        if position is not None:
+            return position
+        if self._ends[mid] >= timestamp:
+            return mid
+        return self._first_not_ended(mid + 1, hi, timestamp)
+
+    def overlapping(self, start: float, end: float) -> list[_T]:
+        """Return events ending at or after start and starting at or before end."""
+        result: list[_T] = []
+        self._collect(0, len(self._items), start, end, result)
+        return result
+
+    def _collect(
+        self, lo: int, hi: int, start: float, end: float, result: list[_T]
+    ) -> None:
+        """Append overlapping events of a subtree to result, in start order."""
+        if lo >= hi or self._starts[lo] > end:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] < start:
+            return
+        self._collect(lo, mid, start, end, result)
+        if self._starts[mid] > end:
+            return
+        if self._ends[mid] >= start:
+            result.append(self._items[mid])
+        self._collect(mid + 1, hi, start, end, result)
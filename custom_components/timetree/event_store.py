@@ -0,0 +1,285 @@
+"""Local event store for the TimeTree Calendar integration."""
+from dataclasses import dataclass, field
+import logging
+from typing import TYPE_CHECKING, Any
+
+from .models import TimeTreeEvent, iter_api_events
+from .recurrence import TimeTreeRecurrence, parse_recurrence
+from .search_index import TimeTreeSearchIndex
+from .timetree_api import TimeTreeEventChunk
+
+if TYPE_CHECKING:
+    from .cold_tier import TimeTreeColdTier
+
+_LOGGER = logging.getLogger(__name__)
+
+# Previous version of an event that was in the cold tier, not loaded
+_UNKNOWN: Any = object()
+
+
+@dataclass
+class TimeTreeChangeset:
+    """Events added, updated and removed since the changes were last taken.
+
+    Updates list the changed fields, or None if the previous version was
+    in the cold tier. Removals carry the last known version, if any.
+    """
+
+    added: list[TimeTreeEvent] = field(default_factory=list)
+    updated: list[tuple[TimeTreeEvent, list[str] | None]] = field(default_factory=list)
+    removed: list[tuple[str, TimeTreeEvent | None]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        """Return True if anything changed."""
+        return bool(self.added or self.updated or self.removed)
+
+
+class TimeTreeEventStore:
+    """Event records of one calendar, kept in sync by uuid.
+
+    With a cold tier, single events outside the retention window are moved
+    out of memory into it. Recurring series and their edited occurrences
+    always stay in memory, as their rules decide when they occur.
+    """
+
+    def __init__(self, cold: "TimeTreeColdTier | None" = None) -> None:
+        """Initialize an empty event store."""
+        self.cold = cold
+        # Retention window in epoch seconds, set by retain()
+        self.window: tuple[float, float] | None = None
+        self._events: dict[str, TimeTreeEvent] = {}
+        self._recurrences: dict[str, TimeTreeRecurrence | None] = {}
+        # Events of a full sync that has not received its last chunk yet
+        self._pending: dict[str, TimeTreeEvent] = {}
+        # Full-text index of the events in memory, kept up to date on changes
+        self.search_index = TimeTreeSearchIndex()
+        # Incremented on every change, so derived data knows when it is stale
+        self.version = 0
+        # Version before the first and after the last change of every event
+        # changed since pop_changes(), None if it did not exist. Off until
+        # the calendar was shown once, so its first download is not journaled
+        self.track_changes = False
+        self._journal: dict[str, tuple[Any, TimeTreeEvent | None]] = {}
+
+    @property
+    def events(self) -> list[TimeTreeEvent]:
+        """Return all active events kept in memory."""
+        return list(self._events.values())
+
+    def __len__(self) -> int:
+        """Return the number of active events kept in memory."""
+        return len(self._events)
+
+    def __contains__(self, uid: object) -> bool:
+        """Return True if an event is in memory or in the cold tier."""
+        return uid in self._events or (self.cold is not None and uid in self.cold)
+
+    def apply(self, chunk: TimeTreeEventChunk) -> bool:
+        """Merge a sync chunk into the store, return True if anything changed.
+
+        Delta chunks are merged right away. Chunks of a full sync are
+        collected aside and only replace the store once the last chunk
+        arrived, so an interrupted full sync never leaves a partial
+        calendar behind and can resume where it stopped. Raw events are
+        converted one by one and released from the chunk as they go.
+        """
+        if chunk.unchanged:
+            return False
+
+        if chunk.full_sync:
+            if chunk.first:
+                self._pending = {}
+            for uid, event in iter_api_events(chunk.events):
+                if event is None:
+                    self._pending.pop(uid, None)
+                else:
+                    self._pending[uid] = event
+            if not chunk.last:
+                return False
+            events, self._pending = self._pending, {}
+            self._record_full_sync(events)
+            cold = [event for event in events.values() if self._is_cold(event)]
+            for event in cold:
+                del events[event.uid]
+            changed = events != self._events
+            if self.cold is not None:
+                changed |= self.cold.uids != {event.uid for event in cold}
+                self.cold.replace(cold, self.window[0] if self.window else 0)
+            self._events = events
+            if changed:
+                self._recurrences.clear()
+                self.search_index = TimeTreeSearchIndex(events.values())
+                self.version += 1
+            return changed
+
+        changed = False
+        merged = 0
+        for uid, event in iter_api_events(chunk.events):
+            merged += 1
+            if event is None:
+                # Tombstone for a deleted event
+                changed |= self.remove(uid)
+            else:
+                changed |= self.upsert(event)
+
+        _LOGGER.debug(
+            "Merged %d delta events, %d events in store", merged, len(self._events)
+        )
+        return changed
+
+    def get(self, uid: str) -> TimeTreeEvent | None:
+        """Return an event by uid."""
+        return self._events.get(uid)
+
+    async def async_get(self, uid: str) -> TimeTreeEvent | None:
+        """Return an event by uid, reading it from the cold tier if needed."""
+        if (event := self._events.get(uid)) is not None or self.cold is None:
+            return event
+        return await self.cold.async_get(uid)
+
+    def upsert(self, event: TimeTreeEvent) -> bool:
+        """Add or replace a single event, return True if anything changed."""
+        if self._is_cold(event):
+            if self.cold.holds(event):
+                return False
+            previous = self._previous(event.uid)
+            if self._events.pop(event.uid, None) is not None:
+                self._recurrences.pop(event.uid, None)
+                self.search_index.remove(event.uid)
+            self.cold.put(event, event.end < self.window[0])
+            self._record(event.uid, previous, event)
+            self.version += 1
+            return True
+        previous = self._previous(event.uid)
+        if self.cold is not None:
+            self.cold.discard(event.uid)
+        if self._events.get(event.uid) == event:
+            return False
+        self._events[event.uid] = event
+        self._recurrences.pop(event.uid, None)
+        self.search_index.add(event)
+        self._record(event.uid, previous, event)
+        self.version += 1
+        return True
+
+    def remove(self, uid: str) -> bool:
+        """Remove a single event, return True if it was present."""
+        previous = self._previous(uid)
+        if self._events.pop(uid, None) is None:
+            if self.cold is None or not self.cold.discard(uid):
+                return False
+        self._recurrences.pop(uid, None)
+        self.search_index.remove(uid)
+        self._record(uid, previous, None)
+        self.version += 1
+        return True
+
+    def _previous(self, uid: str) -> Any:
+        """Return the current version of an event, before it changes."""
+        if (event := self._events.get(uid)) is not None:
+            return event
+        if self.cold is not None and uid in self.cold:
+            return _UNKNOWN
+        return None
+
+    def _record(self, uid: str, previous: Any, event: TimeTreeEvent | None) -> None:
+        """Journal a change, keeping the version before the first change."""
+        if not self.track_changes:
+            return
+        if (entry := self._journal.get(uid)) is not None:
+            previous = entry[0]
+        self._journal[uid] = (previous, event)
+
+    def _record_full_sync(self, events: dict[str, TimeTreeEvent]) -> None:
+        """Journal the difference between the store and a full sync, by uid.
+
+        Events that were in the cold tier are only compared by uid, as
+        their previous version is not loaded.
+        """
+        if not self.track_changes:
+            return
+        for uid, event in events.items():
+            previous = self._events.get(uid)
+            if previous is None and self.cold is not None and uid in self.cold:
+                continue
+            if previous != event:
+                self._record(uid, previous, event)
+        for uid, previous in self._events.items():
+            if uid not in events:
+                self._record(uid, previous, None)
+        if self.cold is not None:
+            for uid in self.cold.uids.difference(events):
+                self._record(uid, _UNKNOWN, None)
+
+    def pop_changes(self) -> TimeTreeChangeset:
+        """Return the changes since the last call and start a new journal."""
+        journal, self._journal = self._journal, {}
+        changeset = TimeTreeChangeset()
+        for uid, (previous, event) in journal.items():
+            if event is None:
+                if previous is not None:
+                    changeset.removed.append(
+                        (uid, None if previous is _UNKNOWN else previous)
+                    )
+            elif previous is None:
+                changeset.added.append(event)
+            elif previous is _UNKNOWN:
+                changeset.updated.append((event, None))
+            elif previous != event:
+                changeset.updated.append((event, previous.changed_fields(event)))
+        return changeset
+
+    def _is_cold(self, event: TimeTreeEvent) -> bool:
+        """Return True if an event belongs in the cold tier."""
+        return (
+            self.cold is not None
+            and self.window is not None
+            and not event.recurrences
+            and event.parent_uid is None
+            and (event.end < self.window[0] or event.start > self.window[1])
+        )
+
+    def retain(self, start: float, end: float) -> bool:
+        """Move events outside a window of epoch seconds to the cold tier.
+
+        Return True if any event moved.
+        """
+        self.window = (start, end)
+        if self.cold is None:
+            return False
+        evicted = [event for event in self._events.values() if self._is_cold(event)]
+        for event in evicted:
+            del self._events[event.uid]
+            self.search_index.remove(event.uid)
+            self.cold.put(event, event.end < start)
+        if evicted:
+            self.version += 1
+            _LOGGER.debug("Moved %d events to the cold tier", len(evicted))
+        return bool(evicted)
+
+    def restore(self, events: list[TimeTreeEvent]) -> bool:
+        """Take events back from the cold tier, return True if there were any."""
+        for event in events:
+            self._events[event.uid] = event
+            self.search_index.add(event)
+        if events:
+            self.version += 1
+        return bool(events)
+
+    def recurrence(self, uid: str) -> TimeTreeRecurrence | None:
+        """Return the parsed rules of a series, parsing them on first use."""
+        if uid not in self._recurrences:
+            self._recurrences[uid] = parse_recurrence(self._events[uid])
+        return self._recurrences[uid]
+
+    def as_compact(self) -> list[list[Any]]:
+        """Return the events as compact rows for the on-disk cache."""
+        return [event.as_row() for event in self._events.values()]
+
+    def load_compact(self, rows: list[list[Any]]) -> None:
+        """Replace the store content with rows from the on-disk cache."""
+        self._events = {row[0]: TimeTreeEvent.from_row(row) for row in rows}
+        self._recurrences.clear()
+        self._journal = {}
+        self.search_index = TimeTreeSearchIndex(self._events.values())
+        self.version += 1
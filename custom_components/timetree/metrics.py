@@ -0,0 +1,107 @@
+"""Refresh metrics for the TimeTree Calendar integration."""
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+from .timetree_api import TimeTreeRequestStats
+
+# Number of refreshes kept in the rolling history
+METRICS_HISTORY_SIZE = 50
+
+
+@dataclass
+class CalendarRefreshMetrics:
+    """Timings and counters of one calendar during one refresh.
+
+    ``fetch_time`` is spent waiting on TimeTree, ``convert_time`` merging
+    the received chunks into the event store and ``index_time`` rebuilding
+    the query index, all in seconds.
+    """
+
+    calendar_id: int
+    fetch_time: float = 0.0
+    convert_time: float = 0.0
+    index_time: float = 0.0
+    chunks: int = 0
+    events_received: int = 0
+    stored_events: int = 0
+    changed: bool = False
+    error: str | None = None
+    requests: TimeTreeRequestStats = field(default_factory=TimeTreeRequestStats)
+
+
+@dataclass
+class RefreshMetrics:
+    """Timings and counters of one coordinator refresh."""
+
+    started: datetime
+    duration: float = 0.0
+    auth_time: float = 0.0
+    success: bool = True
+    error: str | None = None
+    requests: TimeTreeRequestStats = field(default_factory=TimeTreeRequestStats)
+    calendars: dict[int, CalendarRefreshMetrics] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as JSON serializable data."""
+        data = asdict(self)
+        data["started"] = self.started.isoformat()
+        data["calendars"] = list(data["calendars"].values())
+        return data
+
+
+class RefreshHistory:
+    """Rolling history of the most recent refreshes."""
+
+    def __init__(self, size: int = METRICS_HISTORY_SIZE) -> None:
+        """Initialize an empty history."""
+        self._refreshes: deque[RefreshMetrics] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return the number of refreshes kept."""
+        return len(self._refreshes)
+
+    def __iter__(self) -> Iterator[RefreshMetrics]:
+        """Iterate over the refreshes, oldest first."""
+        return iter(self._refreshes)
+
+    @property
+    def last(self) -> RefreshMetrics | None:
+        """Return the most recent refresh."""
+        return self._refreshes[-1] if self._refreshes else None
+
+    def append(self, metrics: RefreshMetrics) -> None:
+        """Add a finished refresh, dropping the oldest one if full."""
+        self._refreshes.append(metrics)
+
+    def duration_percentile(self, percentile: float) -> float | None:
+        """Return a percentile of the successful refresh durations."""
+        durations = sorted(
+            refresh.duration for refresh in self._refreshes if refresh.success
+        )
+        if not durations:
+            return None
+        return durations[min(len(durations) - 1, int(len(durations) * percentile))]
+
+    def cache_hit_ratio(self, calendar_id: int) -> float | None:
+        """Return the share of conditional syncs TimeTree reported unchanged."""
+        conditional = not_modified = 0
+        for refresh in self._refreshes:
+            if (calendar := refresh.calendars.get(calendar_id)) is not None:
+                conditional += calendar.requests.conditional_requests
+                not_modified += calendar.requests.not_modified
+        if not conditional:
+            return None
+        return not_modified / conditional
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary and the refreshes as JSON serializable data."""
+        return {
+            "refreshes": len(self._refreshes),
+            "failures": sum(not refresh.success for refresh in self._refreshes),
+            "duration_p50": self.duration_percentile(0.5),
+            "duration_p95": self.duration_percentile(0.95),
+            "history": [refresh.as_dict() for refresh in self._refreshes],
+        }
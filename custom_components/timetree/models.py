@@ -0,0 +1,236 @@
+"""Compact event records for the TimeTree Calendar integration."""
+from collections.abc import Iterator
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+import sys
+from typing import Any
+import zlib
+from zoneinfo import ZoneInfo
+
+from .timetree_api import (
+    convert_event_times,
+    convert_timestamp_to_date,
+    convert_timestamp_to_datetime,
+)
+
+# Notes longer than this many characters are kept zlib compressed
+NOTE_COMPRESS_THRESHOLD = 512
+
+
+@dataclass(slots=True, frozen=True)
+class TimeTreeEvent:
+    """One TimeTree event, stored as compactly as possible.
+
+    Start and end are epoch seconds with interned timezone keys, and long
+    notes stay compressed until the description is actually read.
+    """
+
+    uid: str
+    summary: str
+    start: int | float
+    end: int | float
+    start_tz: str
+    end_tz: str
+    all_day: bool
+    location: str
+    url: str | None
+    note: str | bytes
+    recurrences: tuple[str, ...] | None = None
+    parent_uid: str | None = None
+    recurrence_id: str | None = None
+    # Reminder offsets in minutes before the start, ascending
+    alerts: tuple[int, ...] | None = None
+
+    @classmethod
+    def from_api(cls, event_data: dict[str, Any]) -> "TimeTreeEvent":
+        """Create a record from a TimeTree API event."""
+        recurrences = event_data.get("recurrences") or []
+        parent_uid = event_data.get("parent_id") or None
+        recurrence_id = None
+        if parent_uid:
+            # Edited single occurrence of a recurring series
+            recurrence_id = next(
+                (line for line in recurrences if line.startswith("RECURRENCE-ID")),
+                None,
+            )
+        return cls(
+            uid=event_data["uuid"],
+            summary=event_data.get("title", ""),
+            # TimeTree uses milliseconds
+            start=_seconds(event_data["start_at"]),
+            end=_seconds(event_data["end_at"]),
+            start_tz=sys.intern(event_data.get("start_timezone", "UTC")),
+            end_tz=sys.intern(event_data.get("end_timezone", "UTC")),
+            all_day=bool(event_data.get("all_day")),
+            location=event_data.get("location", ""),
+            url=event_data.get("url") or None,
+            note=_pack_note(event_data.get("note", "")),
+            recurrences=tuple(recurrences) if recurrences and not parent_uid else None,
+            parent_uid=parent_uid,
+            recurrence_id=recurrence_id,
+            alerts=_alert_minutes(event_data.get("alerts")),
+        )
+
+    def as_api(self) -> dict[str, Any]:
+        """Return the record as a TimeTree API event, the inverse of from_api."""
+        recurrences = list(self.recurrences or ())
+        if self.recurrence_id is not None:
+            recurrences.append(self.recurrence_id)
+        return {
+            "uuid": self.uid,
+            "title": self.summary,
+            "all_day": self.all_day,
+            # TimeTree uses milliseconds
+            "start_at": round(self.start * 1000),
+            "start_timezone": self.start_tz,
+            "end_at": round(self.end * 1000),
+            "end_timezone": self.end_tz,
+            "note": self.description,
+            "location": self.location,
+            "url": self.url or "",
+            "recurrences": recurrences,
+            "parent_id": self.parent_uid,
+            "alerts": list(self.alerts or ()),
+        }
+
+    @property
+    def description(self) -> str:
+        """Return the note, decompressing it if needed."""
+        if isinstance(self.note, bytes):
+            return zlib.decompress(self.note).decode()
+        return self.note
+
+    @property
+    def dtstart(self) -> datetime | date:
+        """Return the start as an aware datetime, or a date if all-day."""
+        if self.all_day:
+            return convert_timestamp_to_date(self.start, self.start_tz)
+        return convert_timestamp_to_datetime(self.start, ZoneInfo(self.start_tz))
+
+    @property
+    def dtend(self) -> datetime | date:
+        """Return the end as an aware datetime, or a date if all-day."""
+        if self.all_day:
+            return convert_timestamp_to_date(self.end, self.end_tz)
+        return convert_timestamp_to_datetime(self.end, ZoneInfo(self.end_tz))
+
+    @property
+    def span(self) -> tuple[datetime | date, datetime | date]:
+        """Return start and end together, converted in one batch."""
+        if self.all_day:
+            return (
+                convert_timestamp_to_date(self.start, self.start_tz),
+                convert_timestamp_to_date(self.end, self.end_tz),
+            )
+        return convert_event_times(self.start, self.end, self.start_tz, self.end_tz)
+
+    def changed_fields(self, other: "TimeTreeEvent") -> list[str]:
+        """Return the names of the fields another version of the event changed."""
+        return [
+            "description" if field.name == "note" else field.name
+            for field in fields(self)
+            if getattr(self, field.name) != getattr(other, field.name)
+        ]
+
+    def as_row(self) -> list[Any]:
+        """Return the record as a compact row for the on-disk cache."""
+        return [
+            self.uid,
+            self.summary,
+            self.description,
+            self.location,
+            self.url,
+            _compact_number(self.start),
+            _compact_number(self.end),
+            self.start_tz,
+            self.end_tz,
+            self.all_day,
+            list(self.recurrences) if self.recurrences else None,
+            self.parent_uid,
+            self.recurrence_id,
+            list(self.alerts) if self.alerts else None,
+        ]
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> "TimeTreeEvent":
+        """Create a record from a row of the on-disk cache."""
+        (
+            uid,
+            summary,
+            description,
+            location,
+            url,
+            start,
+            end,
+            start_tz,
+            end_tz,
+            all_day,
+            recurrences,
+            parent_uid,
+            recurrence_id,
+            alerts,
+        ) = row
+        return cls(
+            uid=uid,
+            summary=summary,
+            start=start,
+            end=end,
+            start_tz=sys.intern(start_tz),
+            end_tz=sys.intern(end_tz),
+            all_day=all_day,
+            location=location,
+            url=url,
+            note=_pack_note(description),
+            recurrences=tuple(recurrences) if recurrences else None,
+            parent_uid=parent_uid,
+            recurrence_id=recurrence_id,
+            alerts=tuple(alerts) if alerts else None,
+        )
+
+
+def iter_api_events(
+    events: list[dict[str, Any]],
+) -> Iterator[tuple[str, TimeTreeEvent | None]]:
+    """Convert a chunk of API events, releasing each raw event once used.
+
+    Yields ``(uid, record)`` pairs, with None as record for deleted
+    events. The raw list is emptied as it is consumed.
+    """
+    events.reverse()
+    while events:
+        event_data = events.pop()
+        if event_data.get("deactivated_at") is not None:
+            yield event_data["uuid"], None
+        else:
+            yield event_data["uuid"], TimeTreeEvent.from_api(event_data)
+
+
+def _seconds(milliseconds: int) -> int | float:
+    """Convert epoch milliseconds to seconds, as an int when whole."""
+    if milliseconds % 1000 == 0:
+        return milliseconds // 1000
+    return milliseconds / 1000
+
+
+def _alert_minutes(alerts: list[Any] | None) -> tuple[int, ...] | None:
+    """Return the distinct alert offsets of an API event, in minutes."""
+    minutes = set()
+    for alert in alerts or ():
+        # Plain offsets, or alert objects carrying them
+        value = alert.get("minutes") if isinstance(alert, dict) else alert
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            minutes.add(int(value))
+    return tuple(sorted(minutes)) or None
+
+
+def _compact_number(value: float) -> int | float:
+    """Return a number as an int when it is whole."""
+    return int(value) if float(value).is_integer() else value
+
+
+def _pack_note(note: str | None) -> str | bytes:
+    """Compress long notes, keep short ones as they are."""
+    note = note or ""
+    if len(note) > NOTE_COMPRESS_THRESHOLD:
+        return zlib.compress(note.encode())
+    return note
@@ -0,0 +1,145 @@
+"""Persistent queue of event changes for the TimeTree Calendar integration."""
+import asyncio
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, OUTBOX_SAVE_DELAY, STORAGE_VERSION_OUTBOX
+from .event_store import TimeTreeEventStore
+from .models import TimeTreeEvent
+from .timetree_api import TimeTreeAPIClient, TimeTreeWriteError
+
+_LOGGER = logging.getLogger(__name__)
+
+ACTION_CREATE = "create"
+ACTION_UPDATE = "update"
+ACTION_DELETE = "delete"
+
+
+class TimeTreeOutbox:
+    """Event changes of one account waiting to be sent to TimeTree.
+
+    Each change is a dict with the calendar id, the action, the event uid
+    and, except for deletions, the TimeTree event payload. The queue is
+    saved to disk so changes survive restarts and outages, and is sent in
+    order. Successive changes to one event are merged while they wait.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: TimeTreeAPIClient, key: str) -> None:
+        """Initialize an empty outbox."""
+        self.client = client
+        self._store: Store = Store(hass, STORAGE_VERSION_OUTBOX, f"{DOMAIN}.outbox_{key}")
+        self._changes: list[dict[str, Any]] = []
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        # Change being sent, which must not be merged with newer ones
+        self._sending: dict[str, Any] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of changes waiting."""
+        return len(self._changes)
+
+    async def async_load(self) -> None:
+        """Load the changes saved by a previous run, once."""
+        async with self._load_lock:
+            if not self._loaded:
+                self._loaded = True
+                if (saved := await self._store.async_load()) is not None:
+                    self._changes = saved["changes"] + self._changes
+
+    def _async_schedule_save(self) -> None:
+        """Save the queue after a short delay."""
+        self._store.async_delay_save(
+            lambda: {"changes": self._changes}, OUTBOX_SAVE_DELAY
+        )
+
+    def put(
+        self,
+        calendar_id: int,
+        action: str,
+        uid: str,
+        payload: dict[str, Any] | None = None,
+    ) -> None:
+        """Queue a change, merging it with a waiting change of the same event."""
+        change = {
+            "calendar_id": calendar_id,
+            "action": action,
+            "uid": uid,
+            "payload": payload,
+        }
+        waiting = next(
+            (
+                queued
+                for queued in reversed(self._changes)
+                if queued["calendar_id"] == calendar_id and queued["uid"] == uid
+            ),
+            None,
+        )
+        if waiting is None or waiting is self._sending:
+            self._changes.append(change)
+        elif waiting["action"] == ACTION_CREATE and action == ACTION_DELETE:
+            # Never reached TimeTree, nothing left to send
+            self._changes = [queued for queued in self._changes if queued is not waiting]
+        elif waiting["action"] == ACTION_CREATE:
+            waiting["payload"] = payload
+        elif waiting["action"] == ACTION_UPDATE:
+            waiting["action"] = action
+            waiting["payload"] = payload
+        else:
+            self._changes.append(change)
+        self._async_schedule_save()
+
+    def overlay(self, calendar_id: int, store: TimeTreeEventStore) -> bool:
+        """Apply the waiting changes of a calendar on top of synced events.
+
+        Keeps local changes visible until TimeTree has them, even when a
+        sync replaced the store. Return True if the store changed.
+        """
+        changed = False
+        for change in self._changes:
+            if change["calendar_id"] != calendar_id:
+                continue
+            if change["action"] == ACTION_DELETE:
+                changed |= store.remove(change["uid"])
+            else:
+                changed |= store.upsert(TimeTreeEvent.from_api(change["payload"]))
+        return changed
+
+    async def async_flush(self) -> set[int]:
+        """Send the waiting changes in order.
+
+        Stops at the first connection error, leaving the rest queued for the
+        next attempt. Changes TimeTree refuses are dropped, and the ids of
+        their calendars are returned so they can be synced again in full.
+        """
+        await self.async_load()
+        rejected: set[int] = set()
+        async with self._flush_lock:
+            while self._changes:
+                change = self._sending = self._changes[0]
+                try:
+                    await self._async_send(change)
+                except TimeTreeWriteError:
+                    _LOGGER.warning(
+                        "TimeTree refused to %s event %s, discarding the change",
+                        change["action"],
+                        change["uid"],
+                    )
+                    rejected.add(change["calendar_id"])
+                finally:
+                    self._sending = None
+                self._changes = [queued for queued in self._changes if queued is not change]
+                self._async_schedule_save()
+        return rejected
+
+    async def _async_send(self, change: dict[str, Any]) -> None:
+        """Send one change to TimeTree."""
+        if change["action"] == ACTION_CREATE:
+            await self.client.create_event(change["calendar_id"], change["payload"])
+        elif change["action"] == ACTION_UPDATE:
+            await self.client.update_event(change["calendar_id"], change["payload"])
+        else:
+            await self.client.delete_event(change["calendar_id"], change["uid"])
@@ -0,0 +1,139 @@
+"""Recurring event expansion for the TimeTree Calendar integration."""
+from collections.abc import Iterator
+from datetime import date, datetime, time, timezone
+import logging
+import re
+
+from dateutil.rrule import rruleset, rrulestr
+
+from .models import TimeTreeEvent
+
+_LOGGER = logging.getLogger(__name__)
+
+_UTC_STAMP = re.compile(r"(\d{8}T\d{6})Z")
+
+
+class TimeTreeRecurrence:
+    """Parsed RRULE/RDATE/EXDATE set of one recurring event series.
+
+    Occurrences are generated lazily for the requested window only, so a
+    series spanning decades costs no memory until it is queried.
+    """
+
+    def __init__(self, event: TimeTreeEvent) -> None:
+        """Parse the recurrence lines of a series event."""
+        self.event = event
+        start, end = event.span
+        self.all_day = event.all_day
+        # All-day series recur on floating (naive) midnights
+        self.dtstart = (
+            datetime.combine(start, time()) if self.all_day else start
+        )
+        self.duration = (
+            datetime.combine(end, time()) if self.all_day else end
+        ) - self.dtstart
+        lines = list(event.recurrences or ())
+        if self.all_day:
+            # Floating series cannot be bounded by UTC stamps
+            lines = [_UTC_STAMP.sub(r"\1", line) for line in lines]
+        self._ruleset: rruleset = rrulestr(
+            "\n".join(lines),
+            dtstart=self.dtstart,
+            forceset=True,
+            unfold=True,
+        )
+
+    def _to_series_time(self, value: datetime) -> datetime:
+        """Convert an aware query bound to the series' time base."""
+        if self.all_day:
+            return value.replace(tzinfo=None)
+        return value
+
+    def occurrence_key(self, start: datetime | date) -> date:
+        """Return the key matching an occurrence with its overrides."""
+        if isinstance(start, datetime):
+            if not self.all_day and start.tzinfo is not None:
+                start = start.astimezone(self.dtstart.tzinfo)
+            return start.date()
+        return start
+
+    def between(
+        self, start: datetime, end: datetime, overridden: set[date] | None = None
+    ) -> Iterator[tuple[datetime | date, datetime | date]]:
+        """Yield (start, end) of occurrences overlapping a range.
+
+        Yields occurrences ending at or after start and starting at or before
+        end. Bounds must be aware datetimes in the local timezone.
+        Occurrences replaced by a single edited instance are skipped.
+        """
+        after = self._to_series_time(start) - self.duration
+        before = self._to_series_time(end)
+        for occurrence in self._ruleset.xafter(after, inc=True):
+            if occurrence > before:
+                return
+            if overridden and self.occurrence_key(occurrence) in overridden:
+                continue
+            yield self._occurrence(occurrence)
+
+    def first_not_ended(
+        self, now: datetime, overridden: set[date] | None = None
+    ) -> tuple[datetime | date, datetime | date] | None:
+        """Return the first occurrence that has not ended at now."""
+        after = self._to_series_time(now) - self.duration
+        for occurrence in self._ruleset.xafter(after, inc=True):
+            if overridden and self.occurrence_key(occurrence) in overridden:
+                continue
+            return self._occurrence(occurrence)
+        return None
+
+    def first_starting_after(
+        self, moment: datetime, overridden: set[date] | None = None
+    ) -> tuple[datetime | date, datetime | date] | None:
+        """Return the first occurrence starting after moment."""
+        for occurrence in self._ruleset.xafter(self._to_series_time(moment)):
+            if overridden and self.occurrence_key(occurrence) in overridden:
+                continue
+            return self._occurrence(occurrence)
+        return None
+
+    def _occurrence(
+        self, start: datetime
+    ) -> tuple[datetime | date, datetime | date]:
+        """Return start and end of one occurrence."""
+        end = start + self.duration
+        if self.all_day:
+            return start.date(), end.date()
+        return start, end
+
+
+def parse_recurrence(event: TimeTreeEvent) -> TimeTreeRecurrence | None:
+    """Parse a series event, or return None if its rules are unusable."""
+    try:
+        return TimeTreeRecurrence(event)
+    except (ValueError, TypeError) as err:
+        _LOGGER.warning(
+            "Ignoring recurrence rules %s of event %s: %s",
+            event.recurrences,
+            event.uid,
+            err,
+        )
+        return None
+
+
+def parse_recurrence_id(value: str) -> datetime | date | None:
+    """Return the original occurrence start from a RECURRENCE-ID line.
+
+    UTC stamps are returned aware, stamps with a TZID are returned naive
+    and are taken to be in the series' own timezone.
+    """
+    stamp = value.rpartition(":")[2].strip()
+    try:
+        if stamp.endswith("Z"):
+            return datetime.strptime(stamp, "%Y%m%dT%H%M%SZ").replace(
+                tzinfo=timezone.utc
+            )
+        if "T" in stamp:
+            return datetime.strptime(stamp, "%Y%m%dT%H%M%S")
+        return datetime.strptime(stamp, "%Y%m%d").date()
+    except ValueError:
+        return None
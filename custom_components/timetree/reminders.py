@@ -0,0 +1,247 @@
+"""Alert reminders for the TimeTree Calendar integration."""
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+import heapq
+from itertools import count
+import logging
+from typing import TYPE_CHECKING, NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util import dt as dt_util
+
+from .models import TimeTreeEvent
+
+if TYPE_CHECKING:
+    from .coordinator import TimeTreeCalendarData
+
+_LOGGER = logging.getLogger(__name__)
+
+# Heap entries of changed events stay until they surface; the heap is
+# rebuilt without them once they outnumber the live entries
+MIN_COMPACT_SIZE = 1024
+
+
+class _Reminder(NamedTuple):
+    """One pending alert of an event or series occurrence.
+
+    Ordered by trigger time, then by the unique sequence number, so the
+    remaining fields are never compared.
+    """
+
+    trigger: float
+    sequence: int
+    calendar_id: int
+    uid: str
+    # Scheduling of the event this entry belongs to, stale once it changed
+    token: int
+    minutes: int
+    start: datetime | date
+    end: datetime | date
+
+
+ReminderCallback = Callable[
+    [int, TimeTreeEvent, datetime | date, datetime | date, int], None
+]
+
+
+def _local_start(start: datetime | date) -> datetime:
+    """Return an occurrence start as aware datetime, local midnight if all-day."""
+    if isinstance(start, datetime):
+        return start
+    return dt_util.start_of_local_day(start)
+
+
+class TimeTreeReminderScheduler:
+    """Due alerts of all calendars of an account, in one min-heap.
+
+    Only the earliest alert has a timer. Single events contribute one
+    entry per alert; a recurring series contributes one entry per alert
+    for its next occurrence only, replaced by the following occurrence
+    when it fires. When a calendar changes, only the events whose alerts,
+    times or overrides changed are scheduled again; their old entries are
+    dropped lazily when they reach the top of the heap.
+    """
+
+    def __init__(self, hass: HomeAssistant, on_reminder: ReminderCallback) -> None:
+        """Initialize an empty scheduler."""
+        self.hass = hass
+        self._on_reminder = on_reminder
+        self._heap: list[_Reminder] = []
+        self._sequence = count()
+        # Calendar data the entries were scheduled from, and the token and
+        # number of the current entries per (calendar, uid)
+        self._calendars: dict[int, "TimeTreeCalendarData"] = {}
+        self._tokens: dict[tuple[int, str], int] = {}
+        self._pending: dict[tuple[int, str], int] = {}
+        self._stale = 0
+        self._timer_at: float | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+
+    def __len__(self) -> int:
+        """Return the number of pending alerts."""
+        return len(self._heap) - self._stale
+
+    @callback
+    def async_update_calendar(
+        self, calendar_id: int, calendar: "TimeTreeCalendarData"
+    ) -> None:
+        """Schedule the alerts of a calendar's new data."""
+        now = dt_util.now()
+        previous = self._calendars.get(calendar_id)
+        self._calendars[calendar_id] = calendar
+        old_events = previous.alerted if previous is not None else {}
+        for uid in old_events:
+            if uid not in calendar.alerted:
+                self._invalidate(calendar_id, uid)
+        for uid, event in calendar.alerted.items():
+            old_event = old_events.get(uid)
+            if old_event == event and (
+                uid not in calendar.series_by_uid
+                or previous.overridden.get(uid) == calendar.overridden.get(uid)
+            ):
+                continue
+            self._invalidate(calendar_id, uid)
+            self._schedule(calendar_id, event, now)
+        self._async_update_timer()
+
+    @callback
+    def async_remove_calendar(self, calendar_id: int) -> None:
+        """Drop the alerts of a calendar."""
+        if (calendar := self._calendars.pop(calendar_id, None)) is None:
+            return
+        for uid in calendar.alerted:
+            self._invalidate(calendar_id, uid)
+        self._async_update_timer()
+
+    def _invalidate(self, calendar_id: int, uid: str) -> None:
+        """Mark the entries of an event stale."""
+        self._tokens.pop((calendar_id, uid), None)
+        self._stale += self._pending.pop((calendar_id, uid), 0)
+
+    def _schedule(self, calendar_id: int, event: TimeTreeEvent, now: datetime) -> None:
+        """Add entries for the alerts of an event that are still ahead."""
+        token = next(self._sequence)
+        self._tokens[(calendar_id, event.uid)] = token
+        if event.uid in self._calendars[calendar_id].series_by_uid:
+            for minutes in event.alerts or ():
+                self._schedule_occurrence(calendar_id, event.uid, token, minutes, now)
+            return
+        start, end = event.span
+        local_start = _local_start(start)
+        for minutes in event.alerts or ():
+            trigger = local_start - timedelta(minutes=minutes)
+            if trigger > now:
+                self._push(trigger, calendar_id, event.uid, token, minutes, start, end)
+
+    def _schedule_occurrence(
+        self, calendar_id: int, uid: str, token: int, minutes: int, now: datetime
+    ) -> None:
+        """Add the entry of a series alert for its next occurrence still ahead."""
+        calendar = self._calendars[calendar_id]
+        occurrence = calendar.series_by_uid[uid].first_starting_after(
+            now + timedelta(minutes=minutes), calendar.overridden.get(uid)
+        )
+        if occurrence is not None:
+            start, end = occurrence
+            trigger = _local_start(start) - timedelta(minutes=minutes)
+            self._push(trigger, calendar_id, uid, token, minutes, start, end)
+
+    def _push(
+        self,
+        trigger: datetime,
+        calendar_id: int,
+        uid: str,
+        token: int,
+        minutes: int,
+        start: datetime | date,
+        end: datetime | date,
+    ) -> None:
+        """Add an entry to the heap."""
+        key = (calendar_id, uid)
+        self._pending[key] = self._pending.get(key, 0) + 1
+        heapq.heappush(
+            self._heap,
+            _Reminder(
+                trigger.timestamp(),
+                next(self._sequence),
+                calendar_id,
+                uid,
+                token,
+                minutes,
+                start,
+                end,
+            ),
+        )
+
+    def _is_live(self, reminder: _Reminder) -> bool:
+        """Return True if an entry belongs to the current version of its event."""
+        return self._tokens.get((reminder.calendar_id, reminder.uid)) == reminder.token
+
+    @callback
+    def _async_update_timer(self) -> None:
+        """Point the timer at the earliest live entry."""
+        heap = self._heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+            self._stale -= 1
+        if len(heap) >= MIN_COMPACT_SIZE and self._stale > len(heap) // 2:
+            self._heap = heap = [reminder for reminder in heap if self._is_live(reminder)]
+            heapq.heapify(heap)
+            self._stale = 0
+
+        trigger = heap[0].trigger if heap else None
+        if trigger == self._timer_at:
+            return
+        self.async_close()
+        self._timer_at = trigger
+        if trigger is not None:
+            self._unsub_timer = async_track_point_in_time(
+                self.hass, self._async_fire_due, dt_util.utc_from_timestamp(trigger)
+            )
+
+    @callback
+    def _async_fire_due(self, _now: datetime) -> None:
+        """Fire every alert that is due and schedule the next ones."""
+        self._unsub_timer = None
+        self._timer_at = None
+        now = dt_util.now()
+        moment = now.timestamp()
+        fired = 0
+        while self._heap and self._heap[0].trigger <= moment:
+            reminder = heapq.heappop(self._heap)
+            if not self._is_live(reminder):
+                self._stale -= 1
+                continue
+            key = (reminder.calendar_id, reminder.uid)
+            if (pending := self._pending[key] - 1) > 0:
+                self._pending[key] = pending
+            else:
+                del self._pending[key]
+            calendar = self._calendars[reminder.calendar_id]
+            self._on_reminder(
+                reminder.calendar_id,
+                calendar.alerted[reminder.uid],
+                reminder.start,
+                reminder.end,
+                reminder.minutes,
+            )
+            fired += 1
+            if reminder.uid in calendar.series_by_uid:
+                self._schedule_occurrence(
+                    reminder.calendar_id,
+                    reminder.uid,
+                    reminder.token,
+                    reminder.minutes,
+                    now,
+                )
+        _LOGGER.debug("Fired %d TimeTree reminders", fired)
+        self._async_update_timer()
+
+    @callback
+    def async_close(self) -> None:
+        """Cancel the timer."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._timer_at = None
@@ -0,0 +1,87 @@
+"""Adaptive polling schedule for the TimeTree Calendar integration."""
+from datetime import datetime, timedelta
+
+# A refresh this soon before an event starts or ends covers that boundary
+NEAR_BOUNDARY = timedelta(minutes=5)
+# Cap on the exponent used for quiet period and error back-off
+MAX_BACKOFF_STEPS = 6
+
+
+class TimeTreePollScheduler:
+    """Pick the next update interval from recent activity and errors.
+
+    The interval doubles from the base interval for every quiet refresh
+    or failed refresh up to the ceiling, shrinks gradually as an event
+    boundary approaches so one refresh lands just before it, drops to the
+    floor once after a refresh that saw changes, and never polls sooner
+    than a Retry-After response allows.
+    """
+
+    def __init__(
+        self, base: timedelta, floor: timedelta, ceiling: timedelta
+    ) -> None:
+        """Initialize the scheduler."""
+        self.base = base
+        self.floor = floor
+        self.ceiling = ceiling
+        self._quiet_refreshes = 0
+        self._errors = 0
+        self._retry_after: timedelta | None = None
+
+    def configure(
+        self, base: timedelta, floor: timedelta, ceiling: timedelta
+    ) -> None:
+        """Update the interval bounds."""
+        self.base = base
+        self.floor = floor
+        self.ceiling = ceiling
+
+    def record_success(self, changed: bool) -> None:
+        """Record a successful refresh."""
+        self._errors = 0
+        self._retry_after = None
+        if changed:
+            self._quiet_refreshes = 0
+        else:
+            self._quiet_refreshes += 1
+
+    def record_error(self, retry_after: float | None = None) -> None:
+        """Record a failed refresh, optionally rate limited by the server."""
+        self._errors += 1
+        self._retry_after = (
+            timedelta(seconds=retry_after) if retry_after is not None else None
+        )
+
+    def _clamp(self, interval: timedelta) -> timedelta:
+        """Keep an interval within the configured bounds."""
+        return max(self.floor, min(self.ceiling, interval))
+
+    def next_interval(
+        self, now: datetime, next_boundary: datetime | None
+    ) -> timedelta:
+        """Return the delay until the next refresh.
+
+        next_boundary is the first event start or end more than
+        NEAR_BOUNDARY after now; closer ones are covered by this refresh.
+        """
+        if self._errors:
+            steps = min(self._errors, MAX_BACKOFF_STEPS)
+            interval = self._clamp(self.base * 2**steps)
+            if self._retry_after is not None:
+                interval = max(interval, self._retry_after)
+            return interval
+
+        if self._quiet_refreshes == 0:
+            # Look once more shortly after a change
+            return self.floor
+
+        steps = min(self._quiet_refreshes - 1, MAX_BACKOFF_STEPS)
+        interval = self.base * 2**steps
+        if next_boundary is not None:
+            # Land a refresh just as the boundary becomes near, halving longer
+            # waits on the way there so refreshes get denser as it approaches
+            until_near = next_boundary - NEAR_BOUNDARY - now
+            interval = min(
+                interval, until_near if until_near <= self.base * 2 else until_near / 2
+            )
+        return self._clamp(interval)
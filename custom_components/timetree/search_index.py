@@ -0,0 +1,151 @@
+"""Full-text search index for TimeTree calendar events."""
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from itertools import islice
+import math
+import re
+
+from .models import TimeTreeEvent
+
+_TOKEN = re.compile(r"\w+")
+
+# Below this many candidates, terms are checked against each candidate's
+# tokens instead of being looked up in the index
+CANDIDATE_CHECK_LIMIT = 256
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into casefolded word tokens."""
+    return _TOKEN.findall(text.casefold())
+
+
+def _event_tokens(event: TimeTreeEvent) -> frozenset[str]:
+    """Return the tokens of an event's summary, note and location."""
+    return frozenset(
+        tokenize(f"{event.summary}\n{event.description}\n{event.location}")
+    )
+
+
+def _has_token(tokens: frozenset[str], term: str, prefix: bool) -> bool:
+    """Return True if a token equals term, or starts with it with prefix."""
+    if not prefix:
+        return term in tokens
+    return any(token.startswith(term) for token in tokens)
+
+
+class TimeTreeSearchIndex:
+    """Inverted index from word tokens to the events containing them.
+
+    Covers summaries, notes and locations. A sorted vocabulary next to the
+    postings answers prefix lookups with a binary search, and a changed
+    event only touches the postings of the tokens it gained or lost.
+    """
+
+    def __init__(self, events: Iterable[TimeTreeEvent] = ()) -> None:
+        """Build the index from event records."""
+        self._events: dict[str, TimeTreeEvent] = {}
+        self._tokens: dict[str, frozenset[str]] = {}
+        self._postings: dict[str, set[str]] = {}
+        for event in events:
+            self._events[event.uid] = event
+            self._tokens[event.uid] = tokens = _event_tokens(event)
+            for token in tokens:
+                self._postings.setdefault(token, set()).add(event.uid)
+        # Sorted on the first prefix lookup, then kept sorted on changes
+        self._vocabulary: list[str] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of indexed events."""
+        return len(self._events)
+
+    def add(self, event: TimeTreeEvent) -> None:
+        """Index a new event, or update the postings of a changed one."""
+        uid = event.uid
+        old_tokens = self._tokens.get(uid, frozenset())
+        tokens = _event_tokens(event)
+        self._events[uid] = event
+        self._tokens[uid] = tokens
+        for token in old_tokens - tokens:
+            self._discard_posting(token, uid)
+        for token in tokens - old_tokens:
+            if token not in self._postings:
+                self._postings[token] = set()
+                if self._vocabulary is not None:
+                    insort(self._vocabulary, token)
+            self._postings[token].add(uid)
+
+    def remove(self, uid: str) -> None:
+        """Drop an event from the index, if present."""
+        if self._events.pop(uid, None) is None:
+            return
+        for token in self._tokens.pop(uid):
+            self._discard_posting(token, uid)
+
+    def _discard_posting(self, token: str, uid: str) -> None:
+        """Remove an event from the postings of a token."""
+        postings = self._postings[token]
+        postings.discard(uid)
+        if not postings:
+            del self._postings[token]
+            if self._vocabulary is not None:
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def _lookup(self, term: str, prefix: bool) -> set[str]:
+        """Return the uids of events with a token equal to or starting with term."""
+        if not prefix:
+            return self._postings.get(term, set())
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        uids: set[str] = set()
+        for token in islice(vocabulary, bisect_left(vocabulary, term), None):
+            if not token.startswith(term):
+                break
+            uids |= self._postings[token]
+        return uids
+
+    def search(
+        self,
+        query: str,
+        prefix: bool = True,
+        start: float | None = None,
+        end: float | None = None,
+    ) -> list[TimeTreeEvent]:
+        """Return events containing every term of a query, by start time.
+
+        With prefix, terms also match the words they start. Single events
+        are limited to those overlapping start and end in epoch seconds;
+        recurring series are always returned, as their first occurrence
+        says nothing about later ones.
+        """
+        # Rare words first, so the candidates shrink early; words that only
+        # occur as a prefix come last, their lookup can cover many tokens
+        terms = sorted(
+            set(tokenize(query)),
+            key=lambda term: len(self._postings.get(term, ())) or math.inf,
+        )
+        uids: set[str] | None = None
+        for term in terms:
+            if uids is not None and len(uids) < CANDIDATE_CHECK_LIMIT:
+                uids = {
+                    uid for uid in uids if _has_token(self._tokens[uid], term, prefix)
+                }
+            else:
+                matches = self._lookup(term, prefix)
+                uids = matches if uids is None else uids & matches
+            if not uids:
+                return []
+        if uids is None:
+            return []
+
+        events = [
+            event
+            for event in map(self._events.__getitem__, uids)
+            if event.recurrences
+            or (
+                (start is None or event.end >= start)
+                and (end is None or event.start <= end)
+            )
+        ]
+        events.sort(key=lambda event: event.start)
+        return events
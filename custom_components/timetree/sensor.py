@@ -0,0 +1,204 @@
+"""Diagnostic sensor platform for TimeTree Calendar integration."""
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+
+from .const import DOMAIN, CONF_CALENDAR_NAME, CONF_CALENDAR_ID
+from .coordinator import TimeTreeCoordinator
+from .metrics import CalendarRefreshMetrics, RefreshHistory
+
+
+def _calendar_value(
+    value_fn: Callable[[CalendarRefreshMetrics], StateType],
+) -> Callable[[RefreshHistory, int], StateType]:
+    """Read a value of the sensor's calendar from the last refresh."""
+
+    def _value(history: RefreshHistory, calendar_id: int) -> StateType:
+        if history.last is None:
+            return None
+        if (calendar := history.last.calendars.get(calendar_id)) is None:
+            return None
+        return value_fn(calendar)
+
+    return _value
+
+
+def _cache_hit_ratio(history: RefreshHistory, calendar_id: int) -> StateType:
+    """Return the conditional sync hit ratio in percent."""
+    if (ratio := history.cache_hit_ratio(calendar_id)) is None:
+        return None
+    return round(ratio * 100, 1)
+
+
+@dataclass
+class TimeTreeSensorEntityDescriptionMixin:
+    """Required keys of a TimeTree diagnostic sensor."""
+
+    value_fn: Callable[[RefreshHistory, int], StateType]
+
+
+@dataclass
+class TimeTreeSensorEntityDescription(
+    SensorEntityDescription, TimeTreeSensorEntityDescriptionMixin
+):
+    """Describes a TimeTree diagnostic sensor."""
+
+
+_DURATION = {
+    "device_class": SensorDeviceClass.DURATION,
+    "native_unit_of_measurement": UnitOfTime.SECONDS,
+    "state_class": SensorStateClass.MEASUREMENT,
+    "suggested_display_precision": 3,
+}
+
+SENSOR_DESCRIPTIONS: tuple[TimeTreeSensorEntityDescription, ...] = (
+    TimeTreeSensorEntityDescription(
+        key="refresh_duration",
+        name="refresh duration",
+        value_fn=lambda history, _: history.last.duration if history.last else None,
+        **_DURATION,
+    ),
+    TimeTreeSensorEntityDescription(
+        key="refresh_duration_p95",
+        name="refresh duration p95",
+        value_fn=lambda history, _: history.duration_percentile(0.95),
+        entity_registry_enabled_default=False,
+        **_DURATION,
+    ),
+    TimeTreeSensorEntityDescription(
+        key="auth_duration",
+        name="sign in duration",
+        value_fn=lambda history, _: history.last.auth_time if history.last else None,
+        entity_registry_enabled_default=False,
+        **_DURATION,
+    ),
+    TimeTreeSensorEntityDescription(
+        key="fetch_duration",
+        name="fetch duration",
+        value_fn=_calendar_value(lambda calendar: calendar.fetch_time),
+        **_DURATION,
+    ),
+    TimeTreeSensorEntityDescription(
+        key="processing_duration",
+        name="processing duration",
+        value_fn=_calendar_value(
+            lambda calendar: calendar.convert_time + calendar.index_time
+        ),
+        **_DURATION,
+    ),
+    TimeTreeSensorEntityDescription(
+        key="data_received",
+        name="data received",
+        value_fn=_calendar_value(lambda calendar: calendar.requests.bytes_received),
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    TimeTreeSensorEntityDescription(
+        key="chunks",
+        name="sync chunks",
+        value_fn=_calendar_value(lambda calendar: calendar.chunks),
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    TimeTreeSensorEntityDescription(
+        key="events_received",
+        name="events received",
+        value_fn=_calendar_value(lambda calendar: calendar.events_received),
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    TimeTreeSensorEntityDescription(
+        key="retries",
+        name="retries",
+        value_fn=_calendar_value(lambda calendar: calendar.requests.retries),
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    TimeTreeSensorEntityDescription(
+        key="reauths",
+        name="sign ins after expiry",
+        value_fn=lambda history, _: (
+            history.last.requests.reauths if history.last else None
+        ),
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    TimeTreeSensorEntityDescription(
+        key="cache_hit_ratio",
+        name="unchanged sync ratio",
+        value_fn=_cache_hit_ratio,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up TimeTree diagnostic sensors."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    calendar_name = entry.data[CONF_CALENDAR_NAME]
+    calendar_id = entry.data[CONF_CALENDAR_ID]
+
+    async_add_entities(
+        TimeTreeMetricsSensor(coordinator, description, calendar_name, calendar_id)
+        for description in SENSOR_DESCRIPTIONS
+    )
+
+
+class TimeTreeMetricsSensor(SensorEntity):
+    """Sync pipeline metric of the last refreshes of a TimeTree calendar."""
+
+    entity_description: TimeTreeSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        coordinator: TimeTreeCoordinator,
+        description: TimeTreeSensorEntityDescription,
+        calendar_name: str,
+        calendar_id: int,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._coordinator = coordinator
+        self._calendar_id = calendar_id
+        self._attr_name = f"TimeTree {calendar_name} {description.name}"
+        self._attr_unique_id = f"timetree_{calendar_id}_{description.key}"
+
+    async def async_added_to_hass(self) -> None:
+        """Update whenever the coordinator finishes a refresh."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self._coordinator.metrics_signal, self._async_metrics_updated
+            )
+        )
+
+    @callback
+    def _async_metrics_updated(self) -> None:
+        """Write the state for the latest refresh."""
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the metric."""
+        return self.entity_description.value_fn(
+            self._coordinator.metrics, self._calendar_id
+        )
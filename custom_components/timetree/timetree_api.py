@@ -1,193 +1,854 @@
 """TimeTree API client wrapper for Home Assistant integration."""
+import asyncio
+import hashlib
+import json
 import logging
+import time
 import uuid
-from datetime import datetime, timedelta
-from typing import Any
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from email.utils import parsedate_to_datetime
+from functools import lru_cache, partial
+from importlib.util import find_spec
+from typing import Any, TypeVar
 from zoneinfo import ZoneInfo
 
-import requests
-from requests.exceptions import HTTPError, RequestException
+import aiohttp
 
-from .const import API_BASEURI, API_USER_AGENT
+from .const import (
+    API_BASEURI,
+    API_USER_AGENT,
+    CHUNK_RETRY_DELAYS,
+    DEFAULT_MAX_CHUNK_BYTES,
+    DEFAULT_MAX_CHUNKS,
+    DEFAULT_REQUEST_BURST,
+    DEFAULT_REQUEST_RATE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+# Status TimeTree answers a sync with for a cursor it no longer accepts
+INVALID_CURSOR_STATUS = 400
+READ_BLOCK_SIZE = 64 * 1024
+
+# Compressed encodings aiohttp can decode here; brotli needs an extra package
+ACCEPT_ENCODING = (
+    "br, gzip, deflate"
+    if find_spec("brotli") or find_spec("brotlicffi")
+    else "gzip, deflate"
+)
+
+# Event fields the integration reads, the rest is dropped right after decoding
+EVENT_FIELDS = frozenset(
+    {
+        "uuid",
+        "title",
+        "start_at",
+        "end_at",
+        "start_timezone",
+        "end_timezone",
+        "all_day",
+        "location",
+        "url",
+        "note",
+        "recurrences",
+        "parent_id",
+        "deactivated_at",
+        "alerts",
+    }
+)
+
+_R = TypeVar("_R")
+
 
 class TimeTreeAuthError(Exception):
     """Exception raised when authentication fails."""
 
 
+class TimeTreeSessionExpiredError(TimeTreeAuthError):
+    """Exception raised when TimeTree no longer accepts the session cookie."""
+
+
 class TimeTreeConnectionError(Exception):
     """Exception raised when connection to TimeTree fails."""
 
 
-class TimeTreeAPIClient:
-    """TimeTree API client."""
+class TimeTreeRateLimitError(TimeTreeConnectionError):
+    """Exception raised when TimeTree asks us to slow down."""
 
-    def __init__(self, email: str, password: str) -> None:
-        """Initialize the TimeTree API client."""
+    def __init__(self, retry_after: float | None) -> None:
+        """Initialize with the delay requested by the server, in seconds."""
+        super().__init__(f"Rate limited, retry after {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class TimeTreeCursorError(Exception):
+    """Exception raised when TimeTree rejects a sync cursor."""
+
+
+class TimeTreeWriteError(Exception):
+    """Exception raised when TimeTree refuses to create, change or delete an event."""
+
+
+@dataclass
+class TimeTreeEventChunk:
+    """One chunk of a (delta) events sync for one calendar.
+
+    ``first`` is set on the first chunk of a sync that did not resume from
+    a checkpoint, ``last`` on the chunk that completes the sync.
+    """
+
+    events: list[dict[str, Any]]
+    since: int | None
+    full_sync: bool
+    first: bool
+    last: bool
+    unchanged: bool = False
+
+
+@dataclass
+class TimeTreeRequestStats:
+    """Cumulative request counters of an API client."""
+
+    requests: int = 0
+    # Bytes on the wire, and after decompression
+    bytes_received: int = 0
+    bytes_decoded: int = 0
+    retries: int = 0
+    reauths: int = 0
+    conditional_requests: int = 0
+    not_modified: int = 0
+
+    def __sub__(self, other: "TimeTreeRequestStats") -> "TimeTreeRequestStats":
+        """Return the counts accumulated since an earlier copy."""
+        return TimeTreeRequestStats(
+            **{
+                name: getattr(self, name) - getattr(other, name)
+                for name in self.__dataclass_fields__
+            }
+        )
+
+
+# Counters of the requests made by the current task, see collect_stats()
+_SCOPED_STATS: ContextVar[TimeTreeRequestStats | None] = ContextVar(
+    "timetree_scoped_stats", default=None
+)
+
+
+class _RateLimiter:
+    """Token bucket shared by all requests of one client."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Take a token, waiting for one to be refilled if needed."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class TimeTreeAPIClient:
+    """Asynchronous TimeTree API client."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        email: str,
+        password: str,
+        session_id: str | None = None,
+        device_uuid: str | None = None,
+        on_session_update: Callable[[], None] | None = None,
+        max_chunks: int = DEFAULT_MAX_CHUNKS,
+        max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES,
+        request_rate: float | None = DEFAULT_REQUEST_RATE,
+        request_burst: int = DEFAULT_REQUEST_BURST,
+        json_loads: Callable[[bytes], Any] = json.loads,
+    ) -> None:
+        """Initialize the TimeTree API client.
+
+        The aiohttp session may be shared by several accounts, so the
+        TimeTree session cookie is sent explicitly. The session must not
+        keep cookies (use aiohttp.DummyCookieJar), as cookies in its jar
+        override the explicit one. A saved session cookie and device
+        uuid can be passed in to skip signing in again, and
+        ``on_session_update`` is called whenever a new session is obtained.
+        ``max_chunks`` and ``max_chunk_bytes`` bound the size of one sync.
+        All requests share a token bucket allowing ``request_rate`` requests
+        per second with bursts of ``request_burst``, or no limit if None.
+        Response bodies are decoded with ``json_loads``, so a faster JSON
+        library can be passed in.
+        """
         self.email = email
         self.password = password
-        self.session_id = None
-        self.session = requests.Session()
-
-    def authenticate(self) -> bool:
+        self.session_id = session_id
+        self.device_uuid = device_uuid or uuid.uuid4().hex
+        self.session = session
+        self._on_session_update = on_session_update
+        self._auth_lock = asyncio.Lock()
+        self.max_chunks = max_chunks
+        self.max_chunk_bytes = max_chunk_bytes
+        self._sync_cursors: dict[int, int] = {}
+        # Cursor and full sync flag of an interrupted sync per calendar
+        self._checkpoints: dict[int, tuple[int, bool]] = {}
+        # Last (url, etag, content digest) of an unchunked sync per calendar
+        self._validators: dict[int, tuple[str, str | None, bytes]] = {}
+        self.stats = TimeTreeRequestStats()
+        self._json_loads = json_loads
+        self._rate_limiter = (
+            _RateLimiter(request_rate, request_burst) if request_rate else None
+        )
+
+    def _headers(self) -> dict[str, str]:
+        """Return the headers for an API request."""
+        headers = {
+            "Content-Type": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
+            "X-Timetreea": API_USER_AGENT,
+        }
+        if self.session_id:
+            headers["Cookie"] = f"_session_id={self.session_id}"
+        return headers
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        """Add to a request counter, and to the scoped counters if any."""
+        setattr(self.stats, name, getattr(self.stats, name) + amount)
+        if (scoped := _SCOPED_STATS.get()) is not None:
+            setattr(scoped, name, getattr(scoped, name) + amount)
+
+    @contextmanager
+    def collect_stats(
+        self, stats: TimeTreeRequestStats
+    ) -> Iterator[TimeTreeRequestStats]:
+        """Also count the requests of the current task into stats.
+
+        Lets concurrent syncs of several calendars keep separate counts.
+        """
+        token = _SCOPED_STATS.set(stats)
+        try:
+            yield stats
+        finally:
+            _SCOPED_STATS.reset(token)
+
+    async def _throttle(self) -> None:
+        """Wait until the rate limit allows another request."""
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire()
+
+    async def _get(self, url: str) -> tuple[int, Any]:
+        """Perform a GET request, return status code and decoded body."""
+        self._count("requests")
+        await self._throttle()
+        async with self.session.get(
+            url, headers=self._headers(), timeout=REQUEST_TIMEOUT
+        ) as response:
+            _raise_for_status(response)
+            if response.status != 200:
+                return response.status, await response.text()
+            raw = await self._read_body(response)
+        return 200, self._json_loads(raw)
+
+    async def _read_body(self, response: aiohttp.ClientResponse) -> bytes:
+        """Read a response body, refusing bodies above max_chunk_bytes.
+
+        aiohttp decompresses the body as it arrives, so the limit applies
+        to the decompressed size.
+        """
+        if (response.content_length or 0) > self.max_chunk_bytes:
+            raise TimeTreeConnectionError("Response exceeds the maximum chunk size")
+        raw = bytearray()
+        async for piece in response.content.iter_chunked(READ_BLOCK_SIZE):
+            raw += piece
+            self._count("bytes_decoded", len(piece))
+            if len(raw) > self.max_chunk_bytes:
+                raise TimeTreeConnectionError("Response exceeds the maximum chunk size")
+        # Without a Content-Length the compressed size is unknown
+        self._count(
+            "bytes_received",
+            len(raw) if response.content_length is None else response.content_length,
+        )
+        return bytes(raw)
+
+    async def _get_conditional(self, calendar_id: int, url: str) -> tuple[int, Any]:
+        """Perform a GET request, returning 304 when the response is unchanged.
+
+        The ETag of the previous response is sent as If-None-Match. Servers
+        that ignore it are caught by comparing a digest of the body, so an
+        identical response is never decoded twice.
+        """
+        headers = self._headers()
+        validator = self._validators.get(calendar_id)
+        if validator is not None and validator[0] != url:
+            validator = None
+        if validator is not None and validator[1]:
+            headers["If-None-Match"] = validator[1]
+
+        self._count("requests")
+        self._count("conditional_requests")
+        await self._throttle()
+        async with self.session.get(
+            url, headers=headers, timeout=REQUEST_TIMEOUT
+        ) as response:
+            _raise_for_status(response)
+            if response.status == 304 and validator is not None:
+                self._count("not_modified")
+                return 304, None
+            if response.status != 200:
+                return response.status, await response.text()
+            raw = await self._read_body(response)
+            etag = response.headers.get("ETag")
+
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        if validator is not None and validator[2] == digest:
+            self._count("not_modified")
+            return 304, None
+
+        body = self._json_loads(raw)
+        # Only single page responses are complete enough to compare later
+        if body.get("chunk") is True:
+            self._validators.pop(calendar_id, None)
+        else:
+            self._validators[calendar_id] = (url, etag, digest)
+        return 200, body
+
+    async def authenticate(self) -> bool:
         """Authenticate with TimeTree and get session ID."""
         url = f"{API_BASEURI}/auth/email/signin"
         payload = {
             "uid": self.email,
             "password": self.password,
-            "uuid": str(uuid.uuid4()).replace("-", ""),
-        }
-        headers = {
-            "Content-Type": "application/json",
-            "X-Timetreea": API_USER_AGENT,
+            "uuid": self.device_uuid,
         }
 
         try:
-            response = requests.put(url, json=payload, headers=headers, timeout=10)
-            
-            if response.status_code != 200:
-                _LOGGER.error("Authentication failed: %s", response.text)
-                raise TimeTreeAuthError("Invalid credentials")
-
-            self.session_id = response.cookies.get("_session_id")
-            if not self.session_id:
+            await self._throttle()
+            async with self.session.put(
+                url, json=payload, headers=self._headers(), timeout=REQUEST_TIMEOUT
+            ) as response:
+                _raise_for_rate_limit(response)
+                if response.status != 200:
+                    _LOGGER.error("Authentication failed: %s", await response.text())
+                    raise TimeTreeAuthError("Invalid credentials")
+
+                cookie = response.cookies.get("_session_id")
+
+            if cookie is None or not cookie.value:
                 raise TimeTreeAuthError("No session ID received")
 
-            self.session.cookies.set("_session_id", self.session_id)
+            self.session_id = cookie.value
             _LOGGER.info("Successfully authenticated with TimeTree")
+            if self._on_session_update is not None:
+                self._on_session_update()
             return True
 
-        except RequestException as err:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
             _LOGGER.error("Connection error during authentication: %s", err)
             raise TimeTreeConnectionError("Cannot connect to TimeTree") from err
 
-    def get_calendars(self) -> list[dict[str, Any]]:
+    async def async_ensure_authenticated(self) -> None:
+        """Sign in unless a session is already available."""
+        async with self._auth_lock:
+            if self.session_id is None:
+                await self.authenticate()
+
+    async def _with_reauth(self, request: Callable[[], Awaitable[_R]]) -> _R:
+        """Run a request, signing in again once if the session expired.
+
+        The sign in happens under a lock and is skipped when a concurrent
+        request already replaced the expired session, so a burst of
+        expired requests results in a single sign in.
+        """
+        expired_session = self.session_id
+        try:
+            return await request()
+        except TimeTreeSessionExpiredError:
+            _LOGGER.info("TimeTree session expired, signing in again")
+            async with self._auth_lock:
+                if self.session_id == expired_session:
+                    self._count("reauths")
+                    await self.authenticate()
+        return await request()
+
+    async def get_calendars(self) -> list[dict[str, Any]]:
         """Get list of available calendars."""
         if not self.session_id:
             raise TimeTreeAuthError("Not authenticated")
 
-        url = f"{API_BASEURI}/calendars?since=0"
-        headers = {
-            "Content-Type": "application/json",
-            "X-Timetreea": API_USER_AGENT,
-        }
-
         try:
-            response = self.session.get(url, headers=headers, timeout=10)
-            
-            if response.status_code != 200:
-                _LOGGER.error("Failed to get calendars: %s", response.text)
-                raise HTTPError("Failed to fetch calendars")
-
-            calendars = response.json().get("calendars", [])
-            
-            # Filter out deactivated calendars
-            active_calendars = [
-                cal for cal in calendars if cal.get("deactivated_at") is None
-            ]
-            
-            _LOGGER.info("Found %d active calendars", len(active_calendars))
-            return active_calendars
+            return await self._with_reauth(self._fetch_calendars)
 
-        except RequestException as err:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
             _LOGGER.error("Connection error while fetching calendars: %s", err)
             raise TimeTreeConnectionError("Cannot connect to TimeTree") from err
 
-    def get_events(self, calendar_id: int) -> list[dict[str, Any]]:
-        """Get events from a specific calendar."""
+    async def _fetch_calendars(self) -> list[dict[str, Any]]:
+        """Fetch the active calendars."""
+        url = f"{API_BASEURI}/calendars?since=0"
+
+        status, body = await self._get(url)
+
+        if status != 200:
+            _LOGGER.error("Failed to get calendars: %s", body)
+            raise TimeTreeConnectionError("Failed to fetch calendars")
+
+        calendars = body.get("calendars", [])
+
+        # Filter out deactivated calendars
+        active_calendars = [
+            cal for cal in calendars if cal.get("deactivated_at") is None
+        ]
+
+        _LOGGER.info("Found %d active calendars", len(active_calendars))
+        return active_calendars
+
+    async def iter_events(
+        self, calendar_id: int, full_sync: bool = False, resume: bool = True
+    ) -> AsyncIterator[TimeTreeEventChunk]:
+        """Yield new, changed and deleted events of a calendar chunk by chunk.
+
+        The ``since`` cursor returned by the last sync is reused so only
+        deltas are transferred. A full sync is done when there is no cursor
+        yet, when TimeTree rejects the cursor or when explicitly requested.
+
+        Chunks are fetched one at a time, each with its own retries. The
+        cursor of the last chunk received is kept as a checkpoint, so a sync
+        that failed halfway resumes there on the next call. The sync cursor
+        itself only moves once the last chunk has been received.
+        """
         if not self.session_id:
             raise TimeTreeAuthError("Not authenticated")
 
+        checkpoint = None if full_sync or not resume else self._checkpoints.get(calendar_id)
+        if checkpoint is not None:
+            since, is_full_sync = checkpoint
+            first = False
+            _LOGGER.debug("Resuming sync of calendar %s at %s", calendar_id, since)
+        else:
+            since = None if full_sync else self._sync_cursors.get(calendar_id)
+            is_full_sync = since is None
+            first = True
+        fresh = first
+
+        for _ in range(self.max_chunks):
+            try:
+                body = await self._fetch_chunk(calendar_id, since, conditional=first)
+            except TimeTreeCursorError:
+                if not first or is_full_sync:
+                    raise TimeTreeConnectionError("Failed to fetch events") from None
+                _LOGGER.warning(
+                    "Sync cursor for calendar %s rejected, doing a full sync",
+                    calendar_id,
+                )
+                self._sync_cursors.pop(calendar_id, None)
+                since = None
+                is_full_sync = True
+                continue
+
+            if body is None:
+                _LOGGER.debug("Events of calendar %s are unchanged", calendar_id)
+                yield TimeTreeEventChunk(
+                    events=[],
+                    since=since,
+                    full_sync=is_full_sync,
+                    first=True,
+                    last=True,
+                    unchanged=True,
+                )
+                return
+
+            events = select_event_fields(body.pop("events", []))
+            next_since = body.get("since", since)
+            last = body.get("chunk") is not True
+            if not last and (next_since is None or next_since == since):
+                raise TimeTreeConnectionError("Chunked response without a new cursor")
+
+            if last:
+                self._sync_cursors[calendar_id] = next_since
+                self._checkpoints.pop(calendar_id, None)
+            else:
+                self._checkpoints[calendar_id] = (next_since, is_full_sync)
+
+            _LOGGER.debug(
+                "Fetched %d %s events from calendar %s",
+                len(events),
+                "full sync" if is_full_sync else "delta",
+                calendar_id,
+            )
+            yield TimeTreeEventChunk(
+                events=events,
+                since=next_since,
+                full_sync=is_full_sync,
+                first=fresh,
+                last=last,
+            )
+            if last:
+                return
+
+            since = next_since
+            first = fresh = False
+
+        raise TimeTreeConnectionError(
+            f"Sync of calendar {calendar_id} exceeded {self.max_chunks} chunks"
+        )
+
+    async def _fetch_chunk(
+        self, calendar_id: int, since: int | None, conditional: bool
+    ) -> dict[str, Any] | None:
+        """Fetch one sync chunk with retries, return None if unchanged."""
         url = f"{API_BASEURI}/calendar/{calendar_id}/events/sync"
-        headers = {
-            "Content-Type": "application/json",
-            "X-Timetreea": API_USER_AGENT,
-        }
+        if since is not None:
+            url = f"{url}?since={since}"
+
+        for delay in (*CHUNK_RETRY_DELAYS, None):
+            try:
+                if conditional:
+                    status, body = await self._with_reauth(
+                        partial(self._get_conditional, calendar_id, url)
+                    )
+                else:
+                    status, body = await self._with_reauth(partial(self._get, url))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if delay is None:
+                    _LOGGER.error("Connection error while fetching events: %s", err)
+                    raise TimeTreeConnectionError("Cannot connect to TimeTree") from err
+                _LOGGER.debug("Error fetching events chunk, retrying: %s", err)
+                self._count("retries")
+                await asyncio.sleep(delay)
+                continue
+
+            if status == 200:
+                return body
+            if status == 304:
+                return None
+            if since is not None and status == INVALID_CURSOR_STATUS:
+                _LOGGER.debug("Sync cursor %s rejected: %s", since, body)
+                raise TimeTreeCursorError(f"Cursor {since} rejected")
+            if status < 500 or delay is None:
+                _LOGGER.error("Failed to get events: %s", body)
+                raise TimeTreeConnectionError("Failed to fetch events")
+            _LOGGER.debug("Server error %s fetching events chunk, retrying", status)
+            self._count("retries")
+            await asyncio.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    async def create_event(self, calendar_id: int, event_data: dict[str, Any]) -> None:
+        """Create an event from a TimeTree event payload."""
+        await self._write("post", f"{API_BASEURI}/calendar/{calendar_id}/event", event_data)
+
+    async def update_event(self, calendar_id: int, event_data: dict[str, Any]) -> None:
+        """Replace an event with a TimeTree event payload."""
+        await self._write(
+            "put",
+            f"{API_BASEURI}/calendar/{calendar_id}/event/{event_data['uuid']}",
+            event_data,
+        )
+
+    async def delete_event(self, calendar_id: int, uid: str) -> None:
+        """Delete an event, succeeding if it is already gone."""
+        await self._write(
+            "delete", f"{API_BASEURI}/calendar/{calendar_id}/event/{uid}", missing_ok=True
+        )
+
+    async def _write(
+        self,
+        method: str,
+        url: str,
+        payload: dict[str, Any] | None = None,
+        missing_ok: bool = False,
+    ) -> None:
+        """Send a change, raising TimeTreeWriteError if TimeTree refuses it.
+
+        Connection problems and server errors raise TimeTreeConnectionError,
+        so the change can be tried again later.
+        """
+        if not self.session_id:
+            raise TimeTreeAuthError("Not authenticated")
 
         try:
-            response = self.session.get(url, headers=headers, timeout=10)
-            
-            if response.status_code != 200:
-                _LOGGER.error("Failed to get events: %s", response.text)
-                raise HTTPError("Failed to fetch events")
-
-            r_json = response.json()
-            events = r_json.get("events", [])
-            
-            # Handle chunked responses
-            if r_json.get("chunk") is True:
-                events.extend(self._get_events_recursive(calendar_id, r_json.get("since")))
-            
-            _LOGGER.info("Fetched %d events from calendar %s", len(events), calendar_id)
-            return events
-
-        except RequestException as err:
-            _LOGGER.error("Connection error while fetching events: %s", err)
+            status, body = await self._with_reauth(
+                partial(self._send, method, url, payload)
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Connection error while writing an event: %s", err)
             raise TimeTreeConnectionError("Cannot connect to TimeTree") from err
 
-    def _get_events_recursive(self, calendar_id: int, since: int) -> list[dict[str, Any]]:
-        """Recursively fetch events when response is chunked."""
-        url = f"{API_BASEURI}/calendar/{calendar_id}/events/sync?since={since}"
-        headers = {
-            "Content-Type": "application/json",
-            "X-Timetreea": API_USER_AGENT,
-        }
-
+        if status < 300 or (missing_ok and status == 404):
+            return
+        if status >= 500:
+            raise TimeTreeConnectionError(f"TimeTree returned status {status}")
+        _LOGGER.error("TimeTree refused the change: %s", body)
+        raise TimeTreeWriteError(f"TimeTree refused the change with status {status}")
+
+    async def _send(
+        self, method: str, url: str, payload: dict[str, Any] | None
+    ) -> tuple[int, str]:
+        """Perform a request with a JSON body, return status code and body text."""
+        self._count("requests")
+        await self._throttle()
+        async with self.session.request(
+            method, url, json=payload, headers=self._headers(), timeout=REQUEST_TIMEOUT
+        ) as response:
+            _raise_for_status(response)
+            return response.status, await response.text()
+
+    def reset_sync(self, calendar_id: int) -> None:
+        """Forget the sync cursor so the next sync is a full one."""
+        self._sync_cursors.pop(calendar_id, None)
+        self._checkpoints.pop(calendar_id, None)
+        self._validators.pop(calendar_id, None)
+
+    def get_sync_cursor(self, calendar_id: int) -> int | None:
+        """Return the sync cursor of a calendar, if any."""
+        return self._sync_cursors.get(calendar_id)
+
+    def set_sync_cursor(self, calendar_id: int, since: int) -> None:
+        """Restore a previously saved sync cursor."""
+        self._sync_cursors[calendar_id] = since
+
+
+def select_event_fields(events: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Keep only the EVENT_FIELDS of decoded events, releasing the rest.
+
+    Attendees, labels, attachments and the like are freed right away
+    instead of staying alive until the whole chunk has been converted.
+    New dicts are built, as dicts do not shrink when keys are deleted.
+    """
+    return [
+        {key: value for key, value in event.items() if key in EVENT_FIELDS}
+        for event in events
+    ]
+
+
+def _raise_for_status(response: aiohttp.ClientResponse) -> None:
+    """Raise for responses that need handling beyond the caller's checks."""
+    if response.status == 401:
+        raise TimeTreeSessionExpiredError("Session expired")
+    _raise_for_rate_limit(response)
+
+
+def _raise_for_rate_limit(response: aiohttp.ClientResponse) -> None:
+    """Raise TimeTreeRateLimitError for a 429 response, honouring Retry-After."""
+    if response.status != 429:
+        return
+    retry_after: float | None = None
+    if (header := response.headers.get("Retry-After")) is not None:
         try:
-            response = self.session.get(url, headers=headers, timeout=10)
-            r_json = response.json()
-            events = r_json.get("events", [])
-            
-            if r_json.get("chunk") is True:
-                events.extend(self._get_events_recursive(calendar_id, r_json.get("since")))
-            
-            return events
+            retry_after = float(header)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(header)
+            except (TypeError, ValueError):
+                retry_at = None
+            if retry_at is not None:
+                retry_after = max(
+                    0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds()
+                )
+    _LOGGER.warning("TimeTree rate limit hit, retry after %s seconds", retry_after)
+    raise TimeTreeRateLimitError(retry_after)
+
+
+class TimeTreeSyncAPIClient:
+    """Blocking wrapper around TimeTreeAPIClient, for scripts and tests."""
+
+    def __init__(self, email: str, password: str) -> None:
+        """Initialize the client with its own event loop and session."""
+        self._loop = asyncio.new_event_loop()
+        self._session = self._loop.run_until_complete(self._create_session())
+        self._client = TimeTreeAPIClient(self._session, email, password)
+
+    @staticmethod
+    async def _create_session() -> aiohttp.ClientSession:
+        """Create the aiohttp session inside the wrapper's event loop."""
+        return aiohttp.ClientSession(cookie_jar=aiohttp.DummyCookieJar())
+
+    @property
+    def client(self) -> TimeTreeAPIClient:
+        """Return the wrapped asynchronous client."""
+        return self._client
+
+    def authenticate(self) -> bool:
+        """Authenticate with TimeTree and get session ID."""
+        return self._loop.run_until_complete(self._client.authenticate())
+
+    def get_calendars(self) -> list[dict[str, Any]]:
+        """Get list of available calendars."""
+        return self._loop.run_until_complete(self._client.get_calendars())
+
+    def get_events(
+        self, calendar_id: int, full_sync: bool = False
+    ) -> list[TimeTreeEventChunk]:
+        """Get all chunks of new, changed and deleted events of a calendar."""
+
+        async def _collect() -> list[TimeTreeEventChunk]:
+            return [
+                chunk
+                async for chunk in self._client.iter_events(
+                    calendar_id, full_sync, resume=False
+                )
+            ]
 
-        except RequestException as err:
-            _LOGGER.error("Error fetching chunked events: %s", err)
-            return []
+        return self._loop.run_until_complete(_collect())
 
+    def reset_sync(self, calendar_id: int) -> None:
+        """Forget the sync cursor so the next sync is a full one."""
+        self._client.reset_sync(calendar_id)
 
-def convert_timestamp_to_datetime(timestamp: int, tzinfo: ZoneInfo = ZoneInfo("UTC")) -> datetime:
+    def close(self) -> None:
+        """Close the session and the event loop."""
+        self._loop.run_until_complete(self._session.close())
+        self._loop.close()
+
+
+UTC = ZoneInfo("UTC")
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=None)
+def _epoch_in(tzinfo: ZoneInfo) -> datetime:
+    """Return the Unix epoch as seen from a timezone."""
+    return datetime.fromtimestamp(0, tzinfo)
+
+
+def convert_timestamp_to_datetime(timestamp: int, tzinfo: ZoneInfo = UTC) -> datetime:
     """Convert timestamp to datetime for both positive and negative timestamps."""
     if timestamp >= 0:
         return datetime.fromtimestamp(timestamp, tzinfo)
-    return datetime.fromtimestamp(0, tzinfo) + timedelta(seconds=int(timestamp))
+    return _epoch_in(tzinfo) + timedelta(seconds=int(timestamp))
+
+
+def convert_event_times(
+    start: float, end: float, start_tz: str, end_tz: str
+) -> tuple[datetime, datetime]:
+    """Convert the start and end timestamps of an event in one go.
+
+    The end reuses the start's timezone when they match, which is the
+    common case.
+    """
+    start_zone = ZoneInfo(start_tz)
+    end_zone = start_zone if end_tz == start_tz else ZoneInfo(end_tz)
+    if start >= 0 and end >= 0:
+        return (
+            datetime.fromtimestamp(start, start_zone),
+            datetime.fromtimestamp(end, end_zone),
+        )
+    return (
+        convert_timestamp_to_datetime(start, start_zone),
+        convert_timestamp_to_datetime(end, end_zone),
+    )
+
+
+def convert_timestamp_to_date(timestamp: float, tz_key: str) -> date:
+    """Return the calendar date of a timestamp in a timezone.
+
+    UTC dates, which is what TimeTree sends for all-day events, are
+    computed without building a datetime.
+    """
+    if tz_key == "UTC":
+        return date.fromordinal(_EPOCH_ORDINAL + int(timestamp) // 86400)
+    return convert_timestamp_to_datetime(timestamp, ZoneInfo(tz_key)).date()
 
 
 def convert_timetree_event(event_data: dict[str, Any]) -> dict[str, Any]:
     """Convert TimeTree event to Home Assistant calendar event format."""
-    # Extract timezone info
-    start_tz = ZoneInfo(event_data.get("start_timezone", "UTC"))
-    end_tz = ZoneInfo(event_data.get("end_timezone", "UTC"))
-    
     # Convert timestamps (TimeTree uses milliseconds)
-    start_dt = convert_timestamp_to_datetime(
-        event_data.get("start_at") / 1000, start_tz
-    )
-    end_dt = convert_timestamp_to_datetime(
-        event_data.get("end_at") / 1000, end_tz
-    )
-    
+    start_at = event_data.get("start_at") / 1000
+    end_at = event_data.get("end_at") / 1000
+    start_tz = event_data.get("start_timezone", "UTC")
+    end_tz = event_data.get("end_timezone", "UTC")
+    if event_data.get("all_day"):
+        start: datetime | date = convert_timestamp_to_date(start_at, start_tz)
+        end: datetime | date = convert_timestamp_to_date(end_at, end_tz)
+    else:
+        start, end = convert_event_times(start_at, end_at, start_tz, end_tz)
+
     # Build Home Assistant calendar event
     ha_event = {
         "uid": event_data.get("uuid"),
         "summary": event_data.get("title", ""),
-        "start": start_dt,
-        "end": end_dt,
+        "start": start,
+        "end": end,
         "description": event_data.get("note", ""),
         "location": event_data.get("location", ""),
     }
     
-    # Add all-day flag if applicable
-    if event_data.get("all_day"):
-        ha_event["start"] = start_dt.date()
-        ha_event["end"] = end_dt.date()
-    
     # Add URL if present
     if event_data.get("url"):
         ha_event["url"] = event_data.get("url")
-    
+
+    recurrences = event_data.get("recurrences") or []
+    if event_data.get("parent_id"):
+        # Edited single occurrence of a recurring series
+        ha_event["parent_uid"] = event_data.get("parent_id")
+        recurrence_id = next(
+            (line for line in recurrences if line.startswith("RECURRENCE-ID")), None
+        )
+        if recurrence_id:
+            ha_event["recurrence_id"] = recurrence_id
+    elif recurrences:
+        # Add RRULE/RDATE/EXDATE lines of a recurring series
+        ha_event["recurrences"] = list(recurrences)
+
     return ha_event
+
+
+def build_timetree_event(
+    uid: str,
+    summary: str,
+    start: datetime | date,
+    end: datetime | date,
+    description: str | None = None,
+    location: str | None = None,
+    rrule: str | None = None,
+) -> dict[str, Any]:
+    """Build a TimeTree event payload, the inverse of convert_timetree_event.
+
+    All-day events are given with an exclusive end date, as Home Assistant
+    does, and stored with the inclusive end date TimeTree uses.
+    """
+    all_day = not isinstance(start, datetime)
+    if all_day:
+        last_day = max(start, end - timedelta(days=1))
+        start_at = (start.toordinal() - _EPOCH_ORDINAL) * 86400
+        end_at = (last_day.toordinal() - _EPOCH_ORDINAL) * 86400
+        start_tz = end_tz = "UTC"
+    else:
+        start_at = start.timestamp()
+        end_at = end.timestamp()
+        start_tz = _timezone_key(start)
+        end_tz = _timezone_key(end)
+    return {
+        "uuid": uid,
+        "title": summary,
+        "all_day": all_day,
+        # TimeTree uses milliseconds
+        "start_at": int(start_at * 1000),
+        "start_timezone": start_tz,
+        "end_at": int(end_at * 1000),
+        "end_timezone": end_tz,
+        "note": description or "",
+        "location": location or "",
+        "recurrences": [f"RRULE:{rrule}"] if rrule else [],
+    }
+
+
+def _timezone_key(value: datetime) -> str:
+    """Return the IANA key of an aware datetime's timezone, UTC otherwise."""
+    return getattr(value.tzinfo, "key", None) or "UTC"
@@ -0,0 +1,25 @@
+"""Fixtures for TimeTree Calendar tests."""
+from collections.abc import AsyncIterator
+from unittest.mock import patch
+
+import pytest
+
+from .fake_timetree import FakeTimeTree
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Allow Home Assistant to load the integration in every test."""
+    yield
+
+
+@pytest.fixture
+async def fake_timetree(socket_enabled) -> AsyncIterator[FakeTimeTree]:
+    """Run a local TimeTree API and point the client at it."""
+    server = FakeTimeTree()
+    await server.start()
+    with patch(
+        "custom_components.timetree.timetree_api.API_BASEURI", server.base_uri
+    ):
+        yield server
+    await server.stop()
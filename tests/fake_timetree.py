@@ -0,0 +1,95 @@
+"""Local stand-in for the TimeTree API used by the tests.
+
+Modelled on benchmarks/fake_server.py, but every login gets its own
+session cookie, so the tests can tell which account a request ran as,
+and sync responses can be made to fail on demand.
+"""
+from typing import Any
+
+from aiohttp import web
+
+
+class FakeTimeTree:
+    """Serve the TimeTree API for a few accounts on localhost."""
+
+    def __init__(self) -> None:
+        """Initialize a server without requests yet."""
+        # Email of the account each request to the calendar list ran as
+        self.calendar_requests: list[str | None] = []
+        # Events per calendar; the sync cursor is a position in the list
+        self.events: dict[int, list[dict[str, Any]]] = {}
+        self.chunk_size = 2
+        # Status of the next sync requests, None to answer them normally
+        self.sync_statuses: list[int | None] = []
+        # Cursor each sync request asked for
+        self.sync_requests: list[int | None] = []
+        self._sessions: dict[str, str] = {}
+        self._runner: web.AppRunner | None = None
+        self._port = 0
+
+    @property
+    def base_uri(self) -> str:
+        """Return the API base URI to point the client at."""
+        return f"http://127.0.0.1:{self._port}/api/v1"
+
+    async def start(self) -> None:
+        """Start listening on a free local port."""
+        app = web.Application()
+        app.router.add_put("/api/v1/auth/email/signin", self._signin)
+        app.router.add_get("/api/v1/calendars", self._calendars)
+        app.router.add_get("/api/v1/calendar/{calendar_id}/events/sync", self._sync)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self._port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _account(self, request: web.Request) -> str | None:
+        """Return the email of the account a request is signed in as."""
+        return self._sessions.get(request.cookies.get("_session_id", ""))
+
+    async def _signin(self, request: web.Request) -> web.Response:
+        """Accept any credentials and hand out a session cookie per login."""
+        email = (await request.json())["uid"]
+        session_id = f"sess-{email}"
+        self._sessions[session_id] = email
+        response = web.json_response({})
+        response.set_cookie("_session_id", session_id)
+        return response
+
+    async def _calendars(self, request: web.Request) -> web.Response:
+        """List one calendar named after the signed in account."""
+        email = self._account(request)
+        self.calendar_requests.append(email)
+        if email is None:
+            return web.json_response({}, status=401)
+        calendars: list[dict[str, Any]] = [{"id": 1, "name": email}]
+        return web.json_response({"calendars": calendars})
+
+    async def _sync(self, request: web.Request) -> web.Response:
+        """Return the chunk of events after the ``since`` position."""
+        since = int(request.query["since"]) if "since" in request.query else None
+        self.sync_requests.append(since)
+        if self._account(request) is None:
+            return web.json_response({}, status=401)
+        if self.sync_statuses and (status := self.sync_statuses.pop(0)) is not None:
+            return web.json_response({}, status=status)
+
+        events = self.events[int(request.match_info["calendar_id"])]
+        position = since or 0
+        if position > len(events):
+            return web.json_response({"error": "invalid since"}, status=400)
+        until = min(position + self.chunk_size, len(events))
+        return web.json_response(
+            {
+                "events": events[position:until],
+                "since": until,
+                "chunk": until < len(events),
+            }
+        )
@@ -0,0 +1,108 @@
+"""Tests for the TimeTree calendar entities."""
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.timetree.const import (
+    CONF_CALENDAR_ID,
+    CONF_CALENDAR_NAME,
+    CONF_MERGED_CALENDARS,
+    CONF_UPDATE_INTERVAL,
+    DOMAIN,
+    SERVICE_GET_UPCOMING,
+    WINDOW_NEXT_7_DAYS,
+)
+from custom_components.timetree.timetree_api import TimeTreeEventChunk
+
+MERGED_ENTITY_ID = "calendar.timetree_home_merged"
+
+
+def _api_event(uid: str, title: str, start: datetime) -> dict[str, Any]:
+    """Return a one hour TimeTree API event."""
+    return {
+        "uuid": uid,
+        "title": title,
+        "all_day": False,
+        "start_at": int(start.timestamp() * 1000),
+        "start_timezone": "UTC",
+        "end_at": int((start + timedelta(hours=1)).timestamp() * 1000),
+        "end_timezone": "UTC",
+        "location": "",
+        "note": "",
+        "recurrences": [],
+    }
+
+
+async def test_get_upcoming_on_merged_calendar(hass: HomeAssistant) -> None:
+    """The merged calendar answers get_upcoming with the version of its sources."""
+    start = dt_util.utcnow().replace(microsecond=0) + timedelta(hours=1)
+    shared = _api_event("shared", "Dinner", start + timedelta(hours=2))
+    events = {
+        1: [_api_event("dentist", "Dentist", start), shared],
+        2: [_api_event("football", "Football", start + timedelta(hours=1)), shared],
+    }
+
+    async def iter_events(self, calendar_id: int, *args: Any, **kwargs: Any):
+        yield TimeTreeEventChunk(
+            events=[dict(event) for event in events[calendar_id]],
+            since=1,
+            full_sync=True,
+            first=True,
+            last=True,
+        )
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="user@example.com_1",
+        data={
+            CONF_EMAIL: "user@example.com",
+            CONF_PASSWORD: "secret",
+            CONF_CALENDAR_ID: 1,
+            CONF_CALENDAR_NAME: "Home",
+            CONF_UPDATE_INTERVAL: 30,
+        },
+        options={CONF_MERGED_CALENDARS: ["2"]},
+    )
+    entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.timetree.timetree_api.TimeTreeAPIClient"
+        ".async_ensure_authenticated",
+        AsyncMock(),
+    ), patch(
+        "custom_components.timetree.timetree_api.TimeTreeAPIClient.iter_events",
+        iter_events,
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        response = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_GET_UPCOMING,
+            {"window": WINDOW_NEXT_7_DAYS},
+            target={"entity_id": MERGED_ENTITY_ID},
+            blocking=True,
+            return_response=True,
+        )
+
+        upcoming = response[MERGED_ENTITY_ID]
+        assert upcoming["window"] == WINDOW_NEXT_7_DAYS
+        assert [event["uid"] for event in upcoming["events"]] == [
+            "dentist",
+            "football",
+            "shared",
+        ]
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        assert upcoming["version"] == (
+            coordinator.data[1].version,
+            coordinator.data[2].version,
+        )
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
@@ -0,0 +1,70 @@
+"""Tests for the TimeTree Calendar config flow."""
+from unittest.mock import AsyncMock, patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import SOURCE_REAUTH
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.timetree.const import (
+    CONF_CALENDAR_ID,
+    CONF_CALENDAR_NAME,
+    DOMAIN,
+)
+from custom_components.timetree.timetree_api import TimeTreeAuthError
+
+
+def _entry(hass: HomeAssistant, calendar_id: int) -> MockConfigEntry:
+    """Add an entry of user@example.com for a calendar."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=f"user@example.com_{calendar_id}",
+        data={
+            CONF_EMAIL: "user@example.com",
+            CONF_PASSWORD: "old",
+            CONF_CALENDAR_ID: calendar_id,
+            CONF_CALENDAR_NAME: f"Calendar {calendar_id}",
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+async def test_reauth_updates_every_entry_of_the_login(hass: HomeAssistant) -> None:
+    """The new password is checked and stored in all entries sharing the login."""
+    first = _entry(hass, 1)
+    second = _entry(hass, 2)
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": SOURCE_REAUTH, "entry_id": first.entry_id},
+        data=first.data,
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "reauth_confirm"
+
+    with patch(
+        "custom_components.timetree.config_flow.TimeTreeAPIClient.authenticate",
+        AsyncMock(side_effect=TimeTreeAuthError("Invalid credentials")),
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_PASSWORD: "wrong"}
+        )
+    assert result["errors"] == {"base": "authentication_failed"}
+
+    with patch(
+        "custom_components.timetree.config_flow.TimeTreeAPIClient.authenticate",
+        AsyncMock(return_value=True),
+    ), patch(
+        "custom_components.timetree.async_setup_entry", AsyncMock(return_value=True)
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_PASSWORD: "new"}
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "reauth_successful"
+    assert first.data[CONF_PASSWORD] == second.data[CONF_PASSWORD] == "new"
@@ -0,0 +1,55 @@
+"""Tests for the TimeTree event store and its cold tier."""
+from dataclasses import replace
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.timetree.cold_tier import TimeTreeColdTier
+from custom_components.timetree.event_store import TimeTreeEventStore
+from custom_components.timetree.models import TimeTreeEvent
+
+# Retention window of 2024, in epoch seconds
+WINDOW = (1_704_067_200, 1_735_689_600)
+
+
+def _past_event(summary: str = "Old meeting") -> TimeTreeEvent:
+    """Return an event of 2023, outside the window."""
+    return TimeTreeEvent.from_api(
+        {
+            "uuid": "old",
+            "title": summary,
+            "start_at": 1_690_000_000_000,
+            "end_at": 1_690_003_600_000,
+            "note": "Long notes are compressed. " * 40,
+        }
+    )
+
+
+async def test_unchanged_cold_event_is_not_a_change(hass: HomeAssistant) -> None:
+    """Applying the same event to the cold tier again changes nothing."""
+    store = TimeTreeEventStore(TimeTreeColdTier(hass, 1))
+    store.retain(*WINDOW)
+    store.track_changes = True
+
+    assert store.upsert(_past_event())
+    version = store.version
+    assert not store.upsert(_past_event())
+    assert not store.upsert(_past_event())
+    assert store.version == version
+    changes = store.pop_changes()
+    assert [event.uid for event in changes.added] == ["old"]
+    assert not changes.updated
+
+    assert store.upsert(_past_event("Moved meeting"))
+    assert store.version == version + 1
+    assert [event.uid for event, _ in store.pop_changes().updated] == ["old"]
+
+
+async def test_cold_digests_survive_the_cache(hass: HomeAssistant) -> None:
+    """A cold tier restored from the event cache still knows its events."""
+    cold = TimeTreeColdTier(hass, 1)
+    cold.put(_past_event(), past=True)
+
+    restored = TimeTreeColdTier(hass, 1)
+    restored.load_dict(cold.as_dict())
+    assert restored.holds(_past_event())
+    assert not restored.holds(replace(_past_event(), location="Elsewhere"))
@@ -0,0 +1,117 @@
+"""Tests for setting up TimeTree Calendar entries."""
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import SOURCE_REAUTH, ConfigEntryState
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from custom_components.timetree.const import (
+    CONF_CALENDAR_ID,
+    CONF_CALENDAR_NAME,
+    CONF_UPDATE_INTERVAL,
+    DOMAIN,
+)
+from custom_components.timetree.coordinator import async_get_account
+from custom_components.timetree.timetree_api import (
+    TimeTreeAuthError,
+    TimeTreeEventChunk,
+)
+
+DATA = {
+    CONF_EMAIL: "user@example.com",
+    CONF_PASSWORD: "old",
+    CONF_UPDATE_INTERVAL: 30,
+}
+
+
+def _entry(hass: HomeAssistant, calendar_id: int) -> MockConfigEntry:
+    """Add an entry of user@example.com for a calendar."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=f"user@example.com_{calendar_id}",
+        data={
+            **DATA,
+            CONF_CALENDAR_ID: calendar_id,
+            CONF_CALENDAR_NAME: f"Calendar {calendar_id}",
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+async def _rejected(self, calendar_id: int, *args: Any, **kwargs: Any):
+    """Fail a sync as TimeTree does for a changed password."""
+    raise TimeTreeAuthError("Invalid credentials")
+    yield
+
+
+async def test_rejected_password_starts_reauth(hass: HomeAssistant) -> None:
+    """A saved session that turns out invalid asks for the password again."""
+    entry = _entry(hass, 1)
+
+    with patch(
+        "custom_components.timetree.timetree_api.TimeTreeAPIClient"
+        ".async_ensure_authenticated",
+        AsyncMock(),
+    ), patch(
+        "custom_components.timetree.timetree_api.TimeTreeAPIClient.iter_events",
+        _rejected,
+    ):
+        assert not await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.SETUP_ERROR
+    flows = hass.config_entries.flow.async_progress()
+    assert [flow["context"]["source"] for flow in flows] == [SOURCE_REAUTH]
+
+
+async def test_rejected_refresh_starts_reauth_for_every_entry(
+    hass: HomeAssistant,
+) -> None:
+    """Entries already set up ask for the password once TimeTree rejects it."""
+
+    async def iter_events(self, calendar_id: int, *args: Any, **kwargs: Any):
+        yield TimeTreeEventChunk(
+            events=[], since=1, full_sync=True, first=True, last=True
+        )
+
+    entries = [_entry(hass, 1), _entry(hass, 2)]
+    with patch(
+        "custom_components.timetree.timetree_api.TimeTreeAPIClient"
+        ".async_ensure_authenticated",
+        AsyncMock(),
+    ):
+        with patch(
+            "custom_components.timetree.timetree_api.TimeTreeAPIClient.iter_events",
+            iter_events,
+        ):
+            for entry in entries:
+                assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+
+        coordinator = hass.data[DOMAIN][entries[0].entry_id]["coordinator"]
+        with patch(
+            "custom_components.timetree.timetree_api.TimeTreeAPIClient.iter_events",
+            _rejected,
+        ):
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+
+        flows = hass.config_entries.flow.async_progress()
+        assert {flow["context"]["entry_id"] for flow in flows} == {
+            entry.entry_id for entry in entries
+        }
+
+        for entry in entries:
+            assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_login_is_shared_regardless_of_case(hass: HomeAssistant) -> None:
+    """An email typed with different letter case uses the same account."""
+    assert async_get_account(hass, "User@Example.com", "secret") is (
+        async_get_account(hass, "user@example.com", "secret")
+    )
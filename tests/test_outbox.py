@@ -0,0 +1,119 @@
+"""Tests for the queue of event changes waiting to be sent to TimeTree."""
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import HomeAssistant
+
+from custom_components.timetree.const import DOMAIN
+from custom_components.timetree.outbox import (
+    ACTION_CREATE,
+    ACTION_DELETE,
+    ACTION_UPDATE,
+    TimeTreeOutbox,
+)
+from custom_components.timetree.timetree_api import TimeTreeConnectionError
+
+CALENDAR_ID = 1
+KEY = "user_example_com"
+
+
+def _payload(uid: str, title: str) -> dict[str, Any]:
+    """Return a minimal TimeTree event payload."""
+    return {"uuid": uid, "title": title}
+
+
+@pytest.fixture
+def client() -> MagicMock:
+    """Return a client that accepts every change."""
+    client = MagicMock()
+    client.create_event = AsyncMock()
+    client.update_event = AsyncMock()
+    client.delete_event = AsyncMock()
+    return client
+
+
+async def test_create_and_update_are_merged(
+    hass: HomeAssistant, client: MagicMock
+) -> None:
+    """An update of a waiting creation is sent as one creation."""
+    outbox = TimeTreeOutbox(hass, client, KEY)
+    await outbox.async_load()
+    outbox.put(CALENDAR_ID, ACTION_CREATE, "a", _payload("a", "Draft"))
+    outbox.put(CALENDAR_ID, ACTION_UPDATE, "a", _payload("a", "Dentist"))
+    assert len(outbox) == 1
+
+    assert await outbox.async_flush() == set()
+
+    client.create_event.assert_awaited_once_with(CALENDAR_ID, _payload("a", "Dentist"))
+    client.update_event.assert_not_awaited()
+    assert len(outbox) == 0
+
+
+async def test_create_and_delete_cancel_out(
+    hass: HomeAssistant, client: MagicMock
+) -> None:
+    """Deleting an event that never reached TimeTree sends nothing."""
+    outbox = TimeTreeOutbox(hass, client, KEY)
+    await outbox.async_load()
+    outbox.put(CALENDAR_ID, ACTION_CREATE, "a", _payload("a", "Dentist"))
+    outbox.put(CALENDAR_ID, ACTION_DELETE, "a")
+    assert len(outbox) == 0
+
+    await outbox.async_flush()
+
+    client.create_event.assert_not_awaited()
+    client.delete_event.assert_not_awaited()
+
+
+async def test_changes_survive_a_restart(
+    hass_storage: dict[str, Any], hass: HomeAssistant, client: MagicMock
+) -> None:
+    """Saved changes are loaded and sent by the next run."""
+    outbox = TimeTreeOutbox(hass, client, KEY)
+    await outbox.async_load()
+    outbox.put(CALENDAR_ID, ACTION_UPDATE, "a", _payload("a", "Dentist"))
+    outbox.put(CALENDAR_ID, ACTION_DELETE, "b")
+    # Stopping Home Assistant writes the saves still waiting for their delay
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+    assert len(hass_storage[f"{DOMAIN}.outbox_{KEY}"]["data"]["changes"]) == 2
+
+    restarted = TimeTreeOutbox(hass, client, KEY)
+    await restarted.async_load()
+    assert len(restarted) == 2
+
+    await restarted.async_flush()
+
+    client.update_event.assert_awaited_once_with(CALENDAR_ID, _payload("a", "Dentist"))
+    client.delete_event.assert_awaited_once_with(CALENDAR_ID, "b")
+    assert len(restarted) == 0
+
+
+async def test_flush_stops_at_connection_error(
+    hass: HomeAssistant, client: MagicMock
+) -> None:
+    """Changes after an unreachable TimeTree stay queued in order."""
+    client.update_event.side_effect = TimeTreeConnectionError("offline")
+    outbox = TimeTreeOutbox(hass, client, KEY)
+    await outbox.async_load()
+    outbox.put(CALENDAR_ID, ACTION_CREATE, "a", _payload("a", "Dentist"))
+    outbox.put(CALENDAR_ID, ACTION_UPDATE, "b", _payload("b", "Football"))
+    outbox.put(CALENDAR_ID, ACTION_DELETE, "c")
+
+    with pytest.raises(TimeTreeConnectionError):
+        await outbox.async_flush()
+
+    client.create_event.assert_awaited_once()
+    client.delete_event.assert_not_awaited()
+    assert len(outbox) == 2
+
+    client.update_event.side_effect = None
+    await outbox.async_flush()
+
+    assert client.update_event.await_count == 2
+    client.update_event.assert_awaited_with(CALENDAR_ID, _payload("b", "Football"))
+    client.delete_event.assert_awaited_once_with(CALENDAR_ID, "c")
+    assert len(outbox) == 0
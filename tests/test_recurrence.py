@@ -0,0 +1,145 @@
+"""Tests for the expansion of recurring TimeTree events."""
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.timetree.coordinator import TimeTreeCalendarData
+from custom_components.timetree.event_store import TimeTreeEventStore
+from custom_components.timetree.models import TimeTreeEvent
+from custom_components.timetree.recurrence import TimeTreeRecurrence
+
+AMSTERDAM = ZoneInfo("Europe/Amsterdam")
+MONDAY = datetime(2024, 3, 4, 10, 0, tzinfo=timezone.utc)
+
+
+def _event(
+    uid: str, start: datetime, recurrences: list[str], **extra: Any
+) -> TimeTreeEvent:
+    """Return a one hour event in the timezone of its start."""
+    return TimeTreeEvent.from_api(
+        {
+            "uuid": uid,
+            "title": uid.capitalize(),
+            "start_at": int(start.timestamp() * 1000),
+            "start_timezone": str(start.tzinfo),
+            "end_at": int((start + timedelta(hours=1)).timestamp() * 1000),
+            "end_timezone": str(start.tzinfo),
+            "recurrences": recurrences,
+            **extra,
+        }
+    )
+
+
+def _calendar(*events: TimeTreeEvent) -> TimeTreeCalendarData:
+    """Return the calendar data of some events."""
+    store = TimeTreeEventStore()
+    for event in events:
+        store.upsert(event)
+    return TimeTreeCalendarData(store)
+
+
+def _starts(occurrences: Any) -> list[datetime | date]:
+    """Return the starts of some (start, end) occurrences."""
+    return [start for start, _ in occurrences]
+
+
+async def test_endless_series_is_expanded_lazily(hass: HomeAssistant) -> None:
+    """A series without end is kept unexpanded and queried per range."""
+    first = datetime(2000, 1, 3, 10, 0, tzinfo=timezone.utc)
+    standup = _event("standup", first, ["RRULE:FREQ=DAILY"])
+    calendar = _calendar(standup)
+
+    assert len(calendar) == 1
+    assert len(calendar.index) == 0
+    events = calendar.events_between(MONDAY, MONDAY + timedelta(days=6))
+    assert [event.start for event in events] == [
+        MONDAY + timedelta(days=day) for day in range(7)
+    ]
+    assert calendar.next_event(MONDAY + timedelta(minutes=30)).start == MONDAY
+
+
+def test_until_is_inclusive() -> None:
+    """A series stops at the last occurrence on or before UNTIL."""
+    recurrence = TimeTreeRecurrence(
+        _event("standup", MONDAY, ["RRULE:FREQ=DAILY;UNTIL=20240306T100000Z"])
+    )
+
+    assert _starts(
+        recurrence.between(MONDAY - timedelta(days=7), MONDAY + timedelta(days=30))
+    ) == [MONDAY, MONDAY + timedelta(days=1), MONDAY + timedelta(days=2)]
+    assert recurrence.first_starting_after(MONDAY + timedelta(days=2)) is None
+
+
+def test_all_day_series_with_utc_until() -> None:
+    """All-day series recur on dates and accept UTC stamps as UNTIL."""
+    start = datetime(2024, 3, 4, tzinfo=timezone.utc)
+    recurrence = TimeTreeRecurrence(
+        TimeTreeEvent.from_api(
+            {
+                "uuid": "holiday",
+                "title": "Holiday",
+                "all_day": True,
+                "start_at": int(start.timestamp() * 1000),
+                "end_at": int((start + timedelta(days=1)).timestamp() * 1000),
+                "recurrences": ["RRULE:FREQ=DAILY;UNTIL=20240306T000000Z"],
+            }
+        )
+    )
+
+    assert list(recurrence.between(start, start + timedelta(days=30))) == [
+        (date(2024, 3, 4), date(2024, 3, 5)),
+        (date(2024, 3, 5), date(2024, 3, 6)),
+        (date(2024, 3, 6), date(2024, 3, 7)),
+    ]
+
+
+def test_series_keeps_local_time_across_dst() -> None:
+    """Occurrences stay at the same wall clock time when DST starts."""
+    start = datetime(2024, 3, 29, 9, 0, tzinfo=AMSTERDAM)
+    recurrence = TimeTreeRecurrence(
+        _event("standup", start, ["RRULE:FREQ=DAILY;COUNT=4"])
+    )
+
+    starts = _starts(recurrence.between(start, start + timedelta(days=7)))
+
+    assert [occurrence.astimezone(AMSTERDAM).hour for occurrence in starts] == [9] * 4
+    assert [occurrence.utcoffset() for occurrence in starts] == [
+        timedelta(hours=1),
+        timedelta(hours=1),
+        timedelta(hours=2),
+        timedelta(hours=2),
+    ]
+
+
+async def test_edited_occurrences_replace_their_originals(
+    hass: HomeAssistant,
+) -> None:
+    """Occurrences edited into single events are only listed once."""
+    start = datetime(2024, 3, 29, 9, 0, tzinfo=AMSTERDAM)
+    series = _event("standup", start, ["RRULE:FREQ=DAILY;COUNT=4"])
+    # Both forms TimeTree sends: a UTC stamp and a stamp in the series' zone
+    moved = _event(
+        "standup-1",
+        start + timedelta(days=1, hours=3),
+        ["RECURRENCE-ID:20240330T080000Z"],
+        parent_id="standup",
+    )
+    after_dst = _event(
+        "standup-3",
+        datetime(2024, 4, 1, 14, 0, tzinfo=AMSTERDAM),
+        ["RECURRENCE-ID;TZID=Europe/Amsterdam:20240401T090000"],
+        parent_id="standup",
+    )
+    calendar = _calendar(series, moved, after_dst)
+
+    events = calendar.events_between(start, start + timedelta(days=7))
+
+    assert [(event.uid, event.start) for event in events] == [
+        ("standup", start),
+        ("standup-1", start + timedelta(days=1, hours=3)),
+        ("standup", datetime(2024, 3, 31, 9, 0, tzinfo=AMSTERDAM)),
+        ("standup-3", datetime(2024, 4, 1, 14, 0, tzinfo=AMSTERDAM)),
+    ]
+    assert calendar.next_event(start + timedelta(hours=2)).uid == "standup-1"
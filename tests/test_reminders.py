@@ -0,0 +1,187 @@
+"""Tests for the alert reminders of TimeTree events."""
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.timetree.coordinator import TimeTreeCalendarData
+from custom_components.timetree.event_store import TimeTreeEventStore
+from custom_components.timetree.models import TimeTreeEvent
+from custom_components.timetree.reminders import TimeTreeReminderScheduler
+
+CALENDAR_ID = 1
+NOW = datetime(2024, 3, 4, 8, 0, tzinfo=timezone.utc)
+TEN = NOW + timedelta(hours=2)
+
+
+def _event(uid: str, start: datetime, alerts: list[int], **extra: Any) -> TimeTreeEvent:
+    """Return a one hour event with alerts the given minutes before it."""
+    return TimeTreeEvent.from_api(
+        {
+            "uuid": uid,
+            "title": uid.capitalize(),
+            "start_at": int(start.timestamp() * 1000),
+            "end_at": int((start + timedelta(hours=1)).timestamp() * 1000),
+            "alerts": alerts,
+            **extra,
+        }
+    )
+
+
+def _calendar(*events: TimeTreeEvent) -> TimeTreeCalendarData:
+    """Return the calendar data of some events."""
+    store = TimeTreeEventStore()
+    for event in events:
+        store.upsert(event)
+    return TimeTreeCalendarData(store)
+
+
+class _Reminders:
+    """Scheduler of one test with the reminders it fired."""
+
+    def __init__(self, hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+        """Start a scheduler at NOW."""
+        self.hass = hass
+        self.freezer = freezer
+        self.fired: list[tuple[str, datetime | date, int]] = []
+        self.scheduler = TimeTreeReminderScheduler(hass, self._on_reminder)
+
+    def _on_reminder(
+        self,
+        calendar_id: int,
+        event: TimeTreeEvent,
+        start: datetime | date,
+        end: datetime | date,
+        minutes: int,
+    ) -> None:
+        """Record a fired reminder."""
+        self.fired.append((event.uid, start, minutes))
+
+    async def advance_to(self, moment: datetime) -> None:
+        """Move the clock and run the timers that are due."""
+        self.freezer.move_to(moment)
+        async_fire_time_changed(self.hass, moment)
+        await self.hass.async_block_till_done()
+
+
+@pytest.fixture
+def reminders(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> Iterator[_Reminders]:
+    """Return a scheduler running from NOW."""
+    freezer.move_to(NOW)
+    reminders = _Reminders(hass, freezer)
+    yield reminders
+    reminders.scheduler.async_close()
+
+
+async def test_alert_fires_before_the_event(reminders: _Reminders) -> None:
+    """Each alert fires its minutes before the start, earliest first."""
+    reminders.scheduler.async_update_calendar(
+        CALENDAR_ID, _calendar(_event("dentist", TEN, [10, 30]))
+    )
+    assert len(reminders.scheduler) == 2
+
+    await reminders.advance_to(TEN - timedelta(minutes=31))
+    assert reminders.fired == []
+    await reminders.advance_to(TEN - timedelta(minutes=30))
+    await reminders.advance_to(TEN - timedelta(minutes=10))
+
+    assert reminders.fired == [("dentist", TEN, 30), ("dentist", TEN, 10)]
+    assert len(reminders.scheduler) == 0
+
+
+async def test_changed_event_is_rearmed(reminders: _Reminders) -> None:
+    """A moved event fires for its new start only."""
+    reminders.scheduler.async_update_calendar(
+        CALENDAR_ID, _calendar(_event("dentist", TEN, [30]))
+    )
+    moved = TEN + timedelta(hours=2)
+    reminders.scheduler.async_update_calendar(
+        CALENDAR_ID, _calendar(_event("dentist", moved, [30]))
+    )
+    assert len(reminders.scheduler) == 1
+
+    await reminders.advance_to(TEN - timedelta(minutes=30))
+    assert reminders.fired == []
+    await reminders.advance_to(moved - timedelta(minutes=30))
+
+    assert reminders.fired == [("dentist", moved, 30)]
+
+
+async def test_unchanged_event_is_not_rearmed(reminders: _Reminders) -> None:
+    """New data without changes to an event keeps its single alert."""
+    for _ in range(3):
+        reminders.scheduler.async_update_calendar(
+            CALENDAR_ID, _calendar(_event("dentist", TEN, [30]))
+        )
+
+    await reminders.advance_to(TEN - timedelta(minutes=30))
+
+    assert reminders.fired == [("dentist", TEN, 30)]
+
+
+async def test_removed_event_does_not_fire(reminders: _Reminders) -> None:
+    """Alerts of deleted events and removed calendars are dropped."""
+    reminders.scheduler.async_update_calendar(
+        CALENDAR_ID,
+        _calendar(_event("dentist", TEN, [30]), _event("football", TEN, [15])),
+    )
+    reminders.scheduler.async_update_calendar(
+        CALENDAR_ID, _calendar(_event("football", TEN, [15]))
+    )
+    assert len(reminders.scheduler) == 1
+    reminders.scheduler.async_remove_calendar(CALENDAR_ID)
+    assert len(reminders.scheduler) == 0
+
+    await reminders.advance_to(TEN)
+
+    assert reminders.fired == []
+
+
+async def test_recurring_event_fires_every_occurrence(reminders: _Reminders) -> None:
+    """A series fires for each occurrence but the ones edited into singles."""
+    series = _event("standup", TEN, [30], recurrences=["RRULE:FREQ=DAILY;COUNT=4"])
+    # The edited second occurrence moved to the afternoon, without alerts
+    edited = _event(
+        "standup-2",
+        TEN + timedelta(days=1, hours=4),
+        [],
+        parent_id="standup",
+        recurrences=["RECURRENCE-ID:20240305T100000Z"],
+    )
+    reminders.scheduler.async_update_calendar(CALENDAR_ID, _calendar(series, edited))
+    # Only the next occurrence of a series is scheduled
+    assert len(reminders.scheduler) == 1
+
+    for day in range(5):
+        await reminders.advance_to(TEN + timedelta(days=day, minutes=-30))
+
+    assert reminders.fired == [
+        ("standup", TEN, 30),
+        ("standup", TEN + timedelta(days=2), 30),
+        ("standup", TEN + timedelta(days=3), 30),
+    ]
+    assert len(reminders.scheduler) == 0
+
+
+async def test_past_alerts_are_skipped(reminders: _Reminders) -> None:
+    """Alerts already due when an event arrives never fire."""
+    soon = NOW + timedelta(minutes=10)
+    reminders.scheduler.async_update_calendar(
+        CALENDAR_ID,
+        _calendar(
+            _event("soon", soon, [5, 30]),
+            _event("started", NOW - timedelta(minutes=20), [15]),
+        ),
+    )
+    assert len(reminders.scheduler) == 1
+
+    await reminders.advance_to(soon)
+
+    assert reminders.fired == [("soon", soon, 5)]
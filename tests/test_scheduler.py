@@ -0,0 +1,128 @@
+"""Tests for the adaptive polling schedule."""
+from datetime import datetime, timedelta, timezone
+
+from custom_components.timetree.const import (
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL,
+)
+from custom_components.timetree.scheduler import NEAR_BOUNDARY, TimeTreePollScheduler
+
+WEEK_START = datetime(2024, 3, 4, tzinfo=timezone.utc)
+# An ordinary calendar: three events a day, edited twice a day
+EVENT_TIMES = ((9, 0, 60), (12, 30, 60), (18, 0, 90))
+CHANGE_HOURS = (8, 20)
+
+
+def _default_scheduler() -> TimeTreePollScheduler:
+    """Return a scheduler with the default bounds."""
+    return TimeTreePollScheduler(
+        base=timedelta(minutes=DEFAULT_UPDATE_INTERVAL),
+        floor=timedelta(minutes=DEFAULT_MIN_UPDATE_INTERVAL),
+        ceiling=timedelta(minutes=DEFAULT_MAX_UPDATE_INTERVAL),
+    )
+
+
+def _week_boundaries() -> list[datetime]:
+    """Return the event starts and ends of the simulated week, in order."""
+    boundaries = []
+    for day in range(8):
+        midnight = WEEK_START + timedelta(days=day)
+        for hour, minute, duration in EVENT_TIMES:
+            start = midnight + timedelta(hours=hour, minutes=minute)
+            boundaries += [start, start + timedelta(minutes=duration)]
+    return boundaries
+
+
+def _simulate_week() -> list[datetime]:
+    """Run the scheduler over a week and return the poll times."""
+    scheduler = _default_scheduler()
+    boundaries = _week_boundaries()
+    changes = [
+        WEEK_START + timedelta(days=day, hours=hour)
+        for day in range(7)
+        for hour in CHANGE_HOURS
+    ]
+    polls: list[datetime] = []
+    now = WEEK_START
+    while now < WEEK_START + timedelta(days=7):
+        previous = polls[-1] if polls else None
+        polls.append(now)
+        scheduler.record_success(
+            any(previous is None or previous < change <= now for change in changes)
+        )
+        next_boundary = next(
+            (boundary for boundary in boundaries if boundary > now + NEAR_BOUNDARY),
+            None,
+        )
+        now += scheduler.next_interval(now, next_boundary)
+    return polls
+
+
+def test_polls_per_week() -> None:
+    """Polling an ordinary calendar costs less than a fixed 30 minute interval."""
+    polls = _simulate_week()
+    fixed_interval_polls = timedelta(days=7) / timedelta(minutes=30)
+    assert len(polls) <= fixed_interval_polls / 2
+
+
+def test_poll_right_before_boundaries() -> None:
+    """Every event start and end is preceded by a recent poll."""
+    polls = _simulate_week()
+    for boundary in _week_boundaries():
+        if boundary >= polls[-1]:
+            break
+        last_poll = max(poll for poll in polls if poll <= boundary)
+        assert boundary - last_poll <= NEAR_BOUNDARY + timedelta(
+            minutes=DEFAULT_MIN_UPDATE_INTERVAL
+        )
+
+
+def test_quiet_back_off() -> None:
+    """Quiet refreshes double the interval up to the ceiling."""
+    scheduler = _default_scheduler()
+    now = WEEK_START
+    scheduler.record_success(True)
+    assert scheduler.next_interval(now, None) == timedelta(
+        minutes=DEFAULT_MIN_UPDATE_INTERVAL
+    )
+    intervals = []
+    for _ in range(4):
+        scheduler.record_success(False)
+        intervals.append(scheduler.next_interval(now, None))
+    assert intervals == [
+        timedelta(minutes=30),
+        timedelta(minutes=60),
+        timedelta(minutes=120),
+        timedelta(minutes=120),
+    ]
+
+
+def test_boundary_approach_is_gradual() -> None:
+    """The interval shrinks with the time left until the next boundary."""
+    scheduler = _default_scheduler()
+    now = WEEK_START
+    for _ in range(5):
+        scheduler.record_success(False)
+    assert scheduler.next_interval(now, now + timedelta(minutes=85)) == timedelta(
+        minutes=40
+    )
+    assert scheduler.next_interval(now, now + timedelta(minutes=45)) == timedelta(
+        minutes=40
+    )
+    assert scheduler.next_interval(now, now + timedelta(minutes=25)) == timedelta(
+        minutes=20
+    )
+    assert scheduler.next_interval(now, now + timedelta(minutes=7)) == timedelta(
+        minutes=DEFAULT_MIN_UPDATE_INTERVAL
+    )
+
+
+def test_retry_after() -> None:
+    """Errors back off, and never sooner than Retry-After allows."""
+    scheduler = _default_scheduler()
+    now = WEEK_START
+    scheduler.record_error()
+    assert scheduler.next_interval(now, None) == timedelta(minutes=60)
+    scheduler.record_error(retry_after=3 * 3600)
+    assert scheduler.next_interval(now, None) == timedelta(hours=3)
@@ -0,0 +1,149 @@
+"""Tests for the TimeTree API client."""
+from collections.abc import AsyncIterator
+from typing import Any
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+
+from custom_components.timetree.timetree_api import (
+    TimeTreeAPIClient,
+    TimeTreeConnectionError,
+    TimeTreeEventChunk,
+)
+
+from .fake_timetree import FakeTimeTree
+
+CALENDAR_ID = 1
+
+
+def _event(number: int) -> dict[str, Any]:
+    """Return a one hour API event."""
+    start = 1_704_067_200_000 + number * 3_600_000
+    return {
+        "uuid": f"event-{number}",
+        "title": f"Event {number}",
+        "start_at": start,
+        "end_at": start + 3_600_000,
+    }
+
+
+@pytest.fixture
+async def client(fake_timetree: FakeTimeTree) -> AsyncIterator[TimeTreeAPIClient]:
+    """Return a signed in client for a calendar of five events."""
+    fake_timetree.events[CALENDAR_ID] = [_event(number) for number in range(5)]
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.DummyCookieJar()) as session:
+        client = TimeTreeAPIClient(session, "user@example.com", "secret")
+        await client.authenticate()
+        with patch(
+            "custom_components.timetree.timetree_api.CHUNK_RETRY_DELAYS", (0, 0, 0)
+        ):
+            yield client
+
+
+async def _sync(client: TimeTreeAPIClient) -> list[TimeTreeEventChunk]:
+    """Return the chunks of one sync of the calendar."""
+    return [chunk async for chunk in client.iter_events(CALENDAR_ID)]
+
+
+def _uids(chunks: list[TimeTreeEventChunk]) -> list[str]:
+    """Return the uids of the events of some chunks, in order."""
+    return [event["uuid"] for chunk in chunks for event in chunk.events]
+
+
+async def test_accounts_sharing_a_session_keep_their_login(
+    fake_timetree: FakeTimeTree,
+) -> None:
+    """Each client sends its own session cookie over a shared session."""
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.DummyCookieJar()) as session:
+        alice = TimeTreeAPIClient(session, "alice@example.com", "secret")
+        bob = TimeTreeAPIClient(session, "bob@example.com", "secret")
+        await alice.authenticate()
+        await bob.authenticate()
+
+        assert (await alice.get_calendars())[0]["name"] == "alice@example.com"
+        assert (await bob.get_calendars())[0]["name"] == "bob@example.com"
+    assert fake_timetree.calendar_requests == ["alice@example.com", "bob@example.com"]
+
+
+async def test_full_sync_in_chunks(
+    fake_timetree: FakeTimeTree, client: TimeTreeAPIClient
+) -> None:
+    """A full sync pages through the chunks and keeps the last cursor."""
+    chunks = await _sync(client)
+
+    assert _uids(chunks) == [f"event-{number}" for number in range(5)]
+    assert [(chunk.first, chunk.last) for chunk in chunks] == [
+        (True, False),
+        (False, False),
+        (False, True),
+    ]
+    assert all(chunk.full_sync for chunk in chunks)
+    assert client.get_sync_cursor(CALENDAR_ID) == 5
+    assert fake_timetree.sync_requests == [None, 2, 4]
+
+    fake_timetree.events[CALENDAR_ID].append(_event(5))
+    delta = await _sync(client)
+    assert _uids(delta) == ["event-5"]
+    assert not delta[0].full_sync
+
+
+async def test_failed_chunk_is_retried(
+    fake_timetree: FakeTimeTree, client: TimeTreeAPIClient
+) -> None:
+    """A server error on one chunk is retried without restarting the sync."""
+    fake_timetree.sync_statuses = [None, 503]
+
+    chunks = await _sync(client)
+
+    assert len(_uids(chunks)) == 5
+    assert client.stats.retries == 1
+    assert fake_timetree.sync_requests == [None, 2, 2, 4]
+
+
+async def test_interrupted_sync_resumes_at_checkpoint(
+    fake_timetree: FakeTimeTree, client: TimeTreeAPIClient
+) -> None:
+    """A sync that gave up halfway continues after its last chunk."""
+    fake_timetree.sync_statuses = [None, 503, 503, 503, 503]
+    received = []
+    with pytest.raises(TimeTreeConnectionError):
+        async for chunk in client.iter_events(CALENDAR_ID):
+            received.append(chunk)
+    assert _uids(received) == ["event-0", "event-1"]
+    assert client.get_sync_cursor(CALENDAR_ID) is None
+
+    chunks = await _sync(client)
+
+    assert _uids(chunks) == ["event-2", "event-3", "event-4"]
+    assert chunks[0].full_sync and not chunks[0].first
+    assert client.get_sync_cursor(CALENDAR_ID) == 5
+
+
+async def test_rejected_cursor_falls_back_to_full_sync(
+    fake_timetree: FakeTimeTree, client: TimeTreeAPIClient
+) -> None:
+    """A cursor TimeTree no longer accepts is replaced by a full sync."""
+    client.set_sync_cursor(CALENDAR_ID, 99)
+
+    chunks = await _sync(client)
+
+    assert len(_uids(chunks)) == 5
+    assert chunks[0].full_sync and chunks[0].first
+    assert fake_timetree.sync_requests == [99, None, 2, 4]
+    assert client.get_sync_cursor(CALENDAR_ID) == 5
+
+
+@pytest.mark.parametrize("status", [403, 404])
+async def test_other_client_errors_keep_the_cursor(
+    fake_timetree: FakeTimeTree, client: TimeTreeAPIClient, status: int
+) -> None:
+    """Client errors other than a rejected cursor fail the sync as they are."""
+    await _sync(client)
+    fake_timetree.sync_statuses = [status]
+
+    with pytest.raises(TimeTreeConnectionError):
+        await _sync(client)
+
+    assert client.get_sync_cursor(CALENDAR_ID) == 5
+    assert fake_timetree.sync_requests[-1] == 5